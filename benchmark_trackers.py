@@ -0,0 +1,153 @@
+"""
+Сравнение алгоритмов отслеживания игроков на видео.
+
+Выделения игроков получаются нейросетью один раз (и сохраняются в кэше выделений),
+после чего каждый алгоритм отслеживания обрабатывает одни и те же выделения.
+Для каждого алгоритма выводится время сопоставления на кадр и количество смен
+идентификаторов: отслеживание на соседних кадрах, сопоставленное по IoU,
+получило другой идентификатор.
+
+Запуск: python benchmark_trackers.py [--video tests/videos/converted_demo.mp4] [--frames 500]
+"""
+import argparse
+import asyncio
+import time
+import tomllib
+from pathlib import Path
+from typing import AsyncGenerator
+
+import cv2
+import numpy as np
+
+from server.algorithms.detection_cache import DetectionCache, VideoDetectionCache
+from server.algorithms.enums import TrackerType
+from server.algorithms.nn import device
+from server.algorithms.services.base.inference_queue import InferenceQueue
+from server.algorithms.services.player_predictor_service import PlayerPredictorService
+from server.algorithms.trackers import MultiObjectTracker, associate_by_iou, create_tracker, iou_matrix
+from server.minimap_server import MinimapServer
+from server.utils import async_video_reader, enumerate_frames
+from server.utils.config import AppConfig
+
+DEFAULT_CONFIG_PATH: Path = Path(__file__).parent / "config.toml"
+DEFAULT_VIDEO_PATH: Path = Path(__file__).parent / "tests" / "videos" / "converted_demo.mp4"
+
+
+async def detect_players(video_path: Path, config: AppConfig, frames_limit: int) -> list[np.ndarray]:
+    """
+    Получает выделения игроков на кадрах видео.
+
+    :param video_path: Путь до видео.
+    :param config: Конфигурация приложения.
+    :param frames_limit: Максимальное количество обрабатываемых кадров.
+    :return: Выделения (N, 6) на каждом кадре.
+    """
+    player_predictor: PlayerPredictorService = PlayerPredictorService(
+        config.nn_config.player_detection_model_path.resolve(),
+        device,
+        InferenceQueue(),
+        threshold=MinimapServer.player_detection_threshold,
+        max_batch_size=config.nn_config.max_batch_size,
+        max_batch_wait_time=config.nn_config.max_batch_wait_time,
+        backend_type=config.nn_config.backend
+    )
+    predictor_task: asyncio.Task = asyncio.get_running_loop().create_task(player_predictor())
+    video_detection_cache: VideoDetectionCache = await DetectionCache(
+        config.static_path / "cache" / "detections"
+    ).open_video_cache(video_path, player_predictor.model_fingerprint)
+
+    capture = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
+    frames: AsyncGenerator = enumerate_frames(async_video_reader(capture))
+    detections: list[np.ndarray] = []
+
+    try:
+        async for _, _, instances in player_predictor.stream_inference(
+            frames, detection_cache=video_detection_cache
+        ):
+            detections.append(
+                np.concatenate(
+                    (
+                        instances.pred_boxes.tensor.numpy(),
+                        instances.scores.numpy()[:, None],
+                        instances.pred_classes.numpy()[:, None]
+                    ),
+                    axis=1
+                ).astype(np.float64)
+            )
+
+            if len(detections) >= frames_limit:
+                break
+
+    finally:
+        capture.release()
+        predictor_task.cancel()
+
+    return detections
+
+
+def count_id_switches(outputs: list[np.ndarray], min_iou: float = 0.5) -> int:
+    """
+    Подсчитывает смены идентификаторов отслеживаний между соседними кадрами.
+
+    :param outputs: Отслеживания (M, 7) на каждом кадре.
+    :param min_iou: Минимальное IoU, при котором отслеживания соседних кадров считаются одним игроком.
+    :return: Количество смен идентификаторов.
+    """
+    switches: int = 0
+
+    for previous, current in zip(outputs, outputs[1:]):
+        matches, _, _ = associate_by_iou(iou_matrix(previous[:, :4], current[:, :4]), min_iou)
+        switches += int(np.count_nonzero(previous[matches[:, 0], 4] != current[matches[:, 1], 4]))
+
+    return switches
+
+
+def benchmark_tracker(tracker: MultiObjectTracker, detections: list[np.ndarray]) -> None:
+    """
+    Выводит статистику работы алгоритма отслеживания.
+
+    :param tracker: Алгоритм отслеживания.
+    :param detections: Выделения (N, 6) на каждом кадре.
+    :return: Ничего.
+    """
+    timings: list[float] = []
+    outputs: list[np.ndarray] = []
+
+    for frame_detections in detections:
+        frame_detections = frame_detections[frame_detections[:, 4] > tracker.detection_score_threshold]
+        started_at: float = time.perf_counter()
+        output: np.ndarray = np.asarray(tracker.update(frame_detections), dtype=np.float64).reshape(-1, 7)
+        timings.append(time.perf_counter() - started_at)
+        outputs.append(output)
+
+    timings_ms: np.ndarray = np.array(timings) * 1000
+    unique_ids: int = len(np.unique(np.concatenate([output[:, 4] for output in outputs])))
+    print(
+        f"{type(tracker).__name__:>20}: "
+        f"mean {timings_ms.mean():.3f} ms, p95 {np.percentile(timings_ms, 95):.3f} ms per frame, "
+        f"{count_id_switches(outputs)} id switches, {unique_ids} unique ids"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Players trackers benchmark")
+    parser.add_argument("--video", type=Path, default=DEFAULT_VIDEO_PATH)
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--frames", type=int, default=1000, help="Maximum amount of processed frames")
+    parser.add_argument(
+        "--trackers", nargs="+", type=TrackerType, default=list(TrackerType), choices=list(TrackerType)
+    )
+    args = parser.parse_args()
+
+    with open(args.config, mode="rb") as f:
+        config: AppConfig = AppConfig(**tomllib.load(f))
+
+    detections: list[np.ndarray] = await detect_players(args.video, config, args.frames)
+    print(f"Detected players on {len(detections)} frames of {args.video}")
+
+    for tracker_type in args.trackers:
+        benchmark_tracker(create_tracker(tracker_type), detections)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+import numpy as np
+
+
+class BoxKalmanFilter:
+    """
+    Фильтр Калмана с постоянной скоростью для ограничивающих прямоугольников.
+
+    Состояние - центр, ширина, высота прямоугольника и их скорости за кадр.
+    Все методы обрабатывают сразу массивы состояний из N прямоугольников.
+    """
+
+    # Шум модели движения относительно высоты прямоугольника
+    position_noise_weight: float = 1 / 20
+    velocity_noise_weight: float = 1 / 160
+
+    def __init__(self) -> None:
+        self.transition: np.ndarray = np.eye(8, dtype=np.float64)
+        self.transition[:4, 4:] = np.eye(4)
+        self.observation: np.ndarray = np.eye(4, 8, dtype=np.float64)
+
+    def initiate(self, measurements: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Создает состояния новых прямоугольников с нулевой скоростью.
+
+        :param measurements: Измерения в формате (N, 4) из центра, ширины и высоты.
+        :return: Средние значения (N, 8) и ковариации (N, 8, 8) состояний.
+        """
+        mean: np.ndarray = np.concatenate((measurements, np.zeros_like(measurements)), axis=1)
+        heights: np.ndarray = measurements[:, 3]
+        std: np.ndarray = np.concatenate(
+            (
+                np.repeat((2 * self.position_noise_weight * heights)[:, None], 4, axis=1),
+                np.repeat((10 * self.velocity_noise_weight * heights)[:, None], 4, axis=1)
+            ),
+            axis=1
+        )
+        covariance: np.ndarray = np.zeros((len(measurements), 8, 8), dtype=np.float64)
+        covariance[:, np.arange(8), np.arange(8)] = std ** 2
+
+        return mean, covariance
+
+    def predict(self, mean: np.ndarray, covariance: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Переводит состояния на следующий кадр.
+
+        :param mean: Средние значения состояний (N, 8).
+        :param covariance: Ковариации состояний (N, 8, 8).
+        :return: Предсказанные средние значения и ковариации.
+        """
+        heights: np.ndarray = mean[:, 3]
+        std: np.ndarray = np.concatenate(
+            (
+                np.repeat((self.position_noise_weight * heights)[:, None], 4, axis=1),
+                np.repeat((self.velocity_noise_weight * heights)[:, None], 4, axis=1)
+            ),
+            axis=1
+        )
+        motion_noise: np.ndarray = np.zeros_like(covariance)
+        motion_noise[:, np.arange(8), np.arange(8)] = std ** 2
+
+        new_mean: np.ndarray = mean @ self.transition.T
+        new_covariance: np.ndarray = self.transition @ covariance @ self.transition.T + motion_noise
+        # Размер прямоугольника не может стать отрицательным
+        new_mean[:, 2:4] = np.maximum(new_mean[:, 2:4], 1.0)
+
+        return new_mean, new_covariance
+
+    def correct(
+        self,
+        mean: np.ndarray,
+        covariance: np.ndarray,
+        measurements: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Уточняет состояния по измерениям.
+
+        :param mean: Средние значения состояний (N, 8).
+        :param covariance: Ковариации состояний (N, 8, 8).
+        :param measurements: Измерения (N, 4).
+        :return: Уточненные средние значения и ковариации.
+        """
+        measurement_std: np.ndarray = np.repeat(
+            (self.position_noise_weight * mean[:, 3])[:, None], 4, axis=1
+        )
+        measurement_noise: np.ndarray = np.zeros((len(mean), 4, 4), dtype=np.float64)
+        measurement_noise[:, np.arange(4), np.arange(4)] = measurement_std ** 2
+
+        projected_covariance: np.ndarray = (
+            self.observation @ covariance @ self.observation.T + measurement_noise
+        )
+        gain: np.ndarray = covariance @ self.observation.T @ np.linalg.inv(projected_covariance)
+        innovation: np.ndarray = measurements - mean @ self.observation.T
+
+        new_mean: np.ndarray = mean + np.einsum("nij,nj->ni", gain, innovation)
+        new_covariance: np.ndarray = covariance - gain @ projected_covariance @ gain.transpose(0, 2, 1)
+
+        return new_mean, new_covariance
+
+    @staticmethod
+    def boxes_to_measurements(boxes: np.ndarray) -> np.ndarray:
+        """
+        Преобразует прямоугольники в измерения из центра, ширины и высоты.
+
+        :param boxes: Прямоугольники (N, 4) в формате x1, y1, x2, y2.
+        :return: Измерения (N, 4).
+        """
+        boxes = boxes.reshape(-1, 4).astype(np.float64)
+        return np.stack(
+            (
+                (boxes[:, 0] + boxes[:, 2]) / 2,
+                (boxes[:, 1] + boxes[:, 3]) / 2,
+                boxes[:, 2] - boxes[:, 0],
+                boxes[:, 3] - boxes[:, 1]
+            ),
+            axis=1
+        )
+
+    @staticmethod
+    def states_to_boxes(mean: np.ndarray) -> np.ndarray:
+        """
+        Преобразует состояния в прямоугольники.
+
+        :param mean: Средние значения состояний (N, 8).
+        :return: Прямоугольники (N, 4) в формате x1, y1, x2, y2.
+        """
+        half_sizes: np.ndarray = mean[:, 2:4] / 2
+        return np.concatenate((mean[:, :2] - half_sizes, mean[:, :2] + half_sizes), axis=1)
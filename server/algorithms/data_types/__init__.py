@@ -6,11 +6,15 @@ from .field_instance import FieldInstance
 from .frame_data import FrameData
 from .line import Line
 from .mask import Mask
+from .packed_mask import PackedMask
 from .player_data import PlayerData
 from .point import Point
+from .raw_detections import RawDetections
 from .raw_player_tracking_data import RawPlayerTrackingData
 from .relative_bounding_box import RelativeBoundingBox
 from .relative_point import RelativePoint
+from .tracking_checkpoint import TrackingCheckpoint
+from .wait_statistics import WaitStatistics
 from .image_typehint import CV_Image
 
 
@@ -19,6 +23,7 @@ __all__ = (
     "Detectron2Input",
     "Line",
     "Mask",
+    "PackedMask",
     "Point",
     "RelativeBoundingBox",
     "RelativePoint",
@@ -27,6 +32,9 @@ __all__ = (
     "FrameData",
     "DiskUsage",
     "PlayerData",
+    "RawDetections",
     "RawPlayerTrackingData",
+    "TrackingCheckpoint",
+    "WaitStatistics",
     "CV_Image"
 )
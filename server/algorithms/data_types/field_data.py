@@ -3,8 +3,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, TYPE_CHECKING
 
-import numpy
-
 from server.algorithms.data_types.bounding_box import BoundingBox
 from server.algorithms.data_types.field_instance import FieldInstance
 from server.algorithms.data_types.mask import Mask
@@ -49,7 +47,7 @@ class FieldData:
         for mask, center, box, classified_as in zip(masks, boxes_centers, boxes, classes_predicted):
             instance_data: FieldInstance = FieldInstance(
                 BoundingBox.calculate_combined_bbox(box.tolist()),
-                Mask((mask * 255).astype(numpy.uint8)),
+                Mask.from_binary_mask(mask),
                 Point(center[0], center[1]),
                 classified_as
             )
@@ -66,8 +64,8 @@ class FieldData:
                         output.field = FieldInstance(
                             new_bbox,
                             Mask.from_multiple_masks(
-                                instance_data.polygon.mask,
-                                output.field.polygon.mask
+                                instance_data.polygon,
+                                output.field.polygon
                             ),
                             new_center,
                             classified_as
@@ -92,8 +90,8 @@ class FieldData:
                         output.blue_circle = FieldInstance(
                             new_bbox,
                             Mask.from_multiple_masks(
-                                instance_data.polygon.mask,
-                                output.blue_circle.polygon.mask
+                                instance_data.polygon,
+                                output.blue_circle.polygon
                             ),
                             new_center,
                             classified_as
@@ -110,8 +108,8 @@ class FieldData:
                         output.red_center_line = FieldInstance(
                             new_bbox,
                             Mask.from_multiple_masks(
-                                instance_data.polygon.mask,
-                                output.red_center_line.polygon.mask
+                                instance_data.polygon,
+                                output.red_center_line.polygon
                             ),
                             new_center,
                             classified_as
@@ -147,8 +145,8 @@ class FieldData:
                             instance_data = FieldInstance(
                                 new_bbox,
                                 Mask.from_multiple_masks(
-                                    instance_data.polygon.mask,
-                                    zone.polygon.mask
+                                    instance_data.polygon,
+                                    zone.polygon
                                 ),
                                 new_center,
                                 classified_as
@@ -4,12 +4,14 @@ import typing
 from typing import NamedTuple, Optional, TYPE_CHECKING
 
 import cv2
+import numpy
 
 from server.algorithms.data_types.point import Point
 from server.algorithms.data_types.image_typehint import CV_Image
 
 if TYPE_CHECKING:
     from server.algorithms.data_types.bounding_box import BoundingBox
+    from server.algorithms.data_types.mask import Mask
 
 
 class Line(NamedTuple):
@@ -57,14 +59,24 @@ class Line(NamedTuple):
     @classmethod
     def find_lines(
         cls,
-        image: CV_Image
+        image: CV_Image | Mask
     ) -> Optional[Line]:
         """
         Находит линию на изображении с помощью алгоритма Hough Line из OpenCV.
 
-        :param image: Исходное изображение с выделенными границами.
+        Для маски поиск выполняется только в части с ненулевыми пикселями,
+        а линия строится на всю ширину изображения маски.
+
+        :param image: Исходное изображение с выделенными границами или маска.
         :return: Искомая линия, проходящая через точки на изображении или ничего.
         """
+        offset: Point = Point(0, 0)
+        cols: int = image.shape[1] if isinstance(image, numpy.ndarray) else image.frame_shape[1]
+
+        if not isinstance(image, numpy.ndarray):
+            # Padding keeps edges of mask touching the border of crop
+            image, offset = image.get_crop(padding=2)
+
         image = typing.cast(CV_Image, cv2.Canny(image, 50.0, 200.0))
         contours, hierarchy = cv2.findContours(image, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
 
@@ -72,8 +84,8 @@ class Line(NamedTuple):
             return None
 
         cnt = contours[0]
-        rows, cols = image.shape[:2]
-        [vx, vy, x, y] = cv2.fitLine(cnt, cv2.DIST_L2, 0, 0.01, 0.01)
+        vx, vy, x, y = cv2.fitLine(cnt, cv2.DIST_L2, 0, 0.01, 0.01).ravel().tolist()
+        x, y = x + offset.x, y + offset.y
         lefty = int((-x * vy / vx) + y)
         righty = int(((cols - x) * vy / vx) + y)
         return cls(Point(cols-1, righty), Point(0, lefty))
@@ -1,24 +1,142 @@
 from __future__ import annotations
 
 import typing
-from dataclasses import dataclass
 from typing import Optional
 
 import cv2
 import numpy
 import numpy as np
-from numpy._typing import _32Bit, _64Bit
 
+from server.algorithms.data_types.packed_mask import PackedMask
 from server.algorithms.data_types.point import Point
 from server.algorithms.data_types.image_typehint import CV_Image
 
 
-@dataclass
 class Mask:
     """
     Класс для хранения маски выделения из нейронной сети.
+
+    Хранится только часть маски внутри ограничивающего прямоугольника ненулевых пикселей
+    вместе с ее смещением и размером исходного изображения, операции над маской выполняются
+    над этой частью. Изображение маски полного размера создается только методом to_image.
     """
-    mask: CV_Image
+    crop: CV_Image
+    offset: tuple[int, int]
+    frame_shape: tuple[int, ...]
+
+    def __init__(self, mask: CV_Image):
+        """
+        :param mask: Маска в виде изображения полного размера.
+        """
+        top, bottom, left, right = self._nonzero_bounds(mask)
+        self.crop = mask[top:bottom, left:right].copy()
+        self.offset = (left, top)
+        self.frame_shape = tuple(mask.shape)
+
+    @classmethod
+    def from_crop(cls, crop: CV_Image, offset: tuple[int, int], frame_shape: tuple[int, ...]) -> Mask:
+        """
+        Создает маску из ее части.
+
+        :param crop: Часть маски.
+        :param offset: Координаты x, y левого верхнего угла части на изображении.
+        :param frame_shape: Размер изображения маски полного размера.
+        :return: Новая маска.
+        """
+        mask: Mask = cls.__new__(cls)
+        mask.crop = crop
+        mask.offset = offset
+        mask.frame_shape = tuple(frame_shape)
+        return mask
+
+    @classmethod
+    def from_binary_mask(cls, mask: numpy.ndarray) -> Mask:
+        """
+        Создает маску со значениями 0 и 255 из бинарной маски полного размера (например, выхода нейросети),
+        преобразуя только часть с ненулевыми пикселями.
+
+        :param mask: Бинарная маска.
+        :return: Новая маска.
+        """
+        top, bottom, left, right = cls._nonzero_bounds(mask)
+
+        return cls.from_crop(
+            typing.cast(CV_Image, (mask[top:bottom, left:right] > 0).astype(numpy.uint8) * 255),
+            (left, top),
+            mask.shape
+        )
+
+    def to_image(self) -> CV_Image:
+        """
+        Создает изображение маски полного размера (при каждом вызове выделяется новое изображение,
+        для операций над маской используется ее часть crop).
+
+        :return: Изображение маски.
+        """
+        image: CV_Image = typing.cast(CV_Image, numpy.zeros(self.frame_shape, dtype=self.crop.dtype))
+        left, top = self.offset
+        height, width = self.crop.shape[:2]
+        image[top:top + height, left:left + width] = self.crop
+        return image
+
+    def get_crop(self, padding: int = 0) -> tuple[CV_Image, Point]:
+        """
+        Получает часть маски с ненулевыми пикселями, дополненную нулями по краям.
+
+        :param padding: Количество нулевых пикселей с каждой стороны.
+        :return: Часть маски и координаты ее левого верхнего угла на изображении.
+        """
+        left, top = self.offset
+
+        if padding == 0:
+            return self.crop, Point(left, top)
+
+        padded: CV_Image = typing.cast(
+            CV_Image,
+            numpy.pad(
+                self.crop,
+                ((padding, padding), (padding, padding)) + ((0, 0),) * (self.crop.ndim - 2)
+            )
+        )
+        return padded, Point(left - padding, top - padding)
+
+    def resize(self, width: int, height: int) -> Mask:
+        """
+        Масштабирует маску под изображение другого разрешения, преобразуя только часть маски.
+
+        :param width: Ширина нового изображения.
+        :param height: Высота нового изображения.
+        :return: Новая маска или текущая маска, если разрешение совпадает.
+        """
+        frame_height, frame_width = self.frame_shape[:2]
+        new_frame_shape: tuple[int, ...] = (height, width) + self.frame_shape[2:]
+
+        if (frame_width, frame_height) == (width, height):
+            return self
+
+        if self.crop.size == 0:
+            return Mask.from_crop(
+                typing.cast(CV_Image, self.crop[:0, :0].copy()), (0, 0), new_frame_shape
+            )
+
+        scale_x: float = width / frame_width
+        scale_y: float = height / frame_height
+        left, top = self.offset
+        crop_height, crop_width = self.crop.shape[:2]
+
+        # Part of the mask covers the same relative area of the image
+        new_left: int = int(left * scale_x)
+        new_top: int = int(top * scale_y)
+        new_right: int = min(max(round((left + crop_width) * scale_x), new_left + 1), width)
+        new_bottom: int = min(max(round((top + crop_height) * scale_y), new_top + 1), height)
+
+        new_crop: CV_Image = typing.cast(
+            CV_Image,
+            cv2.resize(
+                self.crop, (new_right - new_left, new_bottom - new_top), interpolation=cv2.INTER_NEAREST
+            ).reshape((new_bottom - new_top, new_right - new_left) + self.crop.shape[2:])
+        )
+        return Mask.from_crop(new_crop, (new_left, new_top), new_frame_shape)
 
     def visualize_mask(self) -> CV_Image:
         """
@@ -26,7 +144,7 @@ class Mask:
 
         :return:
         """
-        return self.mask.astype(numpy.uint8)
+        return self.to_image().astype(numpy.uint8)
 
     def expand_mask(self, kernel: Optional[CV_Image] = None) -> Mask:
         """
@@ -40,8 +158,26 @@ class Mask:
             # Expand mask by 10 pixels on each side
             kernel = numpy.ones((21, 21), numpy.uint8)
 
-        new_mask: CV_Image = typing.cast(CV_Image, cv2.dilate(self.mask, kernel, iterations=1))
-        return Mask(mask=new_mask)
+        if self.crop.size == 0:
+            return Mask.from_crop(self.crop, self.offset, self.frame_shape)
+
+        # Crop grows by kernel radius, but stays inside of image
+        frame_height, frame_width = self.frame_shape[:2]
+        left, top = self.offset
+        height, width = self.crop.shape[:2]
+        radius_y, radius_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+        new_left, new_top = max(left - radius_x, 0), max(top - radius_y, 0)
+        new_right = min(left + width + radius_x, frame_width)
+        new_bottom = min(top + height + radius_y, frame_height)
+
+        expanded: CV_Image = typing.cast(
+            CV_Image,
+            numpy.zeros((new_bottom - new_top, new_right - new_left) + self.crop.shape[2:], dtype=self.crop.dtype)
+        )
+        expanded[top - new_top:top - new_top + height, left - new_left:left - new_left + width] = self.crop
+
+        new_crop: CV_Image = typing.cast(CV_Image, cv2.dilate(expanded, kernel, iterations=1))
+        return Mask.from_crop(new_crop, (new_left, new_top), self.frame_shape)
 
     def check_points_are_in_mask_area(self, *points: Point) -> list[bool]:
         """
@@ -50,42 +186,162 @@ class Mask:
         :param points: Точки в абсолютных координатах маски.
         :return: Список точек, находящихся в маске.
         """
-        keep_list = [
-            bool(self.mask[int(p.y)-1, int(p.x)-1] > 0) for p in points
-        ]
+        frame_height, frame_width = self.frame_shape[:2]
+        left, top = self.offset
+        height, width = self.crop.shape[:2]
+        keep_list: list[bool] = []
+
+        for p in points:
+            y: int = (int(p.y) - 1) % frame_height - top
+            x: int = (int(p.x) - 1) % frame_width - left
+
+            keep_list.append(
+                0 <= y < height and 0 <= x < width and bool(numpy.any(self.crop[y, x] > 0))
+            )
+
         return keep_list
 
+    def contains_points(self, x: numpy.ndarray, y: numpy.ndarray) -> numpy.ndarray:
+        """
+        Проверяет нахождение точек на маске одной операцией над массивом.
+
+        :param x: Координаты x точек в пикселях изображения (N,).
+        :param y: Координаты y точек в пикселях изображения (N,).
+        :return: Находится ли каждая точка на маске (N,).
+        """
+        left, top = self.offset
+        height, width = self.crop.shape[:2]
+        rows: numpy.ndarray = numpy.asarray(y, dtype=numpy.int64) - top
+        columns: numpy.ndarray = numpy.asarray(x, dtype=numpy.int64) - left
+
+        inside: numpy.ndarray = (0 <= rows) & (rows < height) & (0 <= columns) & (columns < width)
+        result: numpy.ndarray = numpy.zeros(rows.shape, dtype=bool)
+        values: numpy.ndarray = self.crop[rows[inside], columns[inside]] > 0
+        result[inside] = values.any(axis=1) if values.ndim > 1 else values
+
+        return result
+
     def get_corners_of_mask(self) -> tuple[Point, Point]:
         """
         Получает координаты по углам маски.
 
         :return: Координаты верхней левой и нижней правой точки маски.
+        :raise ValueError: Маска пустая.
+        """
+        top, bottom, left, right = self._nonzero_bounds(self.crop)
+
+        if bottom == top:
+            raise ValueError("Mask is empty")
+
+        offset_x, offset_y = self.offset
+        return (
+            Point(x=left + offset_x, y=top + offset_y),
+            Point(x=right - 1 + offset_x, y=bottom - 1 + offset_y)
+        )
+
+    def get_padded_region(self, padding: int = 0) -> tuple[int, int, int, int]:
+        """
+        Получает область изображения вокруг маски, расширенную на padding пикселей и ограниченную
+        размером изображения.
+
+        :param padding: Количество пикселей, добавляемых с каждой стороны.
+        :return: Границы области left, top, right, bottom (right и bottom не включаются).
+        :raise ValueError: Маска пустая.
+        """
+        top_left, bottom_right = self.get_corners_of_mask()
+        frame_height, frame_width = self.frame_shape[:2]
+
+        return (
+            max(int(top_left.x) - padding, 0),
+            max(int(top_left.y) - padding, 0),
+            min(int(bottom_right.x) + 1 + padding, frame_width),
+            min(int(bottom_right.y) + 1 + padding, frame_height)
+        )
+
+    def pack(self) -> PackedMask:
         """
-        points:  numpy.ndarray[
-            tuple[int, ...],
-            numpy.dtype[numpy.signedinteger[_32Bit | _64Bit]]
-        ] = np.argwhere(self.mask > 0)
+        Упаковывает бинарную маску по битам (ненулевые пиксели считаются частью маски).
 
-        top_left_y, top_left_x, *_ = points.min(axis=0)
-        bottom_right_y, bottom_right_x, *_ = points.max(axis=0)
+        :return: Упакованная маска.
+        """
+        binary: numpy.ndarray = self.crop > 0
+        if binary.ndim > 2:
+            binary = numpy.any(binary, axis=2)
+
+        return PackedMask(
+            numpy.packbits(binary, axis=None),
+            (binary.shape[0], binary.shape[1]),
+            self.offset,
+            (self.frame_shape[0], self.frame_shape[1])
+        )
+
+    @classmethod
+    def unpack(cls, packed: PackedMask) -> Mask:
+        """
+        Восстанавливает маску со значениями 0 и 255 из упакованного вида.
 
-        return Point(x=top_left_x, y=top_left_y), Point(x=bottom_right_x, y=bottom_right_y)
+        :param packed: Упакованная маска.
+        :return: Новая маска.
+        """
+        height, width = packed.crop_shape
+        binary: numpy.ndarray = numpy.unpackbits(
+            packed.bits, count=height * width
+        ).reshape(height, width)
+
+        return cls.from_crop(
+            typing.cast(CV_Image, binary * numpy.uint8(255)), packed.offset, packed.frame_shape
+        )
 
     @classmethod
-    def from_multiple_masks(cls, *masks: CV_Image) -> Mask:
+    def from_multiple_masks(cls, *masks: Mask) -> Mask:
         """
         Генерирует объединенную маску из нескольких масок.
 
-        :param masks: Маски в формате единиц или нулей единообразного размера.
+        :param masks: Маски с изображениями единообразного размера.
         :return: Новая объединенная маска.
         :raise ValueError: Если передано меньше одной маски для объединения.
         """
         if len(masks) < 1:
             raise ValueError("Must provide at least 1 mask")
 
-        return Mask(
-            numpy.sum(
-                numpy.ndarray(masks),
-                axis=0
-            ).astype(numpy.uint8)
+        filled: list[Mask] = [mask for mask in masks if mask.crop.size > 0]
+        if not filled:
+            return cls.from_crop(masks[0].crop, masks[0].offset, masks[0].frame_shape)
+
+        left: int = min(mask.offset[0] for mask in filled)
+        top: int = min(mask.offset[1] for mask in filled)
+        right: int = max(mask.offset[0] + mask.crop.shape[1] for mask in filled)
+        bottom: int = max(mask.offset[1] + mask.crop.shape[0] for mask in filled)
+
+        union: CV_Image = typing.cast(
+            CV_Image,
+            numpy.zeros((bottom - top, right - left) + filled[0].crop.shape[2:], dtype=filled[0].crop.dtype)
         )
+
+        for mask in filled:
+            mask_left, mask_top = mask.offset[0] - left, mask.offset[1] - top
+            height, width = mask.crop.shape[:2]
+            region: CV_Image = union[mask_top:mask_top + height, mask_left:mask_left + width]
+            numpy.maximum(region, mask.crop, out=region)
+
+        return cls.from_crop(union, (left, top), masks[0].frame_shape)
+
+    @staticmethod
+    def _nonzero_bounds(image: numpy.ndarray) -> tuple[int, int, int, int]:
+        """
+        Находит ограничивающий прямоугольник ненулевых пикселей изображения.
+
+        :param image: Изображение.
+        :return: Границы строк и столбцов [top, bottom) и [left, right) или нули для пустого изображения.
+        """
+        nonzero: numpy.ndarray = image != 0
+        if nonzero.ndim > 2:
+            nonzero = numpy.any(nonzero, axis=2)
+
+        rows: numpy.ndarray = np.flatnonzero(nonzero.any(axis=1))
+        columns: numpy.ndarray = np.flatnonzero(nonzero.any(axis=0))
+
+        if len(rows) == 0:
+            return 0, 0, 0, 0
+
+        return int(rows[0]), int(rows[-1]) + 1, int(columns[0]), int(columns[-1]) + 1
@@ -0,0 +1,13 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class PackedMask(NamedTuple):
+    """
+    Бинарная маска в упакованном по битам виде для хранения.
+    """
+    bits: np.ndarray
+    crop_shape: tuple[int, int]
+    offset: tuple[int, int]
+    frame_shape: tuple[int, int]
@@ -0,0 +1,13 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class RawDetections(NamedTuple):
+    """
+    Выделения нейросети на одном кадре в компактном виде для хранения.
+    """
+    boxes: np.ndarray
+    scores: np.ndarray
+    classes: np.ndarray
+    image_size: tuple[int, int]
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import NamedTuple, TYPE_CHECKING
+
+from server.algorithms.enums.team import Team
+
+if TYPE_CHECKING:
+    from server.algorithms.player_tracker import PlayerTracker
+
+
+class TrackingCheckpoint(NamedTuple):
+    """
+    Состояние обработки видео после последней сохраненной в БД части кадров.
+    """
+
+    # Номер первого кадра, данные которого не сохранены
+    next_frame_id: int
+    # Отпечаток параметров обработки, с которыми получено состояние
+    run_fingerprint: str
+    player_tracker: PlayerTracker
+    known_tracked_players_teams: dict[int, Team]
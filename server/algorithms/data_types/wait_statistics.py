@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class WaitStatistics:
+    """
+    Накопленная статистика времени ожидания задач в очереди.
+    """
+    count: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    @property
+    def average_wait_time(self) -> float:
+        """
+        Среднее время ожидания в секундах.
+
+        :return: Среднее время ожидания или 0, если задач не было.
+        """
+        if self.count == 0:
+            return 0.0
+
+        return self.total_wait_time / self.count
+
+    def add(self, wait_time: float) -> None:
+        """
+        Учитывает время ожидания очередной задачи.
+
+        :param wait_time: Время ожидания в секундах.
+        :return: Ничего.
+        """
+        self.count += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
@@ -0,0 +1,326 @@
+import asyncio
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from server.algorithms.data_types import RawDetections
+from server.utils.file_hash import hash_file
+
+
+class VideoDetectionCache:
+    """
+    Хранит выделения нейросети для кадров одного видео, полученные одной моделью.
+
+    Кадры хранятся на диске частями по chunk_size кадров в формате npz,
+    в памяти удерживается несколько последних использованных частей. Чтение и запись частей
+    выполняются в отдельном потоке, чтобы не останавливать асинхронный цикл.
+    """
+
+    def __init__(self, directory: Path, chunk_size: int = 256, max_loaded_chunks: int = 4):
+        """
+        :param directory: Папка хранения частей кэша.
+        :param chunk_size: Количество кадров в одной части.
+        :param max_loaded_chunks: Количество частей, удерживаемых в памяти.
+        """
+        self.directory: Path = directory
+        self.chunk_size: int = chunk_size
+        self.max_loaded_chunks: int = max_loaded_chunks
+        self._chunks: OrderedDict[int, dict[int, RawDetections]] = OrderedDict()
+        self._dirty_chunks: set[int] = set()
+        # Части, созданные добавлением кадров без чтения файла части
+        self._unmerged_chunks: set[int] = set()
+        self._writes: dict[int, asyncio.Task[None]] = {}
+
+    async def get(self, frame_id: int) -> Optional[RawDetections]:
+        """
+        Получает выделения на кадре из кэша.
+
+        :param frame_id: Номер кадра.
+        :return: Выделения на кадре или None, если кадр не обрабатывался.
+        """
+        return (await self._load_chunk(frame_id // self.chunk_size)).get(frame_id)
+
+    def put(self, frame_id: int, detections: RawDetections) -> None:
+        """
+        Добавляет выделения на кадре в кэш без обращения к диску.
+
+        :param frame_id: Номер кадра.
+        :param detections: Выделения на кадре.
+        :return: Ничего.
+        """
+        chunk_id: int = frame_id // self.chunk_size
+
+        if chunk_id not in self._chunks:
+            # Frames stored on disk are merged when the chunk is read or written
+            self._chunks[chunk_id] = {}
+            self._unmerged_chunks.add(chunk_id)
+
+        self._chunks.move_to_end(chunk_id)
+        self._chunks[chunk_id][frame_id] = detections
+        self._dirty_chunks.add(chunk_id)
+        self._evict_chunks()
+
+    async def flush(self) -> None:
+        """
+        Записывает измененные части кэша на диск.
+
+        :return: Ничего.
+        """
+        for chunk_id in list(self._dirty_chunks):
+            self._schedule_write(chunk_id)
+
+        await asyncio.gather(*self._writes.values())
+
+    def _chunk_path(self, chunk_id: int) -> Path:
+        return self.directory / f"chunk_{chunk_id:06d}.npz"
+
+    async def _load_chunk(self, chunk_id: int) -> dict[int, RawDetections]:
+        """
+        Получает часть кэша из памяти или с диска.
+
+        :param chunk_id: Номер части.
+        :return: Выделения по номерам кадров части.
+        """
+        if chunk_id in self._chunks and chunk_id not in self._unmerged_chunks:
+            self._chunks.move_to_end(chunk_id)
+            return self._chunks[chunk_id]
+
+        # File of the chunk is read only after its last version is written
+        if (write := self._writes.get(chunk_id)) is not None:
+            await write
+
+        stored_chunk: dict[int, RawDetections] = await asyncio.get_running_loop().run_in_executor(
+            None, self._read_chunk, self._chunk_path(chunk_id)
+        )
+
+        if chunk_id in self._chunks:
+            # Frames added while reading replace stored ones
+            stored_chunk.update(self._chunks[chunk_id])
+            self._unmerged_chunks.discard(chunk_id)
+
+        elif chunk_id in self._writes:
+            # Chunk was evicted while reading, so its last version is merged on the next read or write
+            self._unmerged_chunks.add(chunk_id)
+
+        self._chunks[chunk_id] = stored_chunk
+        self._chunks.move_to_end(chunk_id)
+        self._evict_chunks()
+        return stored_chunk
+
+    def _evict_chunks(self) -> None:
+        """
+        Удаляет из памяти давно не использованные части, записывая измененные части на диск.
+
+        :return: Ничего.
+        """
+        while len(self._chunks) > self.max_loaded_chunks:
+            evicted_chunk_id: int = next(iter(self._chunks))
+
+            if evicted_chunk_id in self._dirty_chunks:
+                self._schedule_write(evicted_chunk_id)
+
+            del self._chunks[evicted_chunk_id]
+            self._unmerged_chunks.discard(evicted_chunk_id)
+
+    def _schedule_write(self, chunk_id: int) -> None:
+        """
+        Запускает запись текущего состояния части на диск после завершения предыдущей записи части.
+
+        :param chunk_id: Номер части.
+        :return: Ничего.
+        """
+        chunk: dict[int, RawDetections] = dict(self._chunks[chunk_id])
+        is_merged: bool = chunk_id not in self._unmerged_chunks
+        previous_write: Optional[asyncio.Task[None]] = self._writes.get(chunk_id)
+        self._dirty_chunks.discard(chunk_id)
+
+        async def write() -> None:
+            if previous_write is not None:
+                await previous_write
+
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_chunk, self._chunk_path(chunk_id), chunk, is_merged
+            )
+
+        task: asyncio.Task[None] = asyncio.get_running_loop().create_task(write())
+        self._writes[chunk_id] = task
+        task.add_done_callback(
+            lambda done: self._writes.pop(chunk_id) if self._writes.get(chunk_id) is done else None
+        )
+
+    @classmethod
+    def _write_chunk(cls, chunk_path: Path, chunk: dict[int, RawDetections], is_merged: bool = True) -> None:
+        """
+        Записывает часть кэша на диск с заменой предыдущей версии файла.
+
+        :param chunk_path: Путь до файла части.
+        :param chunk: Выделения по номерам кадров части.
+        :param is_merged: Содержит ли часть кадры, сохраненные в файле ранее.
+        :return: Ничего.
+        """
+        if not is_merged:
+            chunk = {**cls._read_chunk(chunk_path), **chunk}
+
+        frame_ids: list[int] = sorted(chunk)
+        counts: list[int] = [len(chunk[frame_id].scores) for frame_id in frame_ids]
+
+        chunk_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = chunk_path.with_suffix(".tmp")
+
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                frame_ids=np.array(frame_ids, dtype=np.int64),
+                offsets=np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+                image_sizes=np.array(
+                    [chunk[frame_id].image_size for frame_id in frame_ids], dtype=np.int32
+                ).reshape(-1, 2),
+                boxes=np.concatenate(
+                    [chunk[frame_id].boxes for frame_id in frame_ids] or [np.zeros((0, 4))]
+                ).astype(np.float32).reshape(-1, 4),
+                scores=np.concatenate(
+                    [chunk[frame_id].scores for frame_id in frame_ids] or [np.zeros(0)]
+                ).astype(np.float32),
+                classes=np.concatenate(
+                    [chunk[frame_id].classes for frame_id in frame_ids] or [np.zeros(0)]
+                ).astype(np.uint8)
+            )
+
+        os.replace(tmp_path, chunk_path)
+
+    @classmethod
+    def _read_chunk(cls, chunk_path: Path) -> dict[int, RawDetections]:
+        """
+        Читает часть кэша с диска, если она сохранена.
+
+        :param chunk_path: Путь до файла части.
+        :return: Выделения по номерам кадров части (пустые, если часть отсутствует или повреждена).
+        """
+        if not chunk_path.is_file():
+            return {}
+
+        try:
+            return cls._read_chunk_file(chunk_path)
+
+        except (OSError, ValueError, KeyError):
+            # Поврежденная часть кэша считается отсутствующей
+            return {}
+
+    @staticmethod
+    def _read_chunk_file(chunk_path: Path) -> dict[int, RawDetections]:
+        """
+        Читает часть кэша с диска.
+
+        :param chunk_path: Путь до файла части.
+        :return: Выделения по номерам кадров части.
+        """
+        with np.load(chunk_path) as data:
+            frame_ids: np.ndarray = data["frame_ids"]
+            offsets: np.ndarray = data["offsets"]
+            image_sizes: np.ndarray = data["image_sizes"]
+            boxes: np.ndarray = data["boxes"]
+            scores: np.ndarray = data["scores"].astype(np.float32)
+            classes: np.ndarray = data["classes"].astype(np.int64)
+
+        return {
+            int(frame_id): RawDetections(
+                boxes[offsets[n]:offsets[n + 1]],
+                scores[offsets[n]:offsets[n + 1]],
+                classes[offsets[n]:offsets[n + 1]],
+                (int(image_sizes[n][0]), int(image_sizes[n][1]))
+            )
+            for n, frame_id in enumerate(frame_ids)
+        }
+
+
+class DetectionCache:
+    """
+    Постоянный кэш выделений нейросети по кадрам, сгруппированный по хешу
+    содержимого видео и отпечатку модели.
+
+    При превышении объема кэша удаляются кэши видео, которые дольше всего не открывались.
+    """
+
+    def __init__(self, directory: Path, chunk_size: int = 256, max_size: int = 0):
+        """
+        :param directory: Корневая папка кэша.
+        :param chunk_size: Количество кадров в одной части кэша.
+        :param max_size: Максимальный объем кэша на диске в байтах (0 - без ограничения).
+        """
+        self.directory: Path = directory
+        self.chunk_size: int = chunk_size
+        self.max_size: int = max_size
+        self._video_hashes: dict[tuple[Path, int, int], str] = {}
+
+    async def open_video_cache(self, video_path: Path, model_fingerprint: str) -> VideoDetectionCache:
+        """
+        Открывает кэш выделений для видео.
+
+        :param video_path: Путь до видео, по содержимому которого ищется кэш.
+        :param model_fingerprint: Отпечаток весов и параметров модели.
+        :return: Кэш выделений видео.
+        """
+        video_hash: str = await self.get_video_hash(video_path)
+        cache_directory: Path = self.directory / video_hash / model_fingerprint
+
+        await asyncio.get_running_loop().run_in_executor(None, self._touch_and_prune, cache_directory)
+        return VideoDetectionCache(cache_directory, self.chunk_size)
+
+    def _touch_and_prune(self, cache_directory: Path) -> None:
+        """
+        Отмечает время использования кэша видео и удаляет давно не использованные кэши,
+        пока объем кэша превышает максимальный.
+
+        :param cache_directory: Папка открываемого кэша видео.
+        :return: Ничего.
+        """
+        cache_directory.mkdir(parents=True, exist_ok=True)
+        os.utime(cache_directory)
+
+        if self.max_size <= 0:
+            return
+
+        cache_sizes: list[tuple[int, Path, int]] = [
+            (
+                directory.stat().st_mtime_ns,
+                directory,
+                sum(file.stat().st_size for file in directory.iterdir() if file.is_file())
+            )
+            for directory in self.directory.glob("*/*") if directory.is_dir()
+        ]
+        total_size: int = sum(size for _, _, size in cache_sizes)
+
+        for _, directory, size in sorted(cache_sizes):
+            if total_size <= self.max_size:
+                break
+
+            if directory == cache_directory:
+                continue
+
+            shutil.rmtree(directory, ignore_errors=True)
+            total_size -= size
+
+            if not any(directory.parent.iterdir()):
+                directory.parent.rmdir()
+
+    async def get_video_hash(self, video_path: Path) -> str:
+        """
+        Получает хеш содержимого видео, вычисляя его однократно для неизменного файла.
+
+        :param video_path: Путь до видео.
+        :return: Хеш содержимого видео.
+        """
+        stat: os.stat_result = video_path.stat()
+        key: tuple[Path, int, int] = (video_path.resolve(), stat.st_size, stat.st_mtime_ns)
+
+        if (video_hash := self._video_hashes.get(key)) is None:
+            video_hash = await asyncio.get_running_loop().run_in_executor(
+                None, hash_file, video_path
+            )
+            self._video_hashes[key] = video_hash
+
+        return video_hash
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from asyncio import Future
+from typing import AsyncGenerator, Iterator
+
+from server.algorithms.data_types.wait_statistics import WaitStatistics
+from server.algorithms.enums.inference_priority import InferencePriority
+
+
+class DeviceScheduler:
+    """
+    Распределяет доступ к устройству обработки нейросетей между сервисами
+    с учетом приоритета задач.
+
+    В отличие от asyncio.Lock, при освобождении устройство передается ожидающему
+    с наивысшим приоритетом, а при равном приоритете - в порядке очереди.
+    """
+
+    def __init__(self) -> None:
+        self._locked: bool = False
+        self._waiters: list[tuple[InferencePriority, int, Future[None]]] = []
+        self._counter: Iterator[int] = itertools.count()
+        self.wait_statistics: dict[InferencePriority, WaitStatistics] = {
+            priority: WaitStatistics() for priority in InferencePriority
+        }
+
+    def locked(self) -> bool:
+        """
+        Проверяет, занято ли устройство.
+
+        :return: Занято ли устройство.
+        """
+        return self._locked
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self, priority: InferencePriority = InferencePriority.Interactive
+    ) -> AsyncGenerator[None, None]:
+        """
+        Захватывает устройство обработки на время выполнения контекста.
+
+        :param priority: Приоритет задачи.
+        :return: Контекстный менеджер владения устройством.
+        """
+        started_at: float = time.perf_counter()
+
+        if self._locked or self._waiters:
+            waiter: Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._counter), waiter))
+
+            try:
+                await waiter
+
+            except asyncio.CancelledError:
+                # Устройство уже было передано этой задаче
+                if not waiter.cancelled():
+                    self._release()
+
+                raise
+
+        else:
+            self._locked = True
+
+        self.wait_statistics[priority].add(time.perf_counter() - started_at)
+
+        try:
+            yield
+
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """
+        Передает устройство следующему ожидающему или освобождает его.
+
+        :return: Ничего.
+        """
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+
+            if not waiter.done():
+                # Владение передается без освобождения блокировки
+                waiter.set_result(None)
+                return
+
+        self._locked = False
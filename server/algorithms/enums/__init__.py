@@ -1,7 +1,10 @@
 from .camera_position import CameraPosition
 from .field_classes_enum import FieldClasses
+from .inference_backend_type import InferenceBackendType
+from .inference_priority import InferencePriority
 from .player_classes_enum import PlayerClasses
 from .team import Team
+from .tracker_type import TrackerType
 from .coordinate_split import VerticalPosition, HorizontalPosition
 
 
@@ -9,7 +12,10 @@ __all__ = (
     "CameraPosition",
     "PlayerClasses",
     "FieldClasses",
+    "InferenceBackendType",
+    "InferencePriority",
     "Team",
+    "TrackerType",
     "VerticalPosition",
     "HorizontalPosition"
 )
@@ -0,0 +1,12 @@
+from enum import StrEnum
+
+
+class InferenceBackendType(StrEnum):
+    """
+    Способ выполнения моделей detectron2.
+    """
+    Eager = "eager"
+    TorchCompile = "torch_compile"
+    TorchScript = "torchscript"
+    OnnxRuntime = "onnxruntime"
+    OpenVINO = "openvino"
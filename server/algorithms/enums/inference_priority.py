@@ -0,0 +1,9 @@
+from server.algorithms.enums.openapi_int_enum import OpenAPIIntEnum
+
+
+class InferencePriority(OpenAPIIntEnum):
+    """
+    Класс приоритета задач обработки нейросетью (меньшее значение обрабатывается раньше).
+    """
+    Interactive = 0, "Запросы, ожидаемые пользователем в реальном времени"
+    Bulk = 1, "Фоновая обработка видео"
@@ -0,0 +1,10 @@
+from enum import StrEnum
+
+
+class TrackerType(StrEnum):
+    """
+    Алгоритм отслеживания идентичности игроков между кадрами.
+    """
+    Sort = "sort"
+    IoU = "iou"
+    ByteTrack = "bytetrack"
@@ -1,5 +1,6 @@
 from .anchor_point_required import AnchorPointRequired
 from .invalid_allocation_overproposition_factor import InvalidAllocationOverPropositionFactor
+from .inference_backend_unavailable import InferenceBackendUnavailable
 from .invalid_allocation_size import InvalidAllocationSize
 from .invalid_file_format import InvalidFileFormat
 from .not_enough_field_points import NotEnoughFieldPoints
@@ -11,5 +12,6 @@ __all__ = (
     "InvalidFileFormat",
     "InvalidAllocationSize",
     "InvalidAllocationOverPropositionFactor",
-    "OutOfDiskSpace"
+    "OutOfDiskSpace",
+    "InferenceBackendUnavailable"
 )
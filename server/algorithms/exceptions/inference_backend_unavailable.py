@@ -0,0 +1,5 @@
+class InferenceBackendUnavailable(RuntimeError):
+    """
+    Ошибка при невозможности использовать выбранный способ выполнения нейросети
+    (не установлена библиотека или не экспортирована модель).
+    """
@@ -0,0 +1,61 @@
+from typing import Optional
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from server.algorithms.data_types import BoundingBox, Mask
+
+
+def filter_detections_on_field(
+    boxes: Tensor,
+    scores: Tensor,
+    classes: Tensor,
+    field_mask: np.ndarray | Mask,
+    score_threshold: float = 0.5,
+    field_bbox: Optional[BoundingBox] = None
+) -> np.ndarray:
+    """
+    Отбирает выделения игроков, уверенные и находящиеся на поле, и подготавливает их
+    для алгоритма отслеживания.
+
+    Отбор по уверенности выполняется на устройстве нейросети до копирования в память процессора,
+    проверка по маске поля - одной операцией над массивом, без перебора игроков.
+
+    :param boxes: Охватывающие прямоугольники игроков (N, 4) в формате x1, y1, x2, y2.
+    :param scores: Оценки уверенности в выделениях (N,).
+    :param classes: Предсказанные классы игроков (N,).
+    :param field_mask: Маска поля (или одноканальное изображение маски), ненулевая на поле.
+    :param score_threshold: Минимальная уверенность в выделении.
+    :param field_bbox: Дополнительная область, в которой должна находиться нижняя точка игрока.
+    :return: Массив (M, 6) из прямоугольника, уверенности и класса отобранных игроков.
+    """
+    confident: Tensor = scores > score_threshold
+    detections: np.ndarray = torch.cat(
+        (
+            boxes[confident].to(torch.float32),
+            scores[confident, None].to(torch.float32),
+            classes[confident, None].to(torch.float32)
+        ),
+        dim=1
+    ).cpu().numpy().astype(np.float64)
+
+    # Нижняя центральная точка игрока должна находиться на поле
+    x_centers: np.ndarray = (detections[:, 0] + detections[:, 2]) / 2
+    y_bottoms: np.ndarray = detections[:, 3]
+    height, width = field_mask.shape[:2] if isinstance(field_mask, np.ndarray) else field_mask.frame_shape[:2]
+
+    rows: np.ndarray = np.clip(y_bottoms.astype(np.int64) - 1, 0, height - 1)
+    columns: np.ndarray = np.clip(x_centers.astype(np.int64) - 1, 0, width - 1)
+    keep: np.ndarray = (
+        field_mask[rows, columns] > 0 if isinstance(field_mask, np.ndarray)
+        else field_mask.contains_points(columns, rows)
+    )
+
+    if field_bbox is not None:
+        keep &= (
+            (field_bbox.min_point.x <= x_centers) & (x_centers <= field_bbox.max_point.x) &
+            (field_bbox.min_point.y <= y_bottoms) & (y_bottoms <= field_bbox.max_point.y)
+        )
+
+    return detections[keep]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from server.algorithms.data_types import CV_Image
+
+if TYPE_CHECKING:
+    from detectron2.structures import Instances
+
+
+class FieldInferenceCache:
+    """
+    Хранит в памяти кадры видео и выделения нейросети поля на них по временной метке кадра.
+
+    Повторный поиск ключевых точек на том же кадре (например, с другой опорной точкой
+    или положением камеры) не требует извлечения кадра и запуска нейросети.
+    Давно не использованные записи вытесняются.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        """
+        :param max_entries: Количество удерживаемых в памяти кадров (0 - кэш отключен).
+        """
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict[tuple[Path, int, int, float], tuple[CV_Image, Instances]] = OrderedDict()
+
+    def get(self, video_path: Path, timestamp: float) -> Optional[tuple[CV_Image, Instances]]:
+        """
+        Получает кадр и выделения поля на нем из кэша.
+
+        :param video_path: Путь до видео.
+        :param timestamp: Временная метка кадра в секундах.
+        :return: Кадр и выделения нейросети на CPU или None, если кадр не обрабатывался.
+        """
+        key: Optional[tuple[Path, int, int, float]] = self._key(video_path, timestamp)
+
+        if key is None or key not in self._entries:
+            return None
+
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, video_path: Path, timestamp: float, frame: CV_Image, field_elements: Instances) -> None:
+        """
+        Добавляет кадр и выделения поля на нем в кэш.
+
+        :param video_path: Путь до видео.
+        :param timestamp: Временная метка кадра в секундах.
+        :param frame: Кадр видео.
+        :param field_elements: Выделения нейросети на CPU.
+        :return: Ничего.
+        """
+        key: Optional[tuple[Path, int, int, float]] = self._key(video_path, timestamp)
+
+        if key is None or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (frame, field_elements)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _key(video_path: Path, timestamp: float) -> Optional[tuple[Path, int, int, float]]:
+        """
+        Получает ключ записи, который меняется при изменении файла видео.
+
+        :param video_path: Путь до видео.
+        :param timestamp: Временная метка кадра в секундах.
+        :return: Ключ записи или None, если файл не найден.
+        """
+        try:
+            stat: os.stat_result = video_path.stat()
+
+        except OSError:
+            return None
+
+        # Frame is extracted with millisecond precision
+        return video_path.resolve(), stat.st_size, stat.st_mtime_ns, round(timestamp, 3)
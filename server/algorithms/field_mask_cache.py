@@ -0,0 +1,166 @@
+import asyncio
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, cast
+
+import cv2
+import numpy as np
+
+from server.algorithms.data_types import CV_Image, Mask
+
+# Маска поля хранится в PNG с одним битом на пиксель без потерь
+FIELD_MASK_FILE_NAME: str = "field_mask.png"
+# Маска поля, сохраненная предыдущими версиями сервера со сжатием с потерями
+LEGACY_FIELD_MASK_FILE_NAME: str = "field_mask.jpeg"
+
+
+class FieldMaskCache:
+    """
+    Хранит маски поля видео на диске без потерь и удерживает загруженные маски в памяти.
+
+    Маска загружается с диска только при первом обращении или после изменения файла,
+    давно не использованные маски вытесняются.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        """
+        :param max_entries: Количество удерживаемых в памяти масок.
+        """
+        self.max_entries: int = max_entries
+        self._masks: OrderedDict[Path, tuple[tuple[int, int], Mask]] = OrderedDict()
+
+    @staticmethod
+    def get_mask_path(video_directory: Path) -> Path:
+        """
+        Получает путь до файла маски поля видео, учитывая маски, сохраненные в прежнем формате.
+
+        :param video_directory: Папка файлов видео.
+        :return: Путь до существующего файла маски или до файла, в который маска сохраняется.
+        """
+        mask_path: Path = video_directory / FIELD_MASK_FILE_NAME
+        legacy_mask_path: Path = video_directory / LEGACY_FIELD_MASK_FILE_NAME
+
+        if not mask_path.is_file() and legacy_mask_path.is_file():
+            return legacy_mask_path
+
+        return mask_path
+
+    async def load(self, mask_path: Path) -> Mask:
+        """
+        Получает маску поля, читая файл только при его изменении.
+
+        :param mask_path: Путь до файла маски.
+        :return: Одноканальная маска поля со значениями 0 и 255.
+        :raise FileNotFoundError: Файл маски не найден или не читается.
+        """
+        key: Path = mask_path.resolve()
+        version: tuple[int, int] = self._get_file_version(mask_path)
+        cached: Optional[tuple[tuple[int, int], Mask]] = self._masks.get(key)
+
+        if cached is not None and cached[0] == version:
+            self._masks.move_to_end(key)
+            return cached[1]
+
+        mask: Mask = await asyncio.get_running_loop().run_in_executor(
+            None, self._read_mask, mask_path
+        )
+        self._put(key, version, mask)
+        return mask
+
+    async def save(self, video_directory: Path, mask: Mask) -> Path:
+        """
+        Сохраняет маску поля видео без потерь с заменой предыдущей версии файла.
+
+        :param video_directory: Папка файлов видео.
+        :param mask: Маска поля.
+        :return: Путь до файла маски.
+        """
+        mask_path: Path = video_directory / FIELD_MASK_FILE_NAME
+        binary_mask: Mask = self._to_binary(mask)
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_mask, mask_path, binary_mask
+        )
+        (video_directory / LEGACY_FIELD_MASK_FILE_NAME).unlink(missing_ok=True)
+
+        self._put(mask_path.resolve(), self._get_file_version(mask_path), binary_mask)
+        return mask_path
+
+    def _put(self, key: Path, version: tuple[int, int], mask: Mask) -> None:
+        """
+        Добавляет маску в память, вытесняя давно не использованные маски.
+
+        :param key: Абсолютный путь до файла маски.
+        :param version: Признаки изменения файла.
+        :param mask: Маска поля.
+        :return: Ничего.
+        """
+        self._masks[key] = (version, mask)
+        self._masks.move_to_end(key)
+
+        while len(self._masks) > self.max_entries:
+            self._masks.popitem(last=False)
+
+    @staticmethod
+    def _get_file_version(mask_path: Path) -> tuple[int, int]:
+        """
+        Получает признаки изменения файла.
+
+        :param mask_path: Путь до файла маски.
+        :return: Время изменения и размер файла.
+        :raise FileNotFoundError: Файл маски не найден.
+        """
+        stat: os.stat_result = mask_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def _read_mask(cls, mask_path: Path) -> Mask:
+        """
+        Читает маску поля с диска.
+
+        :param mask_path: Путь до файла маски.
+        :return: Одноканальная маска поля со значениями 0 и 255.
+        :raise FileNotFoundError: Файл маски не читается.
+        """
+        image: Optional[np.ndarray] = cv2.imread(str(mask_path), cv2.IMREAD_GRAYSCALE)
+
+        if image is None:
+            raise FileNotFoundError(f"Field mask {mask_path} can't be read")
+
+        # Mask saved with lossy compression has noise around edges
+        return Mask.from_binary_mask(image > 127)
+
+    @staticmethod
+    def _write_mask(mask_path: Path, mask: Mask) -> None:
+        """
+        Записывает маску поля на диск в PNG с одним битом на пиксель.
+
+        :param mask_path: Путь до файла маски.
+        :param mask: Одноканальная маска поля со значениями 0 и 255.
+        :return: Ничего.
+        """
+        is_encoded, encoded = cv2.imencode(".png", mask.to_image(), [cv2.IMWRITE_PNG_BILEVEL, 1])
+
+        if not is_encoded:
+            raise ValueError("Field mask can't be encoded")
+
+        tmp_path: Path = mask_path.with_suffix(".tmp")
+        tmp_path.write_bytes(encoded.tobytes())
+        os.replace(tmp_path, mask_path)
+
+    @staticmethod
+    def _to_binary(mask: Mask) -> Mask:
+        """
+        Приводит маску к одноканальному виду со значениями 0 и 255.
+
+        :param mask: Маска.
+        :return: Одноканальная маска.
+        """
+        crop: np.ndarray = mask.crop > 0
+        if crop.ndim > 2:
+            crop = np.any(crop, axis=2)
+
+        return Mask.from_crop(
+            cast(CV_Image, crop.astype(np.uint8) * 255), mask.offset, mask.frame_shape[:2]
+        )
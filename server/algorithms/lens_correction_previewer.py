@@ -0,0 +1,201 @@
+import os
+import threading
+import typing
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from server.algorithms.data_types import CV_Image
+from server.algorithms.video_processing import VideoProcessing
+
+
+class LensCorrectionPreviewer:
+    """
+    Создает примеры кадров с коррекцией искажений без запуска ffmpeg.
+
+    Исходный кадр видео удерживается в памяти по временной метке, а карты смещения пикселей,
+    повторяющие фильтр lenscorrection из ffmpeg, строятся один раз для разрешения и коэффициентов.
+    Подбор коэффициентов на одном кадре сводится к вызову cv2.remap.
+    """
+
+    def __init__(self, max_frames: int = 4, max_maps: int = 16):
+        """
+        :param max_frames: Количество удерживаемых в памяти исходных кадров (0 - кадры не сохраняются).
+        :param max_maps: Количество удерживаемых в памяти карт коррекции.
+        """
+        self.max_frames: int = max_frames
+        self.max_maps: int = max_maps
+        self._frames: OrderedDict[tuple[Path, int, int, float], CV_Image] = OrderedDict()
+        self._maps: OrderedDict[tuple[int, int, float, float], tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def render_correction_sample(
+        self,
+        video_processing: VideoProcessing,
+        source_file: Path,
+        k1: float = 0.0,
+        k2: float = 0.0,
+        frame_timestamp: Optional[float] = None
+    ) -> CV_Image:
+        """
+        Применяет коррекцию искажений к одному кадру из видео.
+
+        :param video_processing: Обработчик видео.
+        :param source_file: Исходное видео без коррекции.
+        :param k1: Коэффициент коррекции видео 1.
+        :param k2: Коэффициент коррекции видео 2.
+        :param frame_timestamp: Временная метка кадра в секундах.
+        :return: Кадр с примененной коррекцией.
+        :raise FileNotFound: Файл не найден на диске.
+        :raise ValueError: Временная метка вне длительности видео.
+        :raise KeyError: Временная метка конца не найдена в метаданных.
+        :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
+        """
+        if frame_timestamp is None:
+            frame_timestamp = 0.0
+
+        frame: CV_Image = self.get_reference_frame(video_processing, source_file, frame_timestamp)
+        height, width = frame.shape[:2]
+        map_x, map_y = self.get_correction_maps(width, height, k1, k2)
+
+        return typing.cast(
+            CV_Image,
+            cv2.remap(
+                frame, map_x, map_y, cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0)
+            )
+        )
+
+    def get_reference_frame(
+        self,
+        video_processing: VideoProcessing,
+        source_file: Path,
+        frame_timestamp: float
+    ) -> CV_Image:
+        """
+        Получает исходный кадр видео, декодируя его только при первом обращении.
+
+        :param video_processing: Обработчик видео.
+        :param source_file: Исходное видео без коррекции.
+        :param frame_timestamp: Временная метка кадра в секундах.
+        :return: Кадр видео без коррекции.
+        :raise FileNotFound: Файл не найден на диске.
+        :raise ValueError: Временная метка вне длительности видео.
+        :raise KeyError: Временная метка конца не найдена в метаданных.
+        :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
+        """
+        key: Optional[tuple[Path, int, int, float]] = self._frame_key(source_file, frame_timestamp)
+
+        with self._lock:
+            if key is not None and key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key]
+
+        frame: CV_Image = video_processing.render_frame_sample(source_file, frame_timestamp)
+
+        if key is None or self.max_frames <= 0:
+            return frame
+
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+        return frame
+
+    def get_correction_maps(
+        self,
+        width: int,
+        height: int,
+        k1: float,
+        k2: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Получает карты коррекции, строя их только при первом обращении.
+
+        :param width: Ширина кадра.
+        :param height: Высота кадра.
+        :param k1: Коэффициент коррекции видео 1.
+        :param k2: Коэффициент коррекции видео 2.
+        :return: Координаты x и y исходных пикселей для каждого пикселя результата.
+        """
+        key: tuple[int, int, float, float] = (width, height, k1, k2)
+
+        with self._lock:
+            if key in self._maps:
+                self._maps.move_to_end(key)
+                return self._maps[key]
+
+        maps: tuple[np.ndarray, np.ndarray] = self.build_correction_maps(width, height, k1, k2)
+
+        with self._lock:
+            self._maps[key] = maps
+            self._maps.move_to_end(key)
+
+            while len(self._maps) > self.max_maps:
+                self._maps.popitem(last=False)
+
+        return maps
+
+    @staticmethod
+    def build_correction_maps(
+        width: int,
+        height: int,
+        k1: float,
+        k2: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Строит карты коррекции, повторяя целочисленные вычисления фильтра lenscorrection из ffmpeg
+        с центром коррекции в центре кадра.
+
+        :param width: Ширина кадра.
+        :param height: Высота кадра.
+        :param k1: Коэффициент коррекции видео 1.
+        :param k2: Коэффициент коррекции видео 2.
+        :return: Координаты x и y исходных пикселей для каждого пикселя результата,
+            пиксели вне кадра отмечены координатой -1.
+        """
+        x_center: int = int(0.5 * width)
+        y_center: int = int(0.5 * height)
+        k1_fixed: int = int(k1 * (1 << 24))
+        k2_fixed: int = int(k2 * (1 << 24))
+        r2inv: int = (4 << 60) // (width * width + height * height)
+
+        off_x: np.ndarray = np.arange(width, dtype=np.int64)[np.newaxis, :] - x_center
+        off_y: np.ndarray = np.arange(height, dtype=np.int64)[:, np.newaxis] - y_center
+
+        # Fixed point arithmetic with the same rounding as ffmpeg
+        r2: np.ndarray = ((off_x * off_x + off_y * off_y) * r2inv + (1 << 31)) >> 32
+        r4: np.ndarray = (r2 * r2 + (1 << 27)) >> 28
+        radius_mult: np.ndarray = (r2 * k1_fixed + r4 * k2_fixed + (1 << 27) + (1 << 52)) >> 28
+
+        x: np.ndarray = x_center + ((radius_mult * off_x + (1 << 23)) >> 24)
+        y: np.ndarray = y_center + ((radius_mult * off_y + (1 << 23)) >> 24)
+        # ffmpeg fills border pixels of the source with black as well
+        is_valid: np.ndarray = (x > 0) & (x < width - 1) & (y > 0) & (y < height - 1)
+
+        map_x: np.ndarray = np.where(is_valid, x, -1).astype(np.float32)
+        map_y: np.ndarray = np.where(is_valid, y, -1).astype(np.float32)
+        return map_x, map_y
+
+    @staticmethod
+    def _frame_key(source_file: Path, frame_timestamp: float) -> Optional[tuple[Path, int, int, float]]:
+        """
+        Получает ключ исходного кадра, который меняется при изменении файла видео.
+
+        :param source_file: Путь до видео.
+        :param frame_timestamp: Временная метка кадра в секундах.
+        :return: Ключ кадра или None, если файл не найден.
+        """
+        try:
+            stat: os.stat_result = source_file.stat()
+
+        except OSError:
+            return None
+
+        # Frame is extracted with millisecond precision
+        return source_file.resolve(), stat.st_size, stat.st_mtime_ns, round(frame_timestamp, 3)
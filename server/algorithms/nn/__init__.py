@@ -5,6 +5,7 @@ from .team_detector_teacher import (
     TeamDetectorTeacher, team_detector_transform
 )
 from .team_detector_predictor import TeamDetectionPredictor
+from .team_dataset import TeamDataset
 
 
 torch.set_float32_matmul_precision('medium')
@@ -15,6 +16,7 @@ __all__ = (
     "TeamDetectorTeacher",
     "TeamDetectorModel",
     "TeamDetectionPredictor",
+    "TeamDataset",
     "team_detector_transform",
     "device"
 )
@@ -1,9 +1,15 @@
+from pathlib import Path
+
+import numpy
 import torch
+from detectron2.config import CfgNode
 from detectron2.engine import DefaultPredictor
 from detectron2.structures import Instances
 
 from server.algorithms.data_types import CV_Image
 from server.algorithms.data_types.detectron2_input import Detectron2Input
+from server.algorithms.enums import InferenceBackendType
+from server.algorithms.nn.inference_backends import InferenceBackend, create_inference_backend
 
 
 class BatchPredictor(DefaultPredictor):
@@ -11,6 +17,17 @@ class BatchPredictor(DefaultPredictor):
     Предсказывает позиции игроков на видео и их класс.
     """
 
+    def __init__(self, cfg: CfgNode, backend_type: InferenceBackendType = InferenceBackendType.Eager):
+        """
+        :param cfg: Конфигурация модели detectron2.
+        :param backend_type: Способ выполнения модели.
+        :raise InferenceBackendUnavailable: Выбранный способ выполнения недоступен.
+        """
+        super().__init__(cfg)
+        self.backend: InferenceBackend = create_inference_backend(
+            backend_type, self.model, Path(cfg.MODEL.WEIGHTS), cfg.MODEL.DEVICE
+        )
+
     def batch_predict(self, *images: CV_Image) -> list[dict[str, Instances]]:
         """
         Используется для получения выделений сразу на нескольких изображениях в BRG формате
@@ -19,31 +36,64 @@ class BatchPredictor(DefaultPredictor):
         :return: Список из полученных выделений на изображении
             в порядке передачи изображений.
         """
+        return self.predict_prepared(self.prepare_inputs(*images))
+
+    def prepare_inputs(self, *images: CV_Image) -> list[Detectron2Input]:
+        """
+        Подготавливает входные данные нейросети на CPU без обращения к устройству обработки.
+
+        Кадры одного разрешения копируются в один непрерывный uint8 массив пакета,
+        а нейросеть получает представления (view) этого массива в формате CHW
+        без промежуточных копий в float32: нормализация выполняется самой моделью.
+
+        :param images: Изображения в BGR формате.
+        :return: Входные данные для нейросети в порядке передачи изображений.
+        """
+        # Группировка кадров по разрешению для формирования непрерывных пакетов
+        shape_groups: dict[tuple[int, ...], list[int]] = {}
+        for n, image in enumerate(images):
+            shape_groups.setdefault(image.shape, []).append(n)
+
+        image_tensors: list[torch.Tensor] = [torch.empty(0)] * len(images)
+        for shape, indexes in shape_groups.items():
+            batch: numpy.ndarray = numpy.empty((len(indexes), *shape), dtype=numpy.uint8)
+
+            for position, index in enumerate(indexes):
+                if self.input_format == "RGB":
+                    # Преобразование изображений в RGB при копировании в пакет
+                    numpy.copyto(batch[position], images[index][:, :, ::-1])
+
+                else:
+                    numpy.copyto(batch[position], images[index])
+
+            batch_tensor: torch.Tensor = torch.from_numpy(batch).permute(0, 3, 1, 2)
+            for position, index in enumerate(indexes):
+                image_tensors[index] = batch_tensor[position]
+
+        # Входной формат для нейросети
+        inputs: list[Detectron2Input] = []
+        for image, image_tensor in zip(images, image_tensors):
+            height, width = image.shape[:2]
+            inputs.append(
+                Detectron2Input(image=image_tensor, height=height, width=width)
+            )
+
+        return inputs
+
+    def predict_prepared(self, inputs: list[Detectron2Input]) -> list[dict[str, Instances]]:
+        """
+        Выполняет обработку подготовленных входных данных нейросетью.
 
+        :param inputs: Входные данные, полученные из prepare_inputs.
+        :return: Список из полученных выделений на изображении
+            в порядке передачи изображений.
+        """
         with torch.no_grad():
-            # Преобразование изображений в BGR
-            if self.input_format == "RGB":
-                images = tuple([image[:, :, ::-1] for image in images])
-
-            # Подготовка входных данных
-            dimensions: list[tuple[int, ...]] = [image.shape[:2] for image in images]
-            image_tensors: list[torch.Tensor] = [
-                torch.as_tensor(
-                    image.astype("float32").transpose(2, 0, 1)
-                ) for image in images
-            ]
-
-            # Входной формат для нейросети
-            inputs: list[Detectron2Input] = []
-
-            for image_dimension, image in zip(dimensions, image_tensors):
-                image.to(self.cfg.MODEL.DEVICE)
-                height, width = image_dimension
-                input_value: Detectron2Input = Detectron2Input(
-                    image=image, height=height, width=width
+            for input_value in inputs:
+                input_value["image"] = input_value["image"].to(
+                    self.cfg.MODEL.DEVICE, non_blocking=True
                 )
-                inputs.append(input_value)
 
             # Выполнение обработки нейросетью
-            results: list[dict[str, Instances]] = self.model(inputs)
+            results: list[dict[str, Instances]] = self.backend(inputs)
             return results
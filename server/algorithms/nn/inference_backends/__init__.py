@@ -0,0 +1,10 @@
+from .inference_backend import InferenceBackend
+from .inference_backend_factory import create_inference_backend
+from .model_exporter import export_model, get_instances_difference
+
+__all__ = (
+    "InferenceBackend",
+    "create_inference_backend",
+    "export_model",
+    "get_instances_difference"
+)
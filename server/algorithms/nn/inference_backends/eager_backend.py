@@ -0,0 +1,21 @@
+from detectron2.structures import Instances
+from torch import nn
+
+from server.algorithms.data_types.detectron2_input import Detectron2Input
+from server.algorithms.nn.inference_backends.inference_backend import InferenceBackend
+
+
+class EagerBackend(InferenceBackend):
+    """
+    Выполняет модель detectron2 средствами PyTorch без дополнительной компиляции.
+    """
+
+    def __init__(self, model: nn.Module):
+        """
+        :param model: Модель detectron2 в режиме выполнения.
+        """
+        self.model: nn.Module = model
+
+    def __call__(self, inputs: list[Detectron2Input]) -> list[dict[str, Instances]]:
+        results: list[dict[str, Instances]] = self.model(inputs)
+        return results
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+
+from detectron2.structures import Instances
+
+from server.algorithms.data_types.detectron2_input import Detectron2Input
+
+
+class InferenceBackend(ABC):
+    """
+    Базовый класс способа выполнения модели detectron2.
+    """
+
+    @abstractmethod
+    def __call__(self, inputs: list[Detectron2Input]) -> list[dict[str, Instances]]:
+        """
+        Выполняет обработку подготовленных входных данных нейросетью.
+
+        :param inputs: Входные данные, уже перенесенные на устройство обработки.
+        :return: Список из полученных выделений на изображении
+            в порядке передачи изображений.
+        """
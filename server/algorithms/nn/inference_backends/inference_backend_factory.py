@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from torch import nn
+
+from server.algorithms.enums import InferenceBackendType
+from server.algorithms.nn.inference_backends.eager_backend import EagerBackend
+from server.algorithms.nn.inference_backends.inference_backend import InferenceBackend
+from server.algorithms.nn.inference_backends.onnx_runtime_backend import OnnxRuntimeBackend
+from server.algorithms.nn.inference_backends.openvino_backend import OpenVINOBackend
+from server.algorithms.nn.inference_backends.torch_compile_backend import TorchCompileBackend
+from server.algorithms.nn.inference_backends.torchscript_backend import TorchScriptBackend
+from server.algorithms.nn.inference_backends.tracing import get_exported_model_path
+
+
+def create_inference_backend(
+    backend_type: InferenceBackendType,
+    model: nn.Module,
+    weights: Path,
+    device: str
+) -> InferenceBackend:
+    """
+    Создает способ выполнения модели detectron2.
+
+    :param backend_type: Выбранный способ выполнения.
+    :param model: Модель detectron2 с загруженными весами.
+    :param weights: Путь до весов модели, рядом с которыми хранятся экспортированные модели.
+    :param device: Имя устройства выполнения.
+    :return: Способ выполнения модели.
+    :raise InferenceBackendUnavailable: Не установлена библиотека или не экспортирована модель.
+    """
+    match backend_type:
+        case InferenceBackendType.Eager:
+            return EagerBackend(model)
+
+        case InferenceBackendType.TorchCompile:
+            return TorchCompileBackend(model)
+
+        case InferenceBackendType.TorchScript:
+            return TorchScriptBackend(model, get_exported_model_path(weights, backend_type), device)
+
+        case InferenceBackendType.OnnxRuntime:
+            return OnnxRuntimeBackend(model, get_exported_model_path(weights, backend_type), device)
+
+        case InferenceBackendType.OpenVINO:
+            return OpenVINOBackend(model, get_exported_model_path(weights, backend_type), device)
+
+    raise ValueError(f"Unknown inference backend {backend_type}")
@@ -0,0 +1,84 @@
+import math
+from pathlib import Path
+
+import torch
+from detectron2.export import TracingAdapter
+from detectron2.structures import Instances
+from torch import nn
+
+from server.algorithms.enums import InferenceBackendType
+from server.algorithms.nn.inference_backends.tracing import (
+    ONNX_OPSET_VERSION,
+    create_tracing_adapter,
+    get_exported_model_path,
+)
+
+
+def export_model(
+    model: nn.Module,
+    backend_type: InferenceBackendType,
+    weights: Path,
+    sample_image: torch.Tensor
+) -> Path:
+    """
+    Экспортирует модель detectron2 трассировкой для выбранного способа выполнения.
+
+    :param model: Модель detectron2 с загруженными весами.
+    :param backend_type: Способ выполнения, использующий экспортированную модель
+        (TorchScript, ONNX Runtime или OpenVINO).
+    :param weights: Путь до весов модели, рядом с которыми сохраняется экспортированная модель.
+    :param sample_image: Пример изображения в формате CHW float32 на устройстве модели.
+    :return: Путь до экспортированной модели.
+    """
+    output_path: Path = get_exported_model_path(weights, backend_type)
+    adapter: TracingAdapter = create_tracing_adapter(model, sample_image)
+
+    with torch.no_grad():
+        if backend_type == InferenceBackendType.TorchScript:
+            traced_model: torch.jit.ScriptModule = torch.jit.trace(adapter, (sample_image,))
+            traced_model.save(str(output_path))
+
+        else:
+            torch.onnx.export(
+                adapter,
+                (sample_image,),
+                str(output_path),
+                opset_version=ONNX_OPSET_VERSION,
+                input_names=["image"],
+                dynamic_axes={"image": {1: "height", 2: "width"}}
+            )
+
+    return output_path
+
+
+def get_instances_difference(expected: Instances, actual: Instances) -> float:
+    """
+    Вычисляет максимальное расхождение выделений двух способов выполнения модели.
+
+    :param expected: Выделения исходной модели.
+    :param actual: Выделения экспортированной модели.
+    :return: Максимальное абсолютное отклонение рамок и уверенности,
+        или бесконечность, если найдены разные объекты.
+    """
+    if len(expected) != len(actual):
+        return math.inf
+
+    if len(expected) == 0:
+        return 0.0
+
+    if not torch.equal(expected.pred_classes.cpu(), actual.pred_classes.cpu()):
+        return math.inf
+
+    difference: float = max(
+        (expected.pred_boxes.tensor.cpu() - actual.pred_boxes.tensor.cpu()).abs().max().item(),
+        (expected.scores.cpu() - actual.scores.cpu()).abs().max().item()
+    )
+
+    if expected.has("pred_masks"):
+        # Доля несовпадающих пикселей масок
+        difference = max(
+            difference,
+            (expected.pred_masks.cpu() != actual.pred_masks.cpu()).float().mean().item()
+        )
+
+    return difference
@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import Any
+
+import torch
+from torch import nn
+
+from server.algorithms.exceptions import InferenceBackendUnavailable
+from server.algorithms.nn.inference_backends.traced_backend import TracedBackend
+
+
+class OnnxRuntimeBackend(TracedBackend):
+    """
+    Выполняет модель detectron2, экспортированную в ONNX, с помощью ONNX Runtime на CPU.
+    """
+
+    def __init__(self, model: nn.Module, exported_model_path: Path, device: str):
+        try:
+            import onnxruntime
+
+        except ImportError as err:
+            raise InferenceBackendUnavailable(
+                "onnxruntime is not installed, install it with pip install -e \".[onnx]\""
+            ) from err
+
+        super().__init__(model, exported_model_path, device)
+        self.session: Any = onnxruntime.InferenceSession(
+            str(exported_model_path), providers=["CPUExecutionProvider"]
+        )
+        self.input_name: str = self.session.get_inputs()[0].name
+
+    def run_exported(self, image: torch.Tensor) -> tuple[torch.Tensor, ...]:
+        outputs: list[Any] = self.session.run(None, {self.input_name: image.cpu().numpy()})
+        return tuple(torch.from_numpy(output) for output in outputs)
@@ -0,0 +1,32 @@
+from pathlib import Path
+from typing import Any
+
+import torch
+from torch import nn
+
+from server.algorithms.exceptions import InferenceBackendUnavailable
+from server.algorithms.nn.inference_backends.traced_backend import TracedBackend
+
+
+class OpenVINOBackend(TracedBackend):
+    """
+    Выполняет модель detectron2, экспортированную в ONNX, с помощью OpenVINO на CPU.
+    """
+
+    def __init__(self, model: nn.Module, exported_model_path: Path, device: str):
+        try:
+            import openvino
+
+        except ImportError as err:
+            raise InferenceBackendUnavailable(
+                "openvino is not installed, install it with pip install -e \".[openvino]\""
+            ) from err
+
+        super().__init__(model, exported_model_path, device)
+        self.compiled_model: Any = openvino.Core().compile_model(str(exported_model_path), "CPU")
+
+    def run_exported(self, image: torch.Tensor) -> tuple[torch.Tensor, ...]:
+        result: Any = self.compiled_model([image.cpu().numpy()])
+        return tuple(
+            torch.from_numpy(result[output]) for output in self.compiled_model.outputs
+        )
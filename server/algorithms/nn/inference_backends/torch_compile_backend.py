@@ -0,0 +1,20 @@
+import torch
+from torch import nn
+
+from server.algorithms.nn.inference_backends.eager_backend import EagerBackend
+
+
+class TorchCompileBackend(EagerBackend):
+    """
+    Выполняет модель detectron2, скомпилированную с помощью torch.compile.
+
+    Части модели, работающие со структурами detectron2, не компилируются
+    и выполняются как в обычном режиме.
+    """
+
+    def __init__(self, model: nn.Module):
+        """
+        :param model: Модель detectron2 в режиме выполнения.
+        """
+        # Разрешение кадров может отличаться, поэтому размеры не фиксируются при компиляции
+        super().__init__(torch.compile(model, dynamic=True))  # type: ignore[arg-type]
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import torch
+from torch import nn
+
+from server.algorithms.nn.inference_backends.traced_backend import TracedBackend
+
+
+class TorchScriptBackend(TracedBackend):
+    """
+    Выполняет модель detectron2, экспортированную трассировкой в TorchScript.
+    """
+
+    def __init__(self, model: nn.Module, exported_model_path: Path, device: str):
+        super().__init__(model, exported_model_path, device)
+        self.module: torch.jit.ScriptModule = torch.jit.load(
+            str(exported_model_path), map_location=device
+        )
+
+    def run_exported(self, image: torch.Tensor) -> tuple[torch.Tensor, ...]:
+        with torch.no_grad():
+            return tuple(self.module(image))
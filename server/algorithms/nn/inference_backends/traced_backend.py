@@ -0,0 +1,67 @@
+from abc import abstractmethod
+from pathlib import Path
+
+import torch
+from detectron2.export.flatten import Schema
+from detectron2.modeling.postprocessing import detector_postprocess
+from detectron2.structures import Instances
+from torch import nn
+
+from server.algorithms.data_types.detectron2_input import Detectron2Input
+from server.algorithms.exceptions import InferenceBackendUnavailable
+from server.algorithms.nn.inference_backends.inference_backend import InferenceBackend
+from server.algorithms.nn.inference_backends.tracing import create_tracing_adapter
+
+
+class TracedBackend(InferenceBackend):
+    """
+    Базовый класс выполнения экспортированной модели detectron2, принимающей
+    одно изображение и возвращающей плоский кортеж тензоров.
+    """
+
+    def __init__(self, model: nn.Module, exported_model_path: Path, device: str):
+        """
+        :param model: Исходная модель detectron2 для восстановления структуры выходов.
+        :param exported_model_path: Путь до экспортированной модели.
+        :param device: Имя устройства выполнения.
+        :raise InferenceBackendUnavailable: Модель не была экспортирована.
+        """
+        if not exported_model_path.is_file():
+            raise InferenceBackendUnavailable(
+                f"Exported model {exported_model_path} not found, run server with --export-models first"
+            )
+
+        self.exported_model_path: Path = exported_model_path
+        self.device: str = device
+        # Схема одинакова для любых изображений, поэтому достаточно небольшого пробного кадра
+        self.outputs_schema: Schema = create_tracing_adapter(
+            model, torch.zeros((3, 64, 64), dtype=torch.float32, device=device)
+        ).outputs_schema
+
+    def __call__(self, inputs: list[Detectron2Input]) -> list[dict[str, Instances]]:
+        results: list[dict[str, Instances]] = []
+
+        for input_value in inputs:
+            flat_outputs: tuple[torch.Tensor, ...] = self.run_exported(
+                input_value["image"].to(torch.float32)
+            )
+            instances: Instances = self.outputs_schema(flat_outputs)[0]["instances"]
+            # Масштабирование выделений и вставка масок в размер исходного кадра
+            results.append(
+                {
+                    "instances": detector_postprocess(
+                        instances, input_value["height"], input_value["width"]
+                    )
+                }
+            )
+
+        return results
+
+    @abstractmethod
+    def run_exported(self, image: torch.Tensor) -> tuple[torch.Tensor, ...]:
+        """
+        Выполняет экспортированную модель на одном изображении.
+
+        :param image: Изображение в формате CHW float32.
+        :return: Плоский кортеж выходных тензоров модели.
+        """
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import torch
+from detectron2.export import TracingAdapter
+from detectron2.modeling import GeneralizedRCNN
+from detectron2.structures import Instances
+from torch import nn
+
+from server.algorithms.enums import InferenceBackendType
+
+# Версия набора операций ONNX, поддерживающая выравненный RoIAlign моделей detectron2
+ONNX_OPSET_VERSION: int = 16
+
+
+def traced_inference(model: GeneralizedRCNN, inputs: list[dict[str, torch.Tensor]]) -> list[dict[str, Instances]]:
+    """
+    Выполняет модель без постобработки, чтобы маски оставались в размере областей интереса,
+    а масштабирование выделений выполнялось вне экспортированной модели.
+
+    :param model: Модель detectron2.
+    :param inputs: Входные данные модели.
+    :return: Выделения на изображении без постобработки.
+    """
+    return [{"instances": model.inference(inputs, do_postprocess=False)[0]}]
+
+
+def create_tracing_adapter(model: nn.Module, image: torch.Tensor) -> TracingAdapter:
+    """
+    Создает обертку модели detectron2 с плоскими входами и выходами из тензоров,
+    и заполняет схему восстановления выходов пробным запуском.
+
+    :param model: Модель detectron2 в режиме выполнения.
+    :param image: Пример изображения в формате CHW float32 на устройстве модели.
+    :return: Обертка модели для трассировки.
+    """
+    adapter: TracingAdapter = TracingAdapter(model, [{"image": image}], traced_inference)
+
+    with torch.no_grad():
+        adapter(image)
+
+    return adapter
+
+
+def get_exported_model_path(weights: Path, backend_type: InferenceBackendType) -> Path:
+    """
+    Получает путь до экспортированной модели, хранящейся рядом с весами модели.
+
+    :param weights: Путь до весов модели.
+    :param backend_type: Способ выполнения модели.
+    :return: Путь до файла экспортированной модели.
+    :raise ValueError: Способ выполнения не использует экспортированные модели.
+    """
+    match backend_type:
+        case InferenceBackendType.TorchScript:
+            return weights.with_suffix(".ts")
+
+        case InferenceBackendType.OnnxRuntime | InferenceBackendType.OpenVINO:
+            # OpenVINO загружает модель напрямую из ONNX
+            return weights.with_suffix(".onnx")
+
+    raise ValueError(f"Backend {backend_type} does not use exported models")
@@ -0,0 +1,62 @@
+import torch
+from torch import Tensor
+from torch.utils.data import Dataset
+
+from server.algorithms.data_types import CV_Image
+from server.algorithms.enums.team import Team
+from server.algorithms.nn.team_detector_teacher import (
+    normalize_player_images,
+    resize_player_image,
+    team_detector_input_size,
+)
+
+
+class TeamDataset(Dataset):
+    """
+    Набор изображений игроков с командами, хранящийся в памяти.
+
+    Изображения приводятся к размеру входа нейросети при добавлении и хранятся
+    в формате uint8, поэтому набор не требует записи файлов на диск и их повторного чтения.
+    Порядок классов совпадает с ImageFolder для папок Team_away и Team_home.
+    """
+    classes: list[str] = ["Team_away", "Team_home"]
+    class_to_idx: dict[str, int] = {"Team_away": 0, "Team_home": 1}
+
+    def __init__(self) -> None:
+        self.images: list[Tensor] = []
+        self.targets: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def __getitem__(self, index: int) -> tuple[Tensor, int]:
+        """
+        Получает нормализованное изображение игрока и его класс.
+
+        :param index: Номер изображения.
+        :return: Тензор изображения в формате CHW и номер класса.
+        """
+        return normalize_player_images(self.images[index].to(torch.float32)), self.targets[index]
+
+    def add(self, image: CV_Image, team: Team) -> None:
+        """
+        Добавляет изображение игрока в набор.
+
+        :param image: Изображение игрока в формате OpenCV.
+        :param team: Команда игрока.
+        :return: Ничего.
+        """
+        resized: Tensor = resize_player_image(image, team_detector_input_size)
+        self.images.append(resized.round_().clamp_(0, 255).to(torch.uint8))
+        self.targets.append(
+            self.class_to_idx["Team_home"] if team == Team.Home else self.class_to_idx["Team_away"]
+        )
+
+    def count_by_team(self) -> dict[Team, int]:
+        """
+        Подсчитывает количество изображений каждой команды.
+
+        :return: Количество изображений по командам.
+        """
+        home_count: int = sum(self.targets)
+        return {Team.Home: home_count, Team.Away: len(self.targets) - home_count}
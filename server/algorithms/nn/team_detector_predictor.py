@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from typing import Literal, TYPE_CHECKING
+from typing import Literal, Sequence, TYPE_CHECKING
 
-import cv2
 import torch
-from PIL import Image
 
 from server.algorithms.data_types import CV_Image
 from server.algorithms.enums.team import Team
-from server.algorithms.nn.team_detector_teacher import team_detector_transform
+from server.algorithms.nn.team_detector_teacher import (
+    normalize_player_images,
+    resize_player_image,
+    team_detector_input_size,
+)
 
 if TYPE_CHECKING:
     from torch import Tensor
@@ -19,18 +21,19 @@ class TeamDetectionPredictor:
     def __init__(
         self,
         model: TeamDetectorModel,
-        transform_inputs=team_detector_transform,
-        device: Literal['cpu', 'cuda'] | str = 'cpu'
+        device: Literal['cpu', 'cuda'] | str = 'cpu',
+        max_batch_size: int = 64
     ):
         """
         Инициализация класса для определения команды с помощью нейронной сети.
 
         :param model: Обученная модель машинного обучения.
-        :param transform_inputs: Входные параметры преобразования входных данных.
+        :param device: На каком устройстве выполняется определение.
+        :param max_batch_size: Максимальное количество изображений за один запуск нейросети.
         """
         self.device = device
-        self.model = model.to(device)
-        self.transform = transform_inputs
+        self.model = model.to(device).eval()
+        self.max_batch_size: int = max_batch_size
 
     def __call__(self, image: CV_Image) -> Team:
         """
@@ -39,18 +42,45 @@ class TeamDetectionPredictor:
         :param image: Изображение в формате OpenCV.
         :return: Определение команды.
         """
+        return self.predict_batch([image])[0]
 
-        image_converted: Image.Image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-        image_eval: Tensor = self.transform(image_converted).unsqueeze(0).to(self.device)
+    def predict_batch(self, images: Sequence[CV_Image]) -> list[Team]:
+        """
+        Выполняет определение команд нескольких игроков (в том числе с разных кадров)
+        одним запуском нейронной сети на каждые max_batch_size изображений.
+
+        :param images: Изображения игроков в формате OpenCV.
+        :return: Определения команд в порядке передачи изображений.
+        """
+        teams: list[Team] = []
+
+        for batch_start in range(0, len(images), self.max_batch_size):
+            batch: Tensor = self.prepare_batch(images[batch_start:batch_start + self.max_batch_size])
+
+            with torch.no_grad():
+                predicted: list[int] = torch.argmax(self.model(batch), dim=1).tolist()
 
-        with torch.no_grad():
-            output = self.model(image_eval).to('cpu')
-            _, predicted = torch.max(output, 1)
+            teams.extend(
+                Team.Home if prediction == Team.Home else Team.Away
+                for prediction in predicted
+            )
 
-            if predicted.item() == Team.Home:
-                return Team.Home
+        return teams
+
+    def prepare_batch(self, images: Sequence[CV_Image]) -> Tensor:
+        """
+        Преобразует изображения игроков во входной тензор нейросети без использования PIL:
+        изменение размера и нормализация выполняются над тензорами на устройстве обработки
+        и воспроизводят преобразование team_detector_transform, используемое при обучении.
+
+        :param images: Изображения игроков в формате OpenCV.
+        :return: Тензор пакета изображений в формате NCHW.
+        """
+        batch: Tensor = torch.empty(
+            (len(images), 3, *team_detector_input_size), dtype=torch.float32, device=self.device
+        )
 
-            elif predicted.item() == Team.Away:
-                return Team.Away
+        for n, image in enumerate(images):
+            batch[n] = resize_player_image(image, team_detector_input_size, self.device)
 
-            return Team.Away
+        return normalize_player_images(batch)
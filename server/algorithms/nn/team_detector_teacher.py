@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from typing import Any, Literal, Mapping, TYPE_CHECKING
+import copy
+from typing import Any, Callable, Iterable, Iterator, Literal, Mapping, Optional, TYPE_CHECKING
 
 import torch
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 from torch import nn as nn, optim as optim
-from torch.utils.data import DataLoader, Subset
+from torch.nn import functional
+from torch.utils.data import DataLoader, Dataset, Subset
 from torchvision import transforms as transforms
 from torchvision.datasets import VisionDataset
 
+from server.algorithms.data_types import CV_Image
+
 if TYPE_CHECKING:
     from server.algorithms.nn.team_detector import TeamDetectorModel
 
@@ -19,6 +23,41 @@ team_detector_transform = transforms.Compose(
         transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5])
     ]
 )
+team_detector_input_size: tuple[int, int] = (150, 150)
+
+
+def resize_player_image(
+    image: CV_Image,
+    size: tuple[int, int] = team_detector_input_size,
+    device: str = "cpu"
+) -> torch.Tensor:
+    """
+    Преобразует изображение игрока в тензор RGB формата CHW нужного размера без использования PIL
+    (аналогично изменению размера в team_detector_transform).
+
+    :param image: Изображение игрока в формате OpenCV.
+    :param size: Размер результата (высота, ширина).
+    :param device: Устройство, на котором выполняется преобразование.
+    :return: Тензор float32 со значениями от 0 до 255.
+    """
+    # HWC в CHW и BGR в RGB выполняются на устройстве обработки
+    image_tensor: torch.Tensor = torch.from_numpy(
+        image
+    ).to(device).permute(2, 0, 1).flip(0).unsqueeze(0).to(torch.float32)
+
+    return functional.interpolate(
+        image_tensor, size=size, mode="bilinear", antialias=True, align_corners=False
+    )[0]
+
+
+def normalize_player_images(images: torch.Tensor) -> torch.Tensor:
+    """
+    Нормализует изображения игроков так же, как team_detector_transform.
+
+    :param images: Тензор изображений со значениями от 0 до 255.
+    :return: Нормализованный тензор (изменяется на месте).
+    """
+    return images.div_(255).sub_(0.5).div_(0.5)
 
 
 class TeamDetectorTeacher:
@@ -27,88 +66,236 @@ class TeamDetectorTeacher:
     """
     def __init__(
         self,
-        train_dataset: VisionDataset | Subset,
-        val_dataset: VisionDataset | Subset,
+        train_dataset: VisionDataset | Subset | Dataset,
+        val_dataset: VisionDataset | Subset | Dataset,
         epochs: int,
         model: TeamDetectorModel,
-        device: Literal['cpu', 'cuda'] | str = 'cpu'
+        device: Literal['cpu', 'cuda'] | str = 'cpu',
+        patience: Optional[int] = 10,
+        cache_features: bool = True
     ):
         """
         Инициализирует класс для обучения модели.
 
         :param train_dataset: Набор данных для обучения.
         :param val_dataset: Набор данных для оценки качества.
-        :param epochs: Количество итераций.
+        :param epochs: Максимальное количество итераций.
         :param model: Модель машинного обучения.
         :param device: На каком устройстве выполняется обучение.
+        :param patience: Количество итераций без улучшения ошибки на проверочной выборке,
+            после которого обучение останавливается (None - без ранней остановки).
+        :param cache_features: Вычислять ли признаки замороженной основы модели однократно
+            и обучать на них только последний слой.
         """
         self.train_loader: DataLoader[VisionDataset] = DataLoader(train_dataset, batch_size=128)
         self.val_loader: DataLoader[VisionDataset] = DataLoader(val_dataset, batch_size=128)
         self.epochs: int = epochs
         self.model: TeamDetectorModel = model.to(device)
         self.device: str = device
+        self.patience: Optional[int] = patience
+        self.cache_features: bool = cache_features
+        self.trained_epochs: int = 0
 
     def train_nn(self) -> TeamDetectorModel:
         """
         Обучает модель машинного обучения примерами игроков из команд.
 
+        Если основа модели заморожена, признаки изображений вычисляются один раз,
+        и на них обучается только последний полносвязный слой.
+
+        :return: Обученная модель машинного обучения.
+        """
+        if self.cache_features and self.is_backbone_frozen():
+            return self.train_head_on_cached_features()
+
+        return self.train_full_model()
+
+    def is_backbone_frozen(self) -> bool:
+        """
+        Проверяет, обучается ли только последний полносвязный слой модели.
+
+        :return: Заморожены ли все параметры, кроме последнего слоя.
+        """
+        head_parameters: set[int] = {id(param) for param in self.model.resnet18.fc.parameters()}
+
+        return all(
+            not param.requires_grad
+            for param in self.model.parameters()
+            if id(param) not in head_parameters
+        )
+
+    def train_full_model(self) -> TeamDetectorModel:
+        """
+        Обучает модель, выполняя полный проход нейросети на каждой итерации.
+
+        :return: Обученная модель машинного обучения.
+        """
+        def get_batches(loader: DataLoader) -> Iterator[tuple[torch.Tensor, torch.Tensor]]:
+            for inputs, labels in loader:
+                yield inputs.to(self.device), labels.type(torch.LongTensor).to(self.device)
+
+        self.fit(self.model, lambda: get_batches(self.train_loader), lambda: get_batches(self.val_loader))
+        return self.model
+
+    def train_head_on_cached_features(self) -> TeamDetectorModel:
+        """
+        Обучает последний слой модели на однократно вычисленных признаках замороженной основы.
+
         :return: Обученная модель машинного обучения.
         """
-        train_losses, val_losses = [], []
+        train_features, train_labels = self.extract_features(self.train_loader)
+        val_features, val_labels = self.extract_features(self.val_loader)
+        batch_size: int = self.train_loader.batch_size or 128
+
+        def get_batches(
+            features: torch.Tensor,
+            labels: torch.Tensor
+        ) -> Iterator[tuple[torch.Tensor, torch.Tensor]]:
+            for batch_start in range(0, len(features), batch_size):
+                yield features[batch_start:batch_start + batch_size], labels[batch_start:batch_start + batch_size]
+
+        self.fit(
+            self.model.resnet18.fc,
+            lambda: get_batches(train_features, train_labels),
+            lambda: get_batches(val_features, val_labels)
+        )
+        self.model.eval()
+        return self.model
+
+    def fit(
+        self,
+        module: nn.Module,
+        get_train_batches: Callable[[], Iterable[tuple[torch.Tensor, torch.Tensor]]],
+        get_val_batches: Callable[[], Iterable[tuple[torch.Tensor, torch.Tensor]]]
+    ) -> int:
+        """
+        Обучает модуль с ранней остановкой по ошибке на проверочной выборке
+        и восстанавливает его состояние с наименьшей ошибкой.
+
+        :param module: Обучаемый модуль (модель целиком или ее последний слой).
+        :param get_train_batches: Функция получения пакетов обучающей выборки на каждой итерации
+            (входы модуля и метки на устройстве обучения).
+        :param get_val_batches: Функция получения пакетов проверочной выборки на каждой итерации.
+        :return: Количество выполненных итераций.
+        """
         criterion = nn.CrossEntropyLoss()
-        optimizer = optim.SGD(self.model.parameters(), lr=0.001, momentum=0.9)
+        optimizer = optim.SGD(module.parameters(), lr=0.001, momentum=0.9)
         best_val_loss: float = float('inf')
-        best_model_state: Mapping[str, Any] = self.model.state_dict()
+        best_state: Mapping[str, Any] = copy.deepcopy(module.state_dict())
+        epochs_without_improvement: int = 0
+        self.trained_epochs = 0
 
         for epoch in range(self.epochs):
-            self.model.train()
+            module.train()
             running_loss = 0.0
-            for inputs, labels in self.train_loader:
+            train_batches: int = 0
+            for inputs, labels in get_train_batches():
                 optimizer.zero_grad()
-                outputs = self.model(inputs.to(self.device))
-                labels = labels.type(torch.LongTensor).to(self.device)
-                loss = criterion(outputs, labels)
+                loss = criterion(module(inputs), labels)
                 loss.backward()
                 optimizer.step()
                 running_loss += loss.item()
+                train_batches += 1
 
-            train_losses.append(running_loss / len(self.train_loader))
-
-            self.model.eval()
+            module.eval()
             val_loss = 0.0
+            val_batches: int = 0
             all_labels = []
             all_preds = []
             with torch.no_grad():
-                for inputs, labels in self.val_loader:
-                    outputs = self.model(inputs.to(self.device))
-                    labels = labels.type(torch.LongTensor).to(self.device)
-                    loss = criterion(outputs, labels)
-                    val_loss += loss.item()
+                for inputs, labels in get_val_batches():
+                    outputs = module(inputs)
+                    val_loss += criterion(outputs, labels).item()
+                    val_batches += 1
                     _, preds = torch.max(outputs, 1)
                     all_labels.extend(labels.tolist())
                     all_preds.extend(preds.tolist())
 
-            val_losses.append(val_loss / len(self.val_loader))
-            val_accuracy = accuracy_score(all_labels, all_preds)
-            val_precision = precision_score(all_labels, all_preds, average='macro', zero_division=1)
-            val_recall = recall_score(all_labels, all_preds, average='macro', zero_division=1)
-            val_f1 = f1_score(all_labels, all_preds, average='macro', zero_division=1)
+            self.trained_epochs = epoch + 1
+            self.report_epoch(
+                epoch, running_loss / max(train_batches, 1), val_loss / max(val_batches, 1), all_labels, all_preds
+            )
 
             if val_loss < best_val_loss:
-                best_model_state = self.model.state_dict()
-
-            if __debug__:
-                print(
-                    f"Epoch [{epoch + 1}/{self.epochs}], "
-                    f"Loss: {train_losses[-1]:.4f}, "
-                    f"Val Loss: {val_losses[-1]:.4f}, "
-                    f"Val Acc: {val_accuracy:.2%}, "
-                    f"Val Precision: {val_precision:.4f}, "
-                    f"Val Recall: {val_recall:.4f}, "
-                    f"Val F1 Score: {val_f1:.4f}"
-                )
-
-        self.model.load_state_dict(best_model_state)
+                best_val_loss = val_loss
+                best_state = copy.deepcopy(module.state_dict())
+                epochs_without_improvement = 0
+
+            else:
+                epochs_without_improvement += 1
+
+            if self.patience is not None and epochs_without_improvement >= self.patience:
+                break
+
+        module.load_state_dict(best_state)
         # Manual memory cleanup
-        del best_model_state
-        return self.model
+        del best_state
+        return self.trained_epochs
+
+    def extract_features(self, loader: DataLoader) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Вычисляет признаки основы модели (вход последнего слоя) для всех изображений выборки.
+
+        :param loader: Загрузчик выборки.
+        :return: Признаки изображений и их метки на устройстве обучения.
+        """
+        features: list[torch.Tensor] = []
+        labels: list[torch.Tensor] = []
+        head: nn.Linear = self.model.resnet18.fc
+        features_count: int = head.in_features
+
+        self.model.eval()
+        # Последний слой временно заменяется, чтобы модель возвращала его входные признаки
+        self.model.resnet18.fc = nn.Identity()
+
+        try:
+            with torch.no_grad():
+                for inputs, batch_labels in loader:
+                    features.append(self.model(inputs.to(self.device)))
+                    labels.append(batch_labels.type(torch.LongTensor).to(self.device))
+
+        finally:
+            self.model.resnet18.fc = head
+
+        if not features:
+            return (
+                torch.empty((0, features_count), device=self.device),
+                torch.empty(0, dtype=torch.long, device=self.device)
+            )
+
+        return torch.cat(features), torch.cat(labels)
+
+    def report_epoch(
+        self,
+        epoch: int,
+        train_loss: float,
+        val_loss: float,
+        all_labels: list[int],
+        all_preds: list[int]
+    ) -> None:
+        """
+        Выводит метрики качества итерации обучения в режиме отладки.
+
+        :param epoch: Номер итерации.
+        :param train_loss: Ошибка на обучающей выборке.
+        :param val_loss: Ошибка на проверочной выборке.
+        :param all_labels: Метки проверочной выборки.
+        :param all_preds: Предсказания на проверочной выборке.
+        :return: Ничего.
+        """
+        if not __debug__:
+            return
+
+        val_accuracy = accuracy_score(all_labels, all_preds)
+        val_precision = precision_score(all_labels, all_preds, average='macro', zero_division=1)
+        val_recall = recall_score(all_labels, all_preds, average='macro', zero_division=1)
+        val_f1 = f1_score(all_labels, all_preds, average='macro', zero_division=1)
+        print(
+            f"Epoch [{epoch + 1}/{self.epochs}], "
+            f"Loss: {train_loss:.4f}, "
+            f"Val Loss: {val_loss:.4f}, "
+            f"Val Acc: {val_accuracy:.2%}, "
+            f"Val Precision: {val_precision:.4f}, "
+            f"Val Recall: {val_recall:.4f}, "
+            f"Val F1 Score: {val_f1:.4f}"
+        )
@@ -1,12 +1,13 @@
 from typing import Any
 
 import numpy as np
-from sort.tracker import SortTracker
-from torch import Tensor
 
 from server.algorithms.data_types import BoundingBox
 from server.algorithms.data_types.raw_player_tracking_data import RawPlayerTrackingData
 from server.algorithms.enums.player_classes_enum import PlayerClasses
+from server.algorithms.enums.tracker_type import TrackerType
+from server.algorithms.track_motion_predictor import TrackMotionPredictor
+from server.algorithms.trackers import MultiObjectTracker, create_tracker
 
 
 class PlayerTracker:
@@ -14,28 +15,35 @@ class PlayerTracker:
     Отслеживает идентичность игроков на поле между кадрами.
     """
 
-    def __init__(self, start_from_id: int = 0, track_length: int = 6, min_hits: int = 4, iou_threshold: float = 0.2):
+    def __init__(self, start_from_id: int = 0, tracker_type: TrackerType = TrackerType.Sort):
+        """
+        :param start_from_id: Смещение идентификаторов отслеживаний.
+        :param tracker_type: Алгоритм отслеживания идентичности игроков.
+        """
         self.start_from_id: int = start_from_id
-        self.tracker: SortTracker = SortTracker(track_length, min_hits, iou_threshold)
+        self.tracker: MultiObjectTracker = create_tracker(tracker_type)
+        self.motion_predictor: TrackMotionPredictor = TrackMotionPredictor()
 
-    def update(self, boxes: Tensor, scores: Tensor, classes_predicted: Tensor) -> list[RawPlayerTrackingData]:
+    @property
+    def detection_score_threshold(self) -> float:
+        """
+        Минимальная уверенность выделений, передаваемых алгоритму отслеживания.
+
+        :return: Порог уверенности.
+        """
+        return self.tracker.detection_score_threshold
+
+    def update(self, detections: np.ndarray) -> list[RawPlayerTrackingData]:
         """
         Обновляет отслеживания игроков на новый кадр.
 
-        :param boxes: Охватывающие прямоугольники игроков.
-        :param scores: Оценка уверенности в выделении.
-        :param classes_predicted: Предсказанный класс игрока.
+        :param detections: Выделения игроков в виде массива (N, 6)
+            из охватывающего прямоугольника, оценки уверенности и предсказанного класса.
         :return: Список выделений игроков с их идентификаторами между кадрами.
         """
-        dest: np.ndarray = np.array(
-            [
-                np.array(
-                    [*box, score, class_predicted]
-                ) for box, score, class_predicted in zip(boxes, scores, classes_predicted)
-            ]
-        )
-
-        targets: Any = self.tracker.update(dest).astype(np.int32).tolist()
+        targets: Any = self.tracker.update(
+            detections.reshape(-1, 6)
+        ).astype(np.int32).tolist()
         data: list[RawPlayerTrackingData] = []
 
         for target in targets:
@@ -48,4 +56,29 @@ class PlayerTracker:
                 )
             )
 
+        self.motion_predictor.update(data)
         return data
+
+    def predict(self) -> list[RawPlayerTrackingData]:
+        """
+        Предсказывает положения отслеживаемых игроков на кадре, не обработанном нейросетью.
+
+        Отслеживания алгоритма SORT при этом не изменяются: следующий обработанный кадр
+        сопоставляется с ними как следующий по порядку.
+
+        :return: Список предсказанных выделений игроков с их идентификаторами между кадрами.
+        """
+        return self.motion_predictor.predict()
+
+    def needs_detection(self, max_uncertainty: float, max_relative_speed: float) -> bool:
+        """
+        Проверяет, стало ли предсказание положений игроков слишком неточным без запуска нейросети.
+
+        :param max_uncertainty: Допустимая неопределенность положения относительно высоты игрока.
+        :param max_relative_speed: Допустимая скорость за кадр относительно высоты игрока.
+        :return: Требуется ли обработка кадра нейросетью.
+        """
+        return (
+            self.motion_predictor.max_uncertainty() > max_uncertainty or
+            self.motion_predictor.max_relative_speed() > max_relative_speed
+        )
@@ -76,10 +76,29 @@ class PlayersMapper:
             return []
 
         pts: numpy.ndarray = numpy.array([[p.x, p.y] for p in points], dtype='float32')
-        pts_converted: numpy.ndarray = numpy.array([pts])
-        to_map_coordinates = cv2.perspectiveTransform(pts_converted, self.field_transform)[0]
 
         return [
-            RelativePoint(*Point(x, y).clip_point_to_bounding_box(self.map_bbox))
-            for x, y in to_map_coordinates
+            RelativePoint(float(x), float(y))
+            for x, y in self.transform_points_array(pts).tolist()
         ]
+
+    def transform_points_array(self, points: numpy.ndarray) -> numpy.ndarray:
+        """
+        Конвертирует массив точек из пространства камеры в пространство мини-карты за один вызов
+        преобразования, ограничивая результат пространством мини-карты.
+
+        :param points: Массив точек (N, 2) в относительных координатах камеры.
+        :return: Массив точек (N, 2) в координатах мини-карты.
+        """
+        if len(points) == 0:
+            return numpy.zeros((0, 2), dtype='float32')
+
+        to_map_coordinates: numpy.ndarray = cv2.perspectiveTransform(
+            numpy.asarray(points, dtype='float32').reshape(-1, 1, 2), self.field_transform
+        ).reshape(-1, 2)
+
+        return numpy.clip(
+            to_map_coordinates,
+            (self.map_bbox.min_point.x, self.map_bbox.min_point.y),
+            (self.map_bbox.max_point.x, self.map_bbox.max_point.y)
+        )
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from asyncio import Future
+from collections import deque
+from typing import Hashable, NamedTuple, Optional
+
+from detectron2.structures import Instances
+
+from server.algorithms.data_types import CV_Image, WaitStatistics
+from server.algorithms.enums import InferencePriority
+
+
+class InferenceTask(NamedTuple):
+    """
+    Задача обработки изображений нейросетью.
+    """
+    images: tuple[CV_Image, ...]
+    future: Future[list[Instances]]
+    priority: InferencePriority = InferencePriority.Interactive
+    job_key: Optional[Hashable] = None
+    weight: float = 1.0
+    enqueued_at: float = 0.0
+
+
+class InferenceQueue:
+    """
+    Очередь задач нейросети с классами приоритета.
+
+    Интерактивные задачи выдаются раньше фоновых. Фоновые задачи разных заданий
+    (например, обработки разных видео) выдаются по принципу взвешенного справедливого
+    распределения: следующей выдается задача задания с наименьшим обслуженным
+    объемом, нормированным на его вес.
+    """
+
+    def __init__(self) -> None:
+        self._interactive: deque[InferenceTask] = deque()
+        self._bulk_jobs: dict[Optional[Hashable], deque[InferenceTask]] = {}
+        self._bulk_served: dict[Optional[Hashable], float] = {}
+        # Счетчик доступных задач для ожидания в get
+        self._available: asyncio.Queue[None] = asyncio.Queue()
+        self.wait_statistics: dict[InferencePriority, WaitStatistics] = {
+            priority: WaitStatistics() for priority in InferencePriority
+        }
+
+    def qsize(self) -> int:
+        """
+        Количество задач в очереди.
+
+        :return: Количество задач.
+        """
+        return self._available.qsize()
+
+    def empty(self) -> bool:
+        """
+        Проверяет, пуста ли очередь.
+
+        :return: Пуста ли очередь.
+        """
+        return self._available.empty()
+
+    def queued_by_priority(self) -> dict[InferencePriority, int]:
+        """
+        Количество задач в очереди по классам приоритета.
+
+        :return: Количество задач для каждого класса.
+        """
+        return {
+            InferencePriority.Interactive: len(self._interactive),
+            InferencePriority.Bulk: sum(len(job) for job in self._bulk_jobs.values())
+        }
+
+    async def put(self, task: InferenceTask) -> None:
+        """
+        Добавляет задачу в очередь.
+
+        :param task: Задача обработки.
+        :return: Ничего.
+        """
+        self.put_nowait(task)
+
+    def put_nowait(self, task: InferenceTask) -> None:
+        """
+        Добавляет задачу в очередь без ожидания.
+
+        :param task: Задача обработки.
+        :return: Ничего.
+        """
+        if task.enqueued_at == 0.0:
+            task = task._replace(enqueued_at=time.perf_counter())
+
+        if task.priority == InferencePriority.Interactive:
+            self._interactive.append(task)
+
+        else:
+            job: Optional[deque[InferenceTask]] = self._bulk_jobs.get(task.job_key)
+
+            if job is None:
+                # Новое задание начинает с текущего уровня обслуживания активных заданий,
+                # чтобы не вытеснять их накопленным "долгом"
+                self._bulk_served[task.job_key] = min(self._bulk_served.values(), default=0.0)
+                job = self._bulk_jobs[task.job_key] = deque()
+
+            job.append(task)
+
+        self._available.put_nowait(None)
+
+    async def get(self) -> InferenceTask:
+        """
+        Получает следующую задачу, ожидая ее появления.
+
+        :return: Задача обработки.
+        """
+        await self._available.get()
+        return self._pop_next()
+
+    def get_nowait(self) -> InferenceTask:
+        """
+        Получает следующую задачу без ожидания.
+
+        :return: Задача обработки.
+        :raise QueueEmpty: Очередь пуста.
+        """
+        self._available.get_nowait()
+        return self._pop_next()
+
+    def _pop_next(self) -> InferenceTask:
+        """
+        Выбирает следующую задачу по классу приоритета и справедливому распределению.
+
+        :return: Задача обработки.
+        """
+        task: InferenceTask
+
+        if self._interactive:
+            task = self._interactive.popleft()
+
+        else:
+            job_key: Optional[Hashable] = min(
+                self._bulk_jobs, key=lambda key: self._bulk_served[key]
+            )
+            job: deque[InferenceTask] = self._bulk_jobs[job_key]
+            task = job.popleft()
+            self._bulk_served[job_key] += len(task.images) / task.weight
+
+            if not job:
+                del self._bulk_jobs[job_key]
+                del self._bulk_served[job_key]
+
+        self.wait_statistics[task.priority].add(time.perf_counter() - task.enqueued_at)
+        return task
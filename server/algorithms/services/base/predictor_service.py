@@ -1,13 +1,24 @@
 import asyncio
+import hashlib
 from abc import ABC
-from asyncio import Future
+from asyncio import Future, QueueEmpty
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Coroutine, Iterable, NoReturn
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterable, Coroutine, Hashable, NoReturn, Optional, TypeVar, cast
 
-from detectron2.structures import Instances
+import torch
+from detectron2.structures import Boxes, Instances
 
-from server.algorithms.data_types import CV_Image
+from server.algorithms.data_types import CV_Image, Detectron2Input, RawDetections
+from server.algorithms.detection_cache import VideoDetectionCache
+from server.algorithms.device_scheduler import DeviceScheduler
+from server.algorithms.enums import InferencePriority
 from server.algorithms.nn.batch_predictor import BatchPredictor
+from server.algorithms.services.base.inference_queue import InferenceQueue, InferenceTask
+from server.utils.file_hash import hash_file
+
+FrameKeyT = TypeVar("FrameKeyT")
 
 
 class PredictorService(ABC):
@@ -16,60 +27,477 @@ class PredictorService(ABC):
     """
 
     predictor: BatchPredictor
-    device_lock: asyncio.Lock
-    image_queue: asyncio.Queue[
-        tuple[
-            tuple[CV_Image, ...],
-            Future[list[Instances]]
-        ]
-    ]
+    device_scheduler: DeviceScheduler
+    image_queue: InferenceQueue
+    max_batch_size: int = 1
+    max_batch_wait_time: float = 0.0
+    model_fingerprint: str = ""
 
     async def __call__(self) -> Coroutine[None, None, NoReturn]:
         """
-        Обрабатывает изображения в режиме сервиса на устройстве обработки.
+        Обрабатывает изображения в режиме сервиса на устройстве обработки,
+        объединяя задачи из очереди в пакеты до max_batch_size изображений.
+
+        Подготовка следующего пакета на CPU выполняется в отдельном потоке, пока
+        текущий пакет обрабатывается нейросетью на устройстве, доступ к которому
+        выдается планировщиком с приоритетом наиболее срочной задачи пакета.
 
         :return: Отсутствуют возвращаемые значения.
         """
         loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        # Не более одного подготовленного пакета ожидает обработки (двойная буферизация)
+        prepared_batches: asyncio.Queue[
+            tuple[list[InferenceTask], list[Detectron2Input]]
+        ] = asyncio.Queue(maxsize=1)
 
-        with ThreadPoolExecutor(max_workers=1) as threadpool:
-            while True:
-                nn_inputs, future_result = await self.image_queue.get()
-                result: list[Instances] = await self.execute_model(nn_inputs, loop, threadpool)
-                future_result.set_result(result)
+        with (
+            ThreadPoolExecutor(max_workers=1) as preparation_threadpool,
+            ThreadPoolExecutor(max_workers=1) as threadpool
+        ):
+            preparation_task: asyncio.Task[NoReturn] = loop.create_task(
+                self.prepare_batches(prepared_batches, loop, preparation_threadpool)
+            )
 
-    async def execute_model(
+            try:
+                while True:
+                    batch, nn_inputs = await prepared_batches.get()
+                    priority: InferencePriority = min(task.priority for task in batch)
+
+                    try:
+                        result: list[Instances] = await self.execute_model(
+                            nn_inputs, loop, threadpool, priority
+                        )
+
+                    except Exception as err:
+                        self.set_batch_exception(batch, err)
+                        continue
+
+                    # Распределение результатов по задачам в порядке их добавления
+                    offset: int = 0
+                    for task in batch:
+                        if not task.future.done():
+                            task.future.set_result(result[offset:offset + len(task.images)])
+
+                        offset += len(task.images)
+
+            finally:
+                preparation_task.cancel()
+
+    async def prepare_batches(
         self,
-        nn_inputs: Iterable[CV_Image],
+        prepared_batches: asyncio.Queue[tuple[list[InferenceTask], list[Detectron2Input]]],
         loop: asyncio.AbstractEventLoop,
         threadpool: ThreadPoolExecutor
+    ) -> NoReturn:
+        """
+        Собирает пакеты задач из очереди и подготавливает входные данные нейросети.
+
+        :param prepared_batches: Очередь подготовленных пакетов.
+        :param loop: Текущий асинхронный цикл.
+        :param threadpool: Пул потоков для подготовки входных данных.
+        :return: Отсутствуют возвращаемые значения.
+        """
+        # Задача, не поместившаяся в предыдущий пакет
+        pending_task: Optional[InferenceTask] = None
+
+        while True:
+            if pending_task is None:
+                pending_task = await self.image_queue.get()
+
+            batch, pending_task = await self.collect_batch(pending_task, loop)
+            images: list[CV_Image] = [
+                image for task in batch for image in task.images
+            ]
+
+            try:
+                nn_inputs: list[Detectron2Input] = await loop.run_in_executor(
+                    threadpool,
+                    self.predictor.prepare_inputs,
+                    *images
+                )
+
+            except Exception as err:
+                self.set_batch_exception(batch, err)
+                continue
+
+            await prepared_batches.put((batch, nn_inputs))
+
+    @staticmethod
+    def set_batch_exception(batch: list[InferenceTask], err: Exception) -> None:
+        """
+        Передает исключение всем ожидающим задачам пакета.
+
+        :param batch: Пакет задач.
+        :param err: Исключение.
+        :return: Ничего.
+        """
+        for task in batch:
+            if not task.future.done():
+                task.future.set_exception(err)
+
+    async def collect_batch(
+        self,
+        first_task: InferenceTask,
+        loop: asyncio.AbstractEventLoop
+    ) -> tuple[list[InferenceTask], Optional[InferenceTask]]:
+        """
+        Собирает пакет задач из очереди, ожидая новые задачи не дольше max_batch_wait_time секунд.
+
+        :param first_task: Первая задача пакета.
+        :param loop: Текущий асинхронный цикл.
+        :return: Собранный пакет и задача, не поместившаяся в пакет (если есть).
+        """
+        batch: list[InferenceTask] = [first_task]
+        batch_size: int = len(first_task.images)
+        deadline: float = loop.time() + self.max_batch_wait_time
+
+        while batch_size < self.max_batch_size:
+            try:
+                task: InferenceTask = self.image_queue.get_nowait()
+
+            except QueueEmpty:
+                remaining_time: float = deadline - loop.time()
+                if remaining_time <= 0:
+                    break
+
+                try:
+                    async with asyncio.timeout(remaining_time):
+                        task = await self.image_queue.get()
+
+                except TimeoutError:
+                    break
+
+            if batch_size + len(task.images) > self.max_batch_size:
+                return batch, task
+
+            batch.append(task)
+            batch_size += len(task.images)
+
+        return batch, None
+
+    async def execute_model(
+        self,
+        nn_inputs: list[Detectron2Input],
+        loop: asyncio.AbstractEventLoop,
+        threadpool: ThreadPoolExecutor,
+        priority: InferencePriority = InferencePriority.Interactive
     ) -> list[Instances]:
         """
         Запускает модель нейронной сети на выполнение в отдельном потоке
         для неблокирующего выполнения.
 
-        :param nn_inputs: Изображение для обработки нейросетью.
+        :param nn_inputs: Подготовленные входные данные для обработки нейросетью.
         :param loop: Текущий асинхронный цикл.
         :param threadpool: Текущий пул потоков для запуска нейронной сети.
+        :param priority: Приоритет доступа к устройству обработки.
         :return: Список полученных результатов для изображений.
         """
-        async with self.device_lock:
+        async with self.device_scheduler.acquire(priority):
             result: list[dict[str, Instances]] = await loop.run_in_executor(
                 threadpool,
-                self.predictor.batch_predict,
-                *nn_inputs
+                self.predictor.predict_prepared,
+                nn_inputs
             )
             return [result_instance["instances"] for result_instance in result]
 
-    async def add_inference_task_to_queue(self, *images: CV_Image) -> Future[list[Instances]]:
+    async def add_inference_task_to_queue(
+        self,
+        *images: CV_Image,
+        priority: InferencePriority = InferencePriority.Interactive,
+        job_key: Optional[Hashable] = None,
+        weight: float = 1.0
+    ) -> Future[list[Instances]]:
         """
         Добавляет задачу запуска нейросети на получение данных из изображения.
 
         :param images: Изображения в формате BGR из OpenCV для обработки.
+        :param priority: Класс приоритета задачи.
+        :param job_key: Ключ задания (например, идентификатор видео) для справедливого
+            распределения фоновых задач.
+        :param weight: Вес задания при распределении фоновых задач.
         :return: Футура с ожиданием результата обработки изображения.
         """
         future_result: Future[list[Instances]] = Future()
         # Добавить задачу генерации разметки поля
-        await self.image_queue.put((images, future_result))
+        await self.image_queue.put(
+            InferenceTask(images, future_result, priority, job_key, weight)
+        )
 
         return future_result
+
+    async def stream_inference(
+        self,
+        frames: AsyncIterable[tuple[FrameKeyT, CV_Image]],
+        frames_in_flight: Optional[int] = None,
+        priority: InferencePriority = InferencePriority.Bulk,
+        job_key: Optional[Hashable] = None,
+        weight: float = 1.0,
+        detection_cache: Optional[VideoDetectionCache] = None,
+        region: Optional[tuple[int, int, int, int]] = None
+    ) -> AsyncGenerator[tuple[FrameKeyT, CV_Image, Instances], None]:
+        """
+        Обрабатывает поток кадров нейросетью, удерживая в очереди несколько кадров одновременно,
+        чтобы они могли быть объединены в пакеты. Результаты выдаются в порядке кадров.
+
+        :param frames: Поток из ключа кадра (например, номера кадра) и самого кадра.
+        :param frames_in_flight: Сколько кадров может ожидать обработки одновременно
+            (по умолчанию удвоенный max_batch_size).
+        :param priority: Класс приоритета задач потока.
+        :param job_key: Ключ задания (например, идентификатор видео).
+        :param weight: Вес задания при распределении фоновых задач.
+        :param detection_cache: Кэш выделений видео (ключами кадров должны быть их номера).
+        :param region: Область кадров left, top, right, bottom, передаваемая нейросети
+            (None - кадр целиком).
+        :return: Генератор из ключа кадра, кадра и выделений нейросети на CPU.
+        """
+        async for frame_key, frame, instances in self.stream_strided_inference(
+            frames, 1, frames_in_flight, priority, job_key, weight, detection_cache, region
+        ):
+            assert instances is not None, "Every frame must be processed with stride 1"
+            yield frame_key, frame, instances
+
+    async def stream_strided_inference(
+        self,
+        frames: AsyncIterable[tuple[FrameKeyT, CV_Image]],
+        detection_stride: int,
+        frames_in_flight: Optional[int] = None,
+        priority: InferencePriority = InferencePriority.Bulk,
+        job_key: Optional[Hashable] = None,
+        weight: float = 1.0,
+        detection_cache: Optional[VideoDetectionCache] = None,
+        region: Optional[tuple[int, int, int, int]] = None
+    ) -> AsyncGenerator[tuple[FrameKeyT, CV_Image, Optional[Instances]], None]:
+        """
+        Обрабатывает нейросетью каждый detection_stride кадр потока, пропуская остальные кадры
+        без обработки. Результаты выдаются в порядке кадров.
+
+        :param frames: Поток из ключа кадра (например, номера кадра) и самого кадра.
+        :param detection_stride: Шаг между обрабатываемыми кадрами (1 - обрабатываются все кадры).
+        :param frames_in_flight: Сколько обрабатываемых кадров может ожидать обработки одновременно
+            (по умолчанию удвоенный max_batch_size).
+        :param priority: Класс приоритета задач потока.
+        :param job_key: Ключ задания (например, идентификатор видео).
+        :param weight: Вес задания при распределении фоновых задач.
+        :param detection_cache: Кэш выделений видео (ключами кадров должны быть их номера):
+            нейросеть запускается только для кадров, отсутствующих в кэше.
+        :param region: Область кадров left, top, right, bottom, передаваемая нейросети
+            (None - кадр целиком).
+        :return: Генератор из ключа кадра, кадра и выделений нейросети на CPU
+            (None для пропущенных кадров).
+        """
+        assert detection_stride >= 1, "Detection stride must be positive"
+
+        if frames_in_flight is None:
+            frames_in_flight = self.max_batch_size * 2
+
+        # Пропущенные кадры ожидают в очереди вместе с обрабатываемыми для сохранения порядка
+        in_flight: deque[tuple[FrameKeyT, CV_Image, Optional[Future[list[Instances]]]]] = deque()
+        pending_inference: int = 0
+        frame_n: int = 0
+
+        try:
+            async for frame_key, frame in frames:
+                fut: Optional[Future[list[Instances]]] = None
+
+                if frame_n % detection_stride == 0:
+                    fut = await self.infer_frame(
+                        frame, frame_key, detection_cache,
+                        priority=priority, job_key=job_key, weight=weight, region=region
+                    )
+                    pending_inference += 1
+
+                in_flight.append((frame_key, frame, fut))
+                frame_n += 1
+
+                while pending_inference >= frames_in_flight:
+                    ready_key, ready_frame, ready_fut = in_flight.popleft()
+
+                    if ready_fut is None:
+                        yield ready_key, ready_frame, None
+                        continue
+
+                    pending_inference -= 1
+                    yield ready_key, ready_frame, (await ready_fut)[0]
+
+            while in_flight:
+                ready_key, ready_frame, ready_fut = in_flight.popleft()
+
+                if ready_fut is None:
+                    yield ready_key, ready_frame, None
+
+                else:
+                    yield ready_key, ready_frame, (await ready_fut)[0]
+
+        finally:
+            # Отмена оставшихся задач при досрочном завершении
+            for _, _, leftover_fut in in_flight:
+                if leftover_fut is not None:
+                    leftover_fut.cancel()
+
+            if detection_cache is not None:
+                await detection_cache.flush()
+
+    async def infer_frame(
+        self,
+        frame: CV_Image,
+        frame_id: Any,
+        detection_cache: Optional[VideoDetectionCache] = None,
+        priority: InferencePriority = InferencePriority.Bulk,
+        job_key: Optional[Hashable] = None,
+        weight: float = 1.0,
+        region: Optional[tuple[int, int, int, int]] = None
+    ) -> Future[list[Instances]]:
+        """
+        Получает выделения на кадре из кэша или добавляет кадр в очередь обработки нейросетью.
+
+        Если передана область кадра, нейросеть обрабатывает только ее, а выделения переводятся
+        в координаты всего кадра.
+
+        :param frame: Кадр в формате BGR.
+        :param frame_id: Номер кадра в видео (используется только при наличии кэша).
+        :param detection_cache: Кэш выделений видео.
+        :param priority: Класс приоритета задачи.
+        :param job_key: Ключ задания (например, идентификатор видео).
+        :param weight: Вес задания при распределении фоновых задач.
+        :param region: Область кадра left, top, right, bottom, передаваемая нейросети
+            (None - кадр целиком).
+        :return: Футура с выделениями на кадре на CPU.
+        """
+        future_result: Future[list[Instances]] = Future()
+
+        if detection_cache is not None and (detections := await detection_cache.get(frame_id)) is not None:
+            future_result.set_result([self.detections_to_instances(detections)])
+            return future_result
+
+        image: CV_Image = frame
+        if region is not None:
+            left, top, right, bottom = region
+            # Представление части кадра, копируется только в пакет нейросети
+            image = cast(CV_Image, frame[top:bottom, left:right])
+
+        inference_result: Future[list[Instances]] = await self.add_inference_task_to_queue(
+            image, priority=priority, job_key=job_key, weight=weight
+        )
+
+        def on_inference_done(fut: Future[list[Instances]]) -> None:
+            if future_result.done():
+                return
+
+            if fut.cancelled():
+                future_result.cancel()
+                return
+
+            if (err := fut.exception()) is not None:
+                future_result.set_exception(err)
+                return
+
+            instances: Instances = fut.result()[0].to("cpu")
+            if region is not None:
+                frame_height, frame_width = frame.shape[:2]
+                instances = self.shift_instances(instances, region[:2], (frame_height, frame_width))
+
+            if detection_cache is not None:
+                detection_cache.put(frame_id, self.instances_to_detections(instances))
+
+            future_result.set_result([instances])
+
+        inference_result.add_done_callback(on_inference_done)
+        # Отмена ожидания результата отменяет и задачу нейросети
+        future_result.add_done_callback(
+            lambda fut: inference_result.cancel() if fut.cancelled() else None
+        )
+        return future_result
+
+    @staticmethod
+    def shift_instances(
+        instances: Instances,
+        offset: tuple[int, int],
+        image_size: tuple[int, int]
+    ) -> Instances:
+        """
+        Переводит выделения, полученные на области изображения, в координаты всего изображения.
+        Маски выделений дополняются нулями до размера всего изображения.
+
+        :param instances: Выделения на области изображения на CPU.
+        :param offset: Координаты x, y левого верхнего угла области.
+        :param image_size: Высота и ширина всего изображения.
+        :return: Выделения на всем изображении.
+        """
+        shifted: Instances = Instances(image_size, **instances.get_fields())
+        shifted.pred_boxes = Boxes(
+            instances.pred_boxes.tensor + instances.pred_boxes.tensor.new_tensor([*offset, *offset])
+        )
+
+        if instances.has("pred_masks"):
+            left, top = offset
+            region_height, region_width = instances.pred_masks.shape[-2:]
+            masks: torch.Tensor = instances.pred_masks.new_zeros(
+                (*instances.pred_masks.shape[:-2], *image_size)
+            )
+            masks[..., top:top + region_height, left:left + region_width] = instances.pred_masks
+            shifted.pred_masks = masks
+
+        return shifted
+
+    @staticmethod
+    def get_region_fingerprint(model_fingerprint: str, region: Optional[tuple[int, int, int, int]]) -> str:
+        """
+        Получает отпечаток выделений модели на области кадра.
+
+        :param model_fingerprint: Отпечаток модели.
+        :param region: Область кадра, передаваемая нейросети (None - кадр целиком).
+        :return: Отпечаток модели, если обрабатывается кадр целиком, иначе отпечаток модели и области.
+        """
+        if region is None:
+            return model_fingerprint
+
+        fingerprint = hashlib.blake2b(digest_size=16)
+        fingerprint.update(f"{model_fingerprint};{region}".encode())
+        return fingerprint.hexdigest()
+
+    @staticmethod
+    def instances_to_detections(instances: Instances) -> RawDetections:
+        """
+        Преобразует выделения detectron2 в компактный вид для хранения.
+
+        :param instances: Выделения на CPU.
+        :return: Выделения в виде массивов.
+        """
+        return RawDetections(
+            instances.pred_boxes.tensor.numpy(),
+            instances.scores.numpy(),
+            instances.pred_classes.numpy(),
+            instances.image_size
+        )
+
+    @staticmethod
+    def detections_to_instances(detections: RawDetections) -> Instances:
+        """
+        Восстанавливает выделения detectron2 из компактного вида.
+
+        :param detections: Выделения в виде массивов.
+        :return: Выделения на CPU.
+        """
+        return Instances(
+            detections.image_size,
+            pred_boxes=Boxes(torch.from_numpy(detections.boxes.astype("float32"))),
+            scores=torch.from_numpy(detections.scores.astype("float32")),
+            pred_classes=torch.from_numpy(detections.classes.astype("int64"))
+        )
+
+    @staticmethod
+    def create_model_fingerprint(weights: Path, *parameters: Any) -> str:
+        """
+        Создает отпечаток модели из содержимого весов и параметров, влияющих на выделения.
+
+        :param weights: Путь до весов модели.
+        :param parameters: Параметры модели (например, порог уверенности).
+        :return: Отпечаток модели.
+        """
+        fingerprint = hashlib.blake2b(digest_size=16)
+        fingerprint.update(hash_file(weights).encode())
+
+        for parameter in parameters:
+            fingerprint.update(repr(parameter).encode())
+
+        return fingerprint.hexdigest()
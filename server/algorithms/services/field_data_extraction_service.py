@@ -52,7 +52,7 @@ class FieldDataExtractionService(FieldDataExtractionProtocol):
             blue_circle_center = field_data.blue_circle.center_point
 
         if field_data.red_center_line:
-            red_line_found: Optional[Line] = Line.find_lines(field_data.red_center_line.polygon.mask)
+            red_line_found: Optional[Line] = Line.find_lines(field_data.red_center_line.polygon)
             if red_line_found is not None:
                 center_line = red_line_found.clip_line_to_bounding_box(
                     field_data.red_center_line.bbox
@@ -70,7 +70,7 @@ class FieldDataExtractionService(FieldDataExtractionProtocol):
             blue_lines_values: list[Line] = []
 
             for blue_line_data in field_data.blue_lines:
-                if (line := Line.find_lines(blue_line_data.polygon.mask)) is not None:
+                if (line := Line.find_lines(blue_line_data.polygon)) is not None:
                     blue_lines_values.append(line.clip_line_to_bounding_box(blue_line_data.bbox))
 
             if len(blue_lines_values) != 0:
@@ -83,7 +83,7 @@ class FieldDataExtractionService(FieldDataExtractionProtocol):
             goal_lines_values: list[Line] = []
 
             for goal_line_data in field_data.goal_lines:
-                if (line := Line.find_lines(goal_line_data.polygon.mask)) is not None:
+                if (line := Line.find_lines(goal_line_data.polygon)) is not None:
                     goal_lines_values.append(line.clip_line_to_bounding_box(goal_line_data.bbox))
 
             if len(goal_lines_values) != 0:
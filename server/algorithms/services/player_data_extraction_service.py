@@ -1,21 +1,20 @@
 from __future__ import annotations
 
-from typing import Optional, TYPE_CHECKING, cast
+from typing import Optional, TYPE_CHECKING
 
-import cv2
-import torch
+import numpy as np
 from detectron2.structures import Instances
 
 from server.algorithms.data_types.player_data import PlayerData
 from server.algorithms.enums import Team
 from server.algorithms.enums.player_classes_enum import PlayerClasses
+from server.algorithms.field_detections_filter import filter_detections_on_field
 from server.algorithms.nn import TeamDetectionPredictor
 from server.algorithms.player_tracker import PlayerTracker
 from server.algorithms.players_mapper import PlayersMapper
 from server.algorithms.data_types.image_typehint import CV_Image
 
 if TYPE_CHECKING:
-    from torch import Tensor
     from server.algorithms.data_types import BoundingBox, Mask, RawPlayerTrackingData, RelativePoint
 
 
@@ -43,69 +42,56 @@ class PlayerDataExtractionService:
         self.team_predictor: TeamDetectionPredictor = team_predictor
         self.players_mapper: PlayersMapper = players_mapper
         self.player_tracker: PlayerTracker = player_tracker
-        self.field_mask: CV_Image = cast(CV_Image, cv2.cvtColor(field_mask.mask, cv2.COLOR_BGR2GRAY))
+        self.field_mask: Mask = field_mask
         self.field_bbox: BoundingBox = field_bounding_box.scale_bbox(0.8)
         self.known_tracked_players_teams: dict[int, Team] = {}
 
     def process_frame(
         self,
         frame: CV_Image,
-        instances: Instances,
+        instances: Optional[Instances],
     ) -> list[PlayerData]:
         """
         Обрабатывает переданный кадр.
 
         :param frame: Кадр с игроками.
-        :param instances: Выводы из Detectron2 с определениями классов игроков.
+        :param instances: Выводы из Detectron2 с определениями классов игроков
+            или None, если кадр не обрабатывался нейросетью и положения игроков предсказываются.
         :return: Список выделенных на кадре игроков и их номеров отслеживания.
         """
         output: list[PlayerData] = []
+        tracking_data: list[RawPlayerTrackingData]
 
-        # Filter out not on field
-        threshold = 0.5
-        filtered_instances: Instances = instances[instances.scores > threshold].to("cpu")
-
-        # Find boxes
-        boxes = filtered_instances.pred_boxes.tensor
-        x_centers = (boxes[:, 0] + boxes[:, 2]) / 2  # Midpoint of x_min and x_max
-        y_bottoms = boxes[:, 3]  # y_max (bottom coordinate)
-        centers_bottoms: list[list[float]] = torch.stack(
-            (x_centers, y_bottoms),
-            dim=1
-        ).to("cpu").tolist()
-
-        # Keep on field
-        keep = [self.field_mask[int(y) - 1, int(x) - 1] > 0 for x, y in centers_bottoms]
-        keep_tensor = torch.BoolTensor(keep)
-        filtered_on_field = filtered_instances[keep_tensor]
-
-        # Get required parameters
-        boxes = filtered_on_field.pred_boxes.tensor
-        scores: Tensor = filtered_on_field.scores
-        classes_predicted: Tensor = filtered_on_field.pred_classes
+        if instances is None:
+            tracking_data = self.player_tracker.predict()
 
-        # Update tracking algorithm
-        tracking_data: list[RawPlayerTrackingData] = self.player_tracker.update(
-            boxes, scores, classes_predicted
-        )
+        else:
+            tracking_data = self.update_tracking(instances)
 
         # Filter out players who don't need team detection
+        # (teams are detected only on boxes found by neural network, not on predicted ones)
         player_indexes_to_detect_team: list[int] = [
             n for n, track_data in enumerate(tracking_data)
                 if (
+                    instances is not None and
                     track_data.player_class != PlayerClasses.Referee and
                     track_data.bounding_box.intersects_with(self.field_bbox) and
                     track_data.tracking_id not in self.known_tracked_players_teams
                 )
         ]
 
-        # Find out teams of players according to AI model
-        teams: dict[int, Team] = {
-            player_index: self.team_predictor(
-                tracking_data[player_index].bounding_box.cut_out_image_part(frame)
+        # Find out teams of players according to AI model in a single batch
+        teams: dict[int, Team] = dict(
+            zip(
+                player_indexes_to_detect_team,
+                self.team_predictor.predict_batch(
+                    [
+                        tracking_data[player_index].bounding_box.cut_out_image_part(frame)
+                        for player_index in player_indexes_to_detect_team
+                    ]
+                )
             )
-            for player_index in player_indexes_to_detect_team
-        }
+        )
 
         # Find positions of players on mini map
         height, width, channels = frame.shape
@@ -140,3 +126,22 @@ class PlayerDataExtractionService:
             )
 
         return output
+
+    def update_tracking(self, instances: Instances) -> list[RawPlayerTrackingData]:
+        """
+        Обновляет отслеживания по выделениям игроков на поле.
+
+        :param instances: Выводы из Detectron2 с определениями классов игроков.
+        :return: Отслеживания игроков на кадре.
+        """
+        # Keep confident players on field
+        detections: np.ndarray = filter_detections_on_field(
+            instances.pred_boxes.tensor,
+            instances.scores,
+            instances.pred_classes,
+            self.field_mask,
+            score_threshold=self.player_tracker.detection_score_threshold
+        )
+
+        # Update tracking algorithm
+        return self.player_tracker.update(detections)
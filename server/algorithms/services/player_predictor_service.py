@@ -1,14 +1,13 @@
-import asyncio
-from asyncio import Future, Queue
 from pathlib import Path
 from typing import ClassVar, Optional
 
 from detectron2 import model_zoo
-from detectron2.config import get_cfg
-from detectron2.structures import Instances
+from detectron2.config import CfgNode, get_cfg
 
-from server.algorithms.data_types import CV_Image
+from server.algorithms.device_scheduler import DeviceScheduler
+from server.algorithms.enums import InferenceBackendType
 from server.algorithms.nn.batch_predictor import BatchPredictor
+from server.algorithms.services.base.inference_queue import InferenceQueue
 from server.algorithms.services.base.predictor_service import PredictorService
 
 
@@ -20,38 +19,64 @@ class PlayerPredictorService(PredictorService):
 
     _model_zoo_path: ClassVar[str] = "COCO-Detection/faster_rcnn_R_50_FPN_3x.yaml"
     predictor: BatchPredictor
-    device_lock: asyncio.Lock
-    image_queue: Queue[tuple[tuple[CV_Image, ...], Future[list[Instances]]]]
+    device_scheduler: DeviceScheduler
+    image_queue: InferenceQueue
 
     def __init__(
         self,
         weights: Path,
         device: str,
-        image_queue: Queue[tuple[tuple[CV_Image, ...], Future[list[Instances]]]],
+        image_queue: InferenceQueue,
         threshold: float = 0.5,
-        device_lock: Optional[asyncio.Lock] = None
+        device_scheduler: Optional[DeviceScheduler] = None,
+        max_batch_size: int = 1,
+        max_batch_wait_time: float = 0.0,
+        backend_type: InferenceBackendType = InferenceBackendType.Eager
     ):
         """
         Инициализирует сервис обработки нейронной сетью изображений поля с игроками для получения их типов и позиций.
 
         :param weights: Путь до весов модели.
         :param device: Имя устройства выполнения.
+        :param image_queue: Очередь задач обработки с классами приоритета.
         :param threshold: Пороговое значение уверенности в верном результате для выделения.
-        :param device_lock: Блокировщик доступа к устройству для избежания совместного использования
+        :param device_scheduler: Планировщик доступа к устройству для избежания совместного использования
             при запуске нейросети.
+        :param max_batch_size: Максимальное количество изображений, обрабатываемых за один запуск нейросети.
+        :param max_batch_wait_time: Максимальное время ожидания (в секундах) дополнительных изображений
+            для формирования пакета.
+        :param backend_type: Способ выполнения модели нейросети.
+        """
+        self.predictor = BatchPredictor(
+            self.create_config(weights, device, threshold), backend_type
+        )
+        self.image_queue = image_queue
+        self.model_fingerprint = self.create_model_fingerprint(
+            weights, self._model_zoo_path, threshold
+        )
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait_time = max_batch_wait_time
+
+        if device_scheduler is None:
+            self.device_scheduler = DeviceScheduler()
+
+        else:
+            self.device_scheduler = device_scheduler
+
+    @classmethod
+    def create_config(cls, weights: Path, device: str, threshold: float = 0.5) -> CfgNode:
+        """
+        Создает конфигурацию модели detectron2.
+
+        :param weights: Путь до весов модели.
+        :param device: Имя устройства выполнения.
+        :param threshold: Пороговое значение уверенности в верном результате для выделения.
+        :return: Конфигурация модели.
         """
         cfg = get_cfg()
-        cfg.merge_from_file(model_zoo.get_config_file(self._model_zoo_path))
+        cfg.merge_from_file(model_zoo.get_config_file(cls._model_zoo_path))
         cfg.MODEL.WEIGHTS = str(weights.resolve())
         cfg.MODEL.ROI_HEADS.NUM_CLASSES = 3
         cfg.MODEL.DEVICE = device
         cfg.MODEL.ROI_HEADS.SCORE_THRESH_TEST = threshold
-
-        self.predictor = BatchPredictor(cfg)
-        self.image_queue = image_queue
-
-        if device_lock is None:
-            self.device_lock = asyncio.Lock()
-
-        else:
-            self.device_lock = device_lock
+        return cfg
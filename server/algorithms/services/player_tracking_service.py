@@ -1,13 +1,11 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, cast
-
-import cv2
-import torch
+import numpy as np
 from detectron2.structures import Instances
 
 from server.algorithms.enums import Team
 from server.algorithms.enums.player_classes_enum import PlayerClasses
+from server.algorithms.field_detections_filter import filter_detections_on_field
 from server.algorithms.player_tracker import PlayerTracker
 from server.data_storage.dto import BoxDTO, SubsetDataDTO
 from server.data_storage.dto.relative_point_dto import RelativePointDTO
@@ -22,9 +20,6 @@ from server.algorithms.data_types import (
     RelativePoint,
 )
 
-if TYPE_CHECKING:
-    from torch import Tensor
-
 
 class PlayerTrackingService:
     """
@@ -37,9 +32,9 @@ class PlayerTrackingService:
         field_bounding_box: BoundingBox
     ):
         self.player_tracker: PlayerTracker = player_tracker
-        self.field_mask: CV_Image = cast(CV_Image, cv2.cvtColor(field_mask.mask, cv2.COLOR_BGR2GRAY))
+        self.field_mask: Mask = field_mask
         # Find positions of players on mini map
-        height, width, channels = field_mask.mask.shape
+        height, width = field_mask.frame_shape[:2]
         self.resolution: tuple[int, int] = (width, height)
         self.field_bbox: BoundingBox = field_bounding_box.scale_bbox(0.8)
 
@@ -56,37 +51,18 @@ class PlayerTrackingService:
         :param instances: Выводы из Detectron2 с определениями классов игроков.
         :return: Список выделенных на кадре игроков и их номеров отслеживания.
         """
-        # Filter out not on field
-        threshold = 0.5
-        filtered_instances: Instances = instances[instances.scores > threshold].to("cpu")
-
-        # Find boxes
-        boxes = filtered_instances.pred_boxes.tensor
-        x_centers = (boxes[:, 0] + boxes[:, 2]) / 2  # Midpoint of x_min and x_max
-        y_bottoms = boxes[:, 3]  # y_max (bottom coordinate)
-        centers_bottoms: list[list[float]] = torch.stack(
-            (x_centers, y_bottoms),
-            dim=1
-        ).to("cpu").tolist()
-
-        # Keep on field
-        keep = [
-            (self.field_mask[int(y) - 1, int(x) - 1] > 0)
-                and ((x, y) in self.field_bbox)
-            for x, y in centers_bottoms
-        ]
-        keep_tensor = torch.BoolTensor(keep)
-        filtered_on_field = filtered_instances[keep_tensor]
-
-        # Get required parameters
-        boxes = filtered_on_field.pred_boxes.tensor
-        scores: Tensor = filtered_on_field.scores
-        classes_predicted: Tensor = filtered_on_field.pred_classes
+        # Keep confident players on field
+        detections: np.ndarray = filter_detections_on_field(
+            instances.pred_boxes.tensor,
+            instances.scores,
+            instances.pred_classes,
+            self.field_mask,
+            score_threshold=self.player_tracker.detection_score_threshold,
+            field_bbox=self.field_bbox
+        )
 
         # Update tracking algorithm
-        tracking_data: list[RawPlayerTrackingData] = self.player_tracker.update(
-            boxes, scores, classes_predicted
-        )
+        tracking_data: list[RawPlayerTrackingData] = self.player_tracker.update(detections)
 
         output: list[SubsetDataInputDTO] = []
         for player_data in tracking_data:
@@ -0,0 +1,145 @@
+import numpy as np
+
+from server.algorithms.box_kalman_filter import BoxKalmanFilter
+from server.algorithms.data_types import BoundingBox, Point
+from server.algorithms.data_types.raw_player_tracking_data import RawPlayerTrackingData
+
+
+class TrackMotionPredictor:
+    """
+    Предсказывает положения отслеживаемых игроков на кадрах между запусками нейросети
+    с помощью фильтра Калмана с постоянной скоростью.
+
+    Состояние отслеживания - центр, ширина, высота прямоугольника и их скорости за кадр.
+    Все отслеживания обрабатываются одновременно в виде массивов.
+    """
+
+    def __init__(self) -> None:
+        self.tracks: list[RawPlayerTrackingData] = []
+        self.mean: np.ndarray = np.zeros((0, 8), dtype=np.float64)
+        self.covariance: np.ndarray = np.zeros((0, 8, 8), dtype=np.float64)
+        self.kalman_filter: BoxKalmanFilter = BoxKalmanFilter()
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def update(self, tracking_data: list[RawPlayerTrackingData]) -> None:
+        """
+        Уточняет состояния по отслеживаниям, полученным на кадре с запуском нейросети.
+
+        Отслеживания, отсутствующие на кадре, удаляются, новые - начинают движение с нулевой скоростью.
+
+        :param tracking_data: Отслеживания игроков на текущем кадре.
+        :return: Ничего.
+        """
+        self._advance()
+
+        previous_indexes: dict[int, int] = {
+            track.tracking_id: n for n, track in enumerate(self.tracks)
+        }
+        measurements: np.ndarray = np.array(
+            [self._to_measurement(track.bounding_box) for track in tracking_data],
+            dtype=np.float64
+        ).reshape(-1, 4)
+
+        known: np.ndarray = np.array(
+            [track.tracking_id in previous_indexes for track in tracking_data], dtype=bool
+        )
+        known_indexes: np.ndarray = np.array(
+            [previous_indexes[track.tracking_id] for track in tracking_data if track.tracking_id in previous_indexes],
+            dtype=np.int64
+        )
+
+        mean: np.ndarray = np.zeros((len(tracking_data), 8), dtype=np.float64)
+        covariance: np.ndarray = np.zeros((len(tracking_data), 8, 8), dtype=np.float64)
+
+        if known.any():
+            mean[known], covariance[known] = self.kalman_filter.correct(
+                self.mean[known_indexes], self.covariance[known_indexes], measurements[known]
+            )
+
+        if (~known).any():
+            mean[~known], covariance[~known] = self.kalman_filter.initiate(measurements[~known])
+
+        self.tracks = list(tracking_data)
+        self.mean = mean
+        self.covariance = covariance
+
+    def predict(self) -> list[RawPlayerTrackingData]:
+        """
+        Предсказывает положения отслеживаний на следующем кадре без запуска нейросети.
+
+        :return: Предсказанные отслеживания игроков.
+        """
+        self._advance()
+
+        return [
+            track._replace(bounding_box=self._to_bounding_box(state))
+            for track, state in zip(self.tracks, self.mean)
+        ]
+
+    def max_uncertainty(self) -> float:
+        """
+        Максимальная неопределенность положения среди отслеживаний
+        (стандартное отклонение центра относительно высоты прямоугольника).
+
+        :return: Наибольшая относительная неопределенность или 0, если отслеживаний нет.
+        """
+        if not self.tracks:
+            return 0.0
+
+        position_std: np.ndarray = np.sqrt(self.covariance[:, 0, 0] + self.covariance[:, 1, 1])
+        return float(np.max(position_std / np.maximum(self.mean[:, 3], 1.0)))
+
+    def max_relative_speed(self) -> float:
+        """
+        Максимальная скорость отслеживаний за кадр относительно высоты прямоугольника.
+
+        :return: Наибольшая относительная скорость или 0, если отслеживаний нет.
+        """
+        if not self.tracks:
+            return 0.0
+
+        speed: np.ndarray = np.hypot(self.mean[:, 4], self.mean[:, 5])
+        return float(np.max(speed / np.maximum(self.mean[:, 3], 1.0)))
+
+    def _advance(self) -> None:
+        """
+        Переводит состояния отслеживаний на следующий кадр.
+
+        :return: Ничего.
+        """
+        if not self.tracks:
+            return
+
+        self.mean, self.covariance = self.kalman_filter.predict(self.mean, self.covariance)
+
+    @staticmethod
+    def _to_measurement(bounding_box: BoundingBox) -> tuple[float, float, float, float]:
+        """
+        Преобразует прямоугольник в измерение из центра, ширины и высоты.
+
+        :param bounding_box: Ограничивающий прямоугольник.
+        :return: Измерение.
+        """
+        return (
+            (bounding_box.min_point.x + bounding_box.max_point.x) / 2,
+            (bounding_box.min_point.y + bounding_box.max_point.y) / 2,
+            bounding_box.max_point.x - bounding_box.min_point.x,
+            bounding_box.max_point.y - bounding_box.min_point.y
+        )
+
+    @staticmethod
+    def _to_bounding_box(state: np.ndarray) -> BoundingBox:
+        """
+        Преобразует состояние отслеживания в ограничивающий прямоугольник.
+
+        :param state: Состояние отслеживания.
+        :return: Ограничивающий прямоугольник.
+        """
+        center_x, center_y, width, height = state[:4].tolist()
+
+        return BoundingBox(
+            Point(center_x - width / 2, center_y - height / 2),
+            Point(center_x + width / 2, center_y + height / 2)
+        )
@@ -0,0 +1,154 @@
+import dataclasses
+from typing import Optional, Sequence
+
+import numpy as np
+
+from server.algorithms.data_types import PlayerData
+from server.algorithms.trackers.association import associate_by_iou, iou_matrix
+
+
+class TrackStitcher:
+    """
+    Объединяет отслеживания игроков из отрезков видео, обработанных независимо.
+
+    Соседние отрезки перекрываются несколькими кадрами: отслеживания следующего отрезка
+    сопоставляются с уже пронумерованными отслеживаниями предыдущего по среднему IoU
+    на перекрывающихся кадрах и получают их идентификаторы, остальные отслеживания
+    получают новые глобально уникальные идентификаторы.
+    """
+
+    def __init__(self, min_iou: float = 0.5, start_from_id: int = 1):
+        """
+        :param min_iou: Минимальное среднее IoU на перекрытии для объединения отслеживаний.
+        :param start_from_id: Первый выдаваемый глобальный идентификатор.
+        """
+        self.min_iou: float = min_iou
+        self.next_id: int = start_from_id
+        self.mapping: dict[int, int] = {}
+
+    def start_segment(
+        self,
+        previous_overlap: Sequence[Sequence[PlayerData]],
+        overlap: Sequence[Sequence[PlayerData]]
+    ) -> None:
+        """
+        Начинает нумерацию отслеживаний нового отрезка.
+
+        :param previous_overlap: Перекрывающиеся кадры предыдущего отрезка с глобальными идентификаторами.
+        :param overlap: Те же кадры нового отрезка с идентификаторами отрезка.
+        :return: Ничего.
+        """
+        self.mapping = {}
+        previous_ids: list[int] = sorted(
+            {player.tracking_id for frame in previous_overlap for player in frame}
+        )
+        segment_ids: list[int] = sorted(
+            {player.tracking_id for frame in overlap for player in frame}
+        )
+
+        if not previous_ids or not segment_ids:
+            return
+
+        previous_indexes: dict[int, int] = {tracking_id: n for n, tracking_id in enumerate(previous_ids)}
+        segment_indexes: dict[int, int] = {tracking_id: n for n, tracking_id in enumerate(segment_ids)}
+        iou_sum: np.ndarray = np.zeros((len(previous_ids), len(segment_ids)), dtype=np.float64)
+        frames_together: np.ndarray = np.zeros_like(iou_sum)
+
+        for previous_frame, frame in zip(previous_overlap, overlap):
+            if not previous_frame or not frame:
+                continue
+
+            rows: np.ndarray = np.array([previous_indexes[player.tracking_id] for player in previous_frame])
+            columns: np.ndarray = np.array([segment_indexes[player.tracking_id] for player in frame])
+
+            iou_sum[np.ix_(rows, columns)] += iou_matrix(
+                self._boxes(previous_frame), self._boxes(frame)
+            )
+            frames_together[np.ix_(rows, columns)] += 1
+
+        # Среднее IoU на кадрах, где присутствуют оба отслеживания
+        mean_iou: np.ndarray = iou_sum / np.maximum(frames_together, 1)
+        matches, _, _ = associate_by_iou(mean_iou, self.min_iou)
+
+        self.mapping = {
+            segment_ids[column]: previous_ids[row] for row, column in matches.tolist()
+        }
+
+    def renumber(self, frame: Sequence[PlayerData]) -> list[PlayerData]:
+        """
+        Заменяет идентификаторы отслеживаний отрезка на глобальные.
+
+        :param frame: Игроки на кадре текущего отрезка.
+        :return: Игроки на кадре с глобальными идентификаторами.
+        """
+        renumbered: list[PlayerData] = []
+
+        for player in frame:
+            global_id: int | None = self.mapping.get(player.tracking_id)
+
+            if global_id is None:
+                global_id = self.mapping[player.tracking_id] = self.next_id
+                self.next_id += 1
+
+            renumbered.append(dataclasses.replace(player, tracking_id=global_id))
+
+        return renumbered
+
+    @staticmethod
+    def split_into_segments(
+        frames_count: int,
+        segments_count: int,
+        overlap: int,
+        keyframes: Optional[Sequence[int]] = None
+    ) -> list[tuple[int, int]]:
+        """
+        Разбивает видео на отрезки примерно одинаковой длины.
+
+        Количество отрезков уменьшается так, чтобы каждый отрезок был не короче
+        двух перекрытий. Если переданы ключевые кадры, границы сдвигаются так, чтобы чтение
+        отрезка вместе с перекрытием начиналось с ближайшего ключевого кадра, пока отрезки
+        остаются не короче двух перекрытий.
+
+        :param frames_count: Количество кадров видео.
+        :param segments_count: Желаемое количество отрезков.
+        :param overlap: Количество кадров перекрытия соседних отрезков.
+        :param keyframes: Номера ключевых кадров видео по возрастанию.
+        :return: Промежутки кадров отрезков [начало, конец) без учета перекрытия.
+        """
+        segments_count = max(1, min(segments_count, frames_count // max(2 * overlap, 1)))
+        bounds: list[int] = np.linspace(0, frames_count, segments_count + 1).round().astype(int).tolist()
+
+        if keyframes is not None and len(keyframes) > 0:
+            keyframes_array: np.ndarray = np.asarray(keyframes)
+
+            for n in range(1, segments_count):
+                nearest_keyframe: int = int(
+                    keyframes_array[np.abs(keyframes_array - (bounds[n] - overlap)).argmin()]
+                )
+                aligned_bound: int = nearest_keyframe + overlap
+
+                if bounds[n - 1] + 2 * overlap <= aligned_bound <= bounds[n + 1] - 2 * overlap:
+                    bounds[n] = aligned_bound
+
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    @staticmethod
+    def _boxes(frame: Sequence[PlayerData]) -> np.ndarray:
+        """
+        Получает прямоугольники игроков на кадре.
+
+        :param frame: Игроки на кадре.
+        :return: Прямоугольники (N, 4) в формате x1, y1, x2, y2.
+        """
+        return np.array(
+            [
+                (
+                    player.bounding_box_on_camera.min_point.x,
+                    player.bounding_box_on_camera.min_point.y,
+                    player.bounding_box_on_camera.max_point.x,
+                    player.bounding_box_on_camera.max_point.y
+                )
+                for player in frame
+            ],
+            dtype=np.float64
+        ).reshape(-1, 4)
@@ -0,0 +1,16 @@
+from .association import associate_by_iou, iou_matrix
+from .byte_tracker import ByteTracker
+from .iou_tracker import IoUTracker
+from .multi_object_tracker import MultiObjectTracker
+from .sort_tracker_adapter import SortTrackerAdapter
+from .tracker_factory import create_tracker
+
+__all__ = (
+    "MultiObjectTracker",
+    "IoUTracker",
+    "ByteTracker",
+    "SortTrackerAdapter",
+    "create_tracker",
+    "associate_by_iou",
+    "iou_matrix"
+)
@@ -0,0 +1,56 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Вычисляет пересечения над объединениями всех пар прямоугольников.
+
+    :param boxes_a: Прямоугольники (N, 4) в формате x1, y1, x2, y2.
+    :param boxes_b: Прямоугольники (M, 4) в формате x1, y1, x2, y2.
+    :return: Матрица (N, M) значений IoU.
+    """
+    boxes_a = boxes_a.reshape(-1, 4)
+    boxes_b = boxes_b.reshape(-1, 4)
+
+    top_left: np.ndarray = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right: np.ndarray = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection: np.ndarray = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+
+    area_a: np.ndarray = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b: np.ndarray = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union: np.ndarray = area_a[:, None] + area_b[None, :] - intersection
+
+    return intersection / np.maximum(union, 1e-9)
+
+
+def associate_by_iou(
+    iou: np.ndarray,
+    min_iou: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Сопоставляет строки и столбцы матрицы IoU венгерским алгоритмом,
+    отбрасывая пары с пересечением меньше порога.
+
+    :param iou: Матрица (N, M) значений IoU.
+    :param min_iou: Минимальное IoU сопоставленной пары.
+    :return: Пары (K, 2) номеров строки и столбца, номера несопоставленных строк и столбцов.
+    """
+    rows_count, columns_count = iou.shape
+
+    if rows_count == 0 or columns_count == 0:
+        return (
+            np.zeros((0, 2), dtype=np.int64),
+            np.arange(rows_count, dtype=np.int64),
+            np.arange(columns_count, dtype=np.int64)
+        )
+
+    rows, columns = linear_sum_assignment(iou, maximize=True)
+    accepted: np.ndarray = iou[rows, columns] >= min_iou
+    matches: np.ndarray = np.stack((rows[accepted], columns[accepted]), axis=1).astype(np.int64)
+
+    return (
+        matches,
+        np.setdiff1d(np.arange(rows_count), matches[:, 0]).astype(np.int64),
+        np.setdiff1d(np.arange(columns_count), matches[:, 1]).astype(np.int64)
+    )
@@ -0,0 +1,68 @@
+import numpy as np
+
+from server.algorithms.trackers.association import associate_by_iou, iou_matrix
+from server.algorithms.trackers.iou_tracker import IoUTracker
+
+
+class ByteTracker(IoUTracker):
+    """
+    Алгоритм отслеживания ByteTrack.
+
+    Сначала с отслеживаниями сопоставляются уверенные выделения, затем оставшиеся отслеживания,
+    сопоставленные на предыдущем кадре, сопоставляются с менее уверенными выделениями
+    (например, частично перекрытыми игроками). Новые отслеживания создаются только из уверенных выделений,
+    а потерянные отслеживания хранятся дольше для восстановления после перекрытий.
+    """
+
+    def __init__(
+        self,
+        max_age: int = 30,
+        min_hits: int = 2,
+        iou_threshold: float = 0.2,
+        detection_score_threshold: float = 0.1,
+        high_score_threshold: float = 0.6,
+        low_score_iou_threshold: float = 0.5
+    ):
+        """
+        :param max_age: Количество кадров без выделения, после которого отслеживание удаляется.
+        :param min_hits: Количество подряд сопоставленных кадров для выдачи отслеживания.
+        :param iou_threshold: Минимальное IoU при сопоставлении уверенных выделений.
+        :param detection_score_threshold: Минимальная уверенность передаваемых выделений.
+        :param high_score_threshold: Уверенность, с которой выделение считается уверенным.
+        :param low_score_iou_threshold: Минимальное IoU при сопоставлении менее уверенных выделений.
+        """
+        super().__init__(max_age, min_hits, iou_threshold, detection_score_threshold)
+        self.high_score_threshold: float = high_score_threshold
+        self.low_score_iou_threshold: float = low_score_iou_threshold
+
+    def associate(self, detections: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        predicted_boxes: np.ndarray = self.kalman_filter.states_to_boxes(self.mean)
+        high_score: np.ndarray = detections[:, 4] >= self.high_score_threshold
+        high_indexes: np.ndarray = np.flatnonzero(high_score)
+        low_indexes: np.ndarray = np.flatnonzero(~high_score)
+
+        # Сопоставление всех отслеживаний с уверенными выделениями
+        high_matches, unmatched_tracks, unmatched_high = associate_by_iou(
+            iou_matrix(predicted_boxes, detections[high_indexes, :4]),
+            self.iou_threshold
+        )
+
+        # Сопоставление отслеживаний, найденных на предыдущем кадре, с менее уверенными выделениями
+        recent_tracks: np.ndarray = unmatched_tracks[self.time_since_update[unmatched_tracks] <= 1]
+        low_matches, _, _ = associate_by_iou(
+            iou_matrix(predicted_boxes[recent_tracks], detections[low_indexes, :4]),
+            self.low_score_iou_threshold
+        )
+
+        matches: np.ndarray = np.concatenate(
+            (
+                np.stack((high_matches[:, 0], high_indexes[high_matches[:, 1]]), axis=1),
+                np.stack((recent_tracks[low_matches[:, 0]], low_indexes[low_matches[:, 1]]), axis=1)
+            )
+        ).astype(np.int64)
+
+        return (
+            matches,
+            np.setdiff1d(unmatched_tracks, matches[:, 0]).astype(np.int64),
+            high_indexes[unmatched_high]
+        )
@@ -0,0 +1,143 @@
+import numpy as np
+
+from server.algorithms.box_kalman_filter import BoxKalmanFilter
+from server.algorithms.trackers.association import associate_by_iou, iou_matrix
+from server.algorithms.trackers.multi_object_tracker import MultiObjectTracker
+
+
+class IoUTracker(MultiObjectTracker):
+    """
+    Алгоритм отслеживания SORT с векторизованными над всеми отслеживаниями
+    фильтром Калмана и сопоставлением по IoU венгерским алгоритмом.
+    """
+
+    def __init__(
+        self,
+        max_age: int = 6,
+        min_hits: int = 4,
+        iou_threshold: float = 0.2,
+        detection_score_threshold: float = 0.6
+    ):
+        """
+        :param max_age: Количество кадров без выделения, после которого отслеживание удаляется.
+        :param min_hits: Количество подряд сопоставленных кадров для выдачи отслеживания.
+        :param iou_threshold: Минимальное IoU предсказания отслеживания и выделения.
+        :param detection_score_threshold: Минимальная уверенность передаваемых выделений.
+        """
+        self.max_age: int = max_age
+        self.min_hits: int = min_hits
+        self.iou_threshold: float = iou_threshold
+        self.detection_score_threshold: float = detection_score_threshold
+
+        self.kalman_filter: BoxKalmanFilter = BoxKalmanFilter()
+        self.frame_count: int = 0
+        self.next_id: int = 1
+
+        self.mean: np.ndarray = np.zeros((0, 8), dtype=np.float64)
+        self.covariance: np.ndarray = np.zeros((0, 8, 8), dtype=np.float64)
+        self.ids: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.classes: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.scores: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.hit_streaks: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.time_since_update: np.ndarray = np.zeros(0, dtype=np.int64)
+
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        detections = detections.reshape(-1, 6).astype(np.float64)
+        self.frame_count += 1
+
+        if len(self.ids):
+            self.mean, self.covariance = self.kalman_filter.predict(self.mean, self.covariance)
+            self.time_since_update += 1
+
+        matches, unmatched_tracks, new_detections = self.associate(detections)
+        measurements: np.ndarray = self.kalman_filter.boxes_to_measurements(detections[:, :4])
+
+        tracks: np.ndarray = matches[:, 0]
+        matched_detections: np.ndarray = matches[:, 1]
+
+        if len(matches):
+            self.mean[tracks], self.covariance[tracks] = self.kalman_filter.correct(
+                self.mean[tracks], self.covariance[tracks], measurements[matched_detections]
+            )
+            self.scores[tracks] = detections[matched_detections, 4]
+            self.classes[tracks] = detections[matched_detections, 5]
+            self.time_since_update[tracks] = 0
+            self.hit_streaks[tracks] += 1
+
+        self.hit_streaks[unmatched_tracks] = 0
+        self._create_tracks(detections[new_detections], measurements[new_detections])
+
+        output: np.ndarray = self._confirmed_tracks()
+        self._remove_tracks(self.time_since_update > self.max_age)
+
+        return output
+
+    def associate(self, detections: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Сопоставляет предсказанные отслеживания с выделениями на кадре.
+
+        :param detections: Выделения (N, 6) на кадре.
+        :return: Пары (K, 2) номеров отслеживания и выделения, номера несопоставленных отслеживаний
+            и номера выделений, из которых создаются новые отслеживания.
+        """
+        return associate_by_iou(
+            iou_matrix(self.kalman_filter.states_to_boxes(self.mean), detections[:, :4]),
+            self.iou_threshold
+        )
+
+    def _create_tracks(self, detections: np.ndarray, measurements: np.ndarray) -> None:
+        """
+        Создает отслеживания из несопоставленных выделений.
+
+        :param detections: Выделения (N, 6).
+        :param measurements: Измерения выделений (N, 4).
+        :return: Ничего.
+        """
+        mean, covariance = self.kalman_filter.initiate(measurements)
+        count: int = len(detections)
+
+        self.mean = np.concatenate((self.mean, mean))
+        self.covariance = np.concatenate((self.covariance, covariance))
+        self.ids = np.concatenate((self.ids, np.arange(self.next_id, self.next_id + count)))
+        self.classes = np.concatenate((self.classes, detections[:, 5].astype(np.int64)))
+        self.scores = np.concatenate((self.scores, detections[:, 4]))
+        self.hit_streaks = np.concatenate((self.hit_streaks, np.ones(count, dtype=np.int64)))
+        self.time_since_update = np.concatenate((self.time_since_update, np.zeros(count, dtype=np.int64)))
+        self.next_id += count
+
+    def _confirmed_tracks(self) -> np.ndarray:
+        """
+        Выбирает отслеживания, сопоставленные на текущем кадре и подтвержденные
+        достаточным количеством кадров (в начале видео выдаются все сопоставленные).
+
+        :return: Массив (M, 7) отслеживаний.
+        """
+        confirmed: np.ndarray = (self.time_since_update == 0) & (
+            (self.hit_streaks >= self.min_hits) | (self.frame_count <= self.min_hits)
+        )
+
+        return np.concatenate(
+            (
+                self.kalman_filter.states_to_boxes(self.mean[confirmed]),
+                self.ids[confirmed, None],
+                self.classes[confirmed, None],
+                self.scores[confirmed, None]
+            ),
+            axis=1
+        )
+
+    def _remove_tracks(self, removed: np.ndarray) -> None:
+        """
+        Удаляет отслеживания.
+
+        :param removed: Маска удаляемых отслеживаний.
+        :return: Ничего.
+        """
+        kept: np.ndarray = ~removed
+        self.mean = self.mean[kept]
+        self.covariance = self.covariance[kept]
+        self.ids = self.ids[kept]
+        self.classes = self.classes[kept]
+        self.scores = self.scores[kept]
+        self.hit_streaks = self.hit_streaks[kept]
+        self.time_since_update = self.time_since_update[kept]
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class MultiObjectTracker(ABC):
+    """
+    Базовый класс алгоритма отслеживания идентичности объектов между кадрами.
+    """
+    # Минимальная уверенность выделений, передаваемых алгоритму
+    detection_score_threshold: float = 0.5
+
+    @abstractmethod
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        """
+        Обновляет отслеживания по выделениям на новом кадре.
+
+        :param detections: Выделения в виде массива (N, 6)
+            из охватывающего прямоугольника x1, y1, x2, y2, оценки уверенности и класса.
+        :return: Массив (M, 7) подтвержденных отслеживаний на кадре
+            из прямоугольника, идентификатора, класса и оценки уверенности.
+        """
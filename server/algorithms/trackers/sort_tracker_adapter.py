@@ -0,0 +1,30 @@
+import numpy as np
+
+from server.algorithms.trackers.multi_object_tracker import MultiObjectTracker
+
+
+class SortTrackerAdapter(MultiObjectTracker):
+    """
+    Алгоритм отслеживания SORT из библиотеки sort-pip.
+    """
+
+    def __init__(
+        self,
+        track_length: int = 6,
+        min_hits: int = 4,
+        iou_threshold: float = 0.2,
+        detection_score_threshold: float = 0.6
+    ):
+        """
+        :param track_length: Количество кадров без выделения, после которого отслеживание удаляется.
+        :param min_hits: Количество сопоставленных кадров для выдачи отслеживания.
+        :param iou_threshold: Минимальное IoU предсказания отслеживания и выделения.
+        :param detection_score_threshold: Минимальная уверенность передаваемых выделений.
+        """
+        from sort.tracker import SortTracker
+
+        self.tracker: SortTracker = SortTracker(track_length, min_hits, iou_threshold)
+        self.detection_score_threshold: float = detection_score_threshold
+
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        return self.tracker.update(detections.reshape(-1, 6))
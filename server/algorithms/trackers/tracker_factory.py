@@ -0,0 +1,25 @@
+from server.algorithms.enums import TrackerType
+from server.algorithms.trackers.byte_tracker import ByteTracker
+from server.algorithms.trackers.iou_tracker import IoUTracker
+from server.algorithms.trackers.multi_object_tracker import MultiObjectTracker
+from server.algorithms.trackers.sort_tracker_adapter import SortTrackerAdapter
+
+
+def create_tracker(tracker_type: TrackerType) -> MultiObjectTracker:
+    """
+    Создает алгоритм отслеживания игроков.
+
+    :param tracker_type: Выбранный алгоритм отслеживания.
+    :return: Алгоритм отслеживания.
+    """
+    match tracker_type:
+        case TrackerType.Sort:
+            return SortTrackerAdapter()
+
+        case TrackerType.IoU:
+            return IoUTracker()
+
+        case TrackerType.ByteTrack:
+            return ByteTracker()
+
+    raise ValueError(f"Unknown tracker {tracker_type}")
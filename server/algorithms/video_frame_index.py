@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import bisect
+import os
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import cv2
+import ffmpeg
+import numpy as np
+
+from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
+
+# Количество попыток перехода к кадру до перехода в начало видео
+MAX_SEEK_ATTEMPTS: int = 4
+
+
+class VideoFrameIndex:
+    """
+    Индекс кадров видео: временные метки кадров в порядке показа, номера ключевых кадров
+    и их смещения в файле.
+
+    Строится один раз после конвертации видео и позволяет переходить к кадру через ближайший
+    предшествующий ключевой кадр, декодируя вперед только необходимое количество кадров.
+    """
+    pts: np.ndarray
+    time_base: float
+    keyframes: np.ndarray
+    keyframe_positions: np.ndarray
+    video_size: int
+
+    def __init__(
+        self,
+        pts: np.ndarray,
+        time_base: float,
+        keyframes: np.ndarray,
+        keyframe_positions: np.ndarray,
+        video_size: int
+    ):
+        """
+        :param pts: Временные метки кадров в единицах time_base в порядке показа (N,).
+        :param time_base: Длительность единицы временной метки в секундах.
+        :param keyframes: Номера ключевых кадров по возрастанию (K,).
+        :param keyframe_positions: Смещения ключевых кадров в файле в байтах (K,).
+        :param video_size: Размер файла видео, для которого построен индекс.
+        """
+        self.pts = pts
+        self.time_base = time_base
+        self.keyframes = keyframes
+        self.keyframe_positions = keyframe_positions
+        self.video_size = video_size
+        self._keyframes_list: list[int] = keyframes.tolist()
+
+    @classmethod
+    def from_packets(
+        cls,
+        packets: Sequence[dict[str, Any]],
+        time_base: float,
+        video_size: int
+    ) -> VideoFrameIndex:
+        """
+        Создает индекс из пакетов видеопотока в порядке декодирования.
+
+        :param packets: Пакеты с ключами pts, pos и flags (ключевой кадр отмечен флагом K).
+        :param time_base: Длительность единицы временной метки в секундах.
+        :param video_size: Размер файла видео.
+        :return: Индекс кадров.
+        :raise InvalidFileFormat: Пакеты не содержат временных меток.
+        """
+        packets = [packet for packet in packets if packet.get("pts") is not None]
+
+        if not packets:
+            raise InvalidFileFormat("Video stream doesn't have packets with timestamps")
+
+        pts: np.ndarray = np.array([int(packet["pts"]) for packet in packets], dtype=np.int64)
+        is_keyframe: np.ndarray = np.array(["K" in packet.get("flags", "") for packet in packets])
+        positions: np.ndarray = np.array(
+            [int(packet.get("pos") or -1) for packet in packets], dtype=np.int64
+        )
+
+        # Packets with B-frames are stored out of presentation order
+        order: np.ndarray = np.argsort(pts, kind="stable")
+        frame_numbers: np.ndarray = np.empty_like(order)
+        frame_numbers[order] = np.arange(len(order))
+
+        keyframes: np.ndarray = frame_numbers[is_keyframe]
+        keyframe_order: np.ndarray = np.argsort(keyframes)
+
+        return cls(
+            pts[order],
+            time_base,
+            keyframes[keyframe_order],
+            positions[is_keyframe][keyframe_order],
+            video_size
+        )
+
+    @classmethod
+    def build(cls, video_file: Path) -> VideoFrameIndex:
+        """
+        Строит индекс кадров видео по пакетам видеопотока из ffprobe.
+
+        :param video_file: Путь до видео.
+        :return: Индекс кадров.
+        :raise InvalidFileFormat: Видео не поддерживается ffmpeg.
+        """
+        try:
+            probe: dict[str, Any] = ffmpeg.probe(
+                str(video_file),
+                select_streams="v:0",
+                show_packets=None,
+                show_entries="packet=pts,pos,flags:stream=time_base"
+            )
+
+        except ffmpeg.Error as err:
+            raise InvalidFileFormat("File is not supported by ffmpeg") from err
+
+        return cls.from_packets(
+            probe.get("packets", []),
+            float(Fraction(probe["streams"][0]["time_base"])),
+            video_file.stat().st_size
+        )
+
+    @staticmethod
+    def get_index_path(video_file: Path) -> Path:
+        """
+        Получает путь до файла индекса видео.
+
+        :param video_file: Путь до видео.
+        :return: Путь до файла индекса рядом с видео.
+        """
+        return video_file.with_name(f"{video_file.name}.index.npz")
+
+    def save(self, video_file: Path) -> Path:
+        """
+        Сохраняет индекс рядом с видео.
+
+        :param video_file: Путь до видео.
+        :return: Путь до файла индекса.
+        """
+        index_path: Path = self.get_index_path(video_file)
+        tmp_path: Path = index_path.with_suffix(".tmp.npz")
+
+        np.savez(
+            tmp_path,
+            pts=self.pts,
+            time_base=np.float64(self.time_base),
+            keyframes=self.keyframes,
+            keyframe_positions=self.keyframe_positions,
+            video_size=np.int64(self.video_size)
+        )
+        os.replace(tmp_path, index_path)
+        return index_path
+
+    @classmethod
+    def load(cls, video_file: Path) -> Optional[VideoFrameIndex]:
+        """
+        Загружает индекс видео, если он построен для текущей версии файла.
+
+        :param video_file: Путь до видео.
+        :return: Индекс кадров или None, если индекс не найден или устарел.
+        """
+        index_path: Path = cls.get_index_path(video_file)
+
+        try:
+            with np.load(index_path) as data:
+                index: VideoFrameIndex = cls(
+                    data["pts"],
+                    float(data["time_base"]),
+                    data["keyframes"],
+                    data["keyframe_positions"],
+                    int(data["video_size"])
+                )
+
+            if index.video_size != video_file.stat().st_size:
+                return None
+
+        except (OSError, KeyError, ValueError):
+            return None
+
+        return index
+
+    @property
+    def frames_count(self) -> int:
+        """
+        Количество кадров видео.
+
+        :return: Количество кадров.
+        """
+        return len(self.pts)
+
+    def get_frame_time(self, frame_number: int) -> float:
+        """
+        Получает время показа кадра относительно начала видео.
+
+        :param frame_number: Номер кадра.
+        :return: Время в секундах.
+        """
+        return float(self.pts[frame_number] - self.pts[0]) * self.time_base
+
+    def get_keyframe(self, frame_number: int) -> int:
+        """
+        Находит ближайший ключевой кадр, не позже переданного.
+
+        :param frame_number: Номер кадра.
+        :return: Номер ключевого кадра (0, если ключевые кадры не найдены).
+        """
+        position: int = bisect.bisect_right(self._keyframes_list, frame_number)
+        return self._keyframes_list[position - 1] if position > 0 else 0
+
+    def get_frame_number(self, frame_time: float) -> int:
+        """
+        Находит кадр с ближайшим временем показа.
+
+        :param frame_time: Время относительно начала видео в секундах.
+        :return: Номер кадра.
+        """
+        target_pts: float = self.pts[0] + frame_time / self.time_base
+        position: int = int(np.searchsorted(self.pts, target_pts))
+
+        if position <= 0:
+            return 0
+
+        if position >= self.frames_count:
+            return self.frames_count - 1
+
+        # Nearest of two neighbouring frames
+        return position if self.pts[position] - target_pts < target_pts - self.pts[position - 1] else position - 1
+
+    def seek(self, cap: cv2.VideoCapture, frame_number: int, current_frame: Optional[int] = None) -> None:
+        """
+        Устанавливает позицию захвата так, чтобы следующим был прочитан переданный кадр.
+
+        Если текущая позиция находится в той же группе кадров перед нужным кадром,
+        кадры декодируются вперед без перехода. Иначе выполняется переход к предыдущему кадру
+        (OpenCV переходит на предшествующий ключевой кадр и декодирует кадры вперед). Номер кадра
+        для перехода OpenCV рассчитывает по средней частоте кадров, поэтому фактическая позиция
+        проверяется по временной метке декодированного кадра: при переходе дальше нужного кадра
+        переход повторяется раньше на увеличивающуюся величину ошибки, а при переходе раньше
+        недостающие кадры декодируются вперед.
+
+        :param cap: Источник захвата.
+        :param frame_number: Номер кадра.
+        :param current_frame: Номер кадра, который будет прочитан следующим без перехода.
+        :return: Ничего.
+        """
+        frame_number = min(max(frame_number, 0), self.frames_count)
+        keyframe: int = self.get_keyframe(frame_number)
+
+        if current_frame is None or not keyframe <= current_frame <= frame_number:
+            current_frame = self._seek_before(cap, frame_number)
+
+        for _ in range(frame_number - current_frame):
+            # Only demux and decode without conversion to BGR
+            if not cap.grab():
+                break
+
+    def _seek_before(self, cap: cv2.VideoCapture, frame_number: int) -> int:
+        """
+        Переходит на позицию захвата не позже переданного кадра, проверяя ее по временным меткам индекса.
+
+        :param cap: Источник захвата.
+        :param frame_number: Номер кадра.
+        :return: Номер кадра, который будет прочитан следующим.
+        """
+        target_frame: int = frame_number - 1
+
+        for attempt in range(MAX_SEEK_ATTEMPTS):
+            if target_frame < 0:
+                break
+
+            cap.set(cv2.CAP_PROP_POS_MSEC, self.get_frame_time(target_frame) * 1000)
+            # Position is known only after a frame is decoded
+            if not cap.grab():
+                break
+
+            decoded_frame: int = self.get_frame_number(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+            if decoded_frame < frame_number:
+                return decoded_frame + 1
+
+            # Error of frame rate estimate grows with time, so step back grows with each attempt
+            target_frame -= (decoded_frame - frame_number + 1) * 2 ** attempt
+
+        # Beginning of the video is always reached without errors
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return 0
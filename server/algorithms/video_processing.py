@@ -1,102 +1,60 @@
+import math
+import os
 import shutil
 import tempfile
+import threading
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 from pathlib import Path
 from typing import Any, Optional
 
 import cv2
 import ffmpeg
+import numpy as np
 
 from server.algorithms.data_types import CV_Image
 from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
+from server.algorithms.video_frame_index import VideoFrameIndex
 from server.utils.config import VideoPreprocessingConfig
 
+# Upper estimate of the size of a pixel of the analysis proxy at quality 1, size decreases with quality value
+ANALYSIS_PROXY_BYTES_PER_PIXEL: float = 1.5
+
 
 class VideoProcessing:
     """
     Отвечает за обработку видео и получение информации о видеофайле.
     """
     processing_config: VideoPreprocessingConfig
+    max_parallel_encoders: int
+    encoders_semaphore: threading.BoundedSemaphore
 
-    def __init__(self, video_processing_config: VideoPreprocessingConfig):
-        self.processing_config = video_processing_config
-
-    def render_correction_sample(
-        self,
-        source_file: Path,
-        k1: float = 0.0,
-        k2: float = 0.0,
-        frame_timestamp: Optional[float] = None
-    ) -> tuple[CV_Image, dict[str, Any]]:
+    def __init__(self, video_processing_config: VideoPreprocessingConfig, max_parallel_encoders: int = 1):
         """
-        Применяет фильтр коррекции искажений к видео и выводи один кадр из видео.
-
-        :param source_file: Исходное видео без коррекции.
-        :param k1: Коэффициент коррекции видео 1.
-        :param k2: Коэффициент коррекции видео 2.
-        :param frame_timestamp: Временная метка для перехода к получению кадра в секундах.
-        :return: Кадр и техническая информация об исходном видео.
-        :raise FileNotFound: Файл не найден на диске.
-        :raise ValueError: Временная метка вне длительности видео.
-        :raise KeyError: Временная метка конца не найдена в метаданных.
-        :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
+        :param video_processing_config: Конфигурация конвертации видео.
+        :param max_parallel_encoders: Количество одновременно запущенных процессов кодирования ffmpeg
+            для всех видео, обрабатываемых экземпляром.
         """
-        if frame_timestamp is None:
-            frame_timestamp = 0.0
-
-        video_info = self.probe_video(source_file)
-        frame: Optional[CV_Image] = None
-
-        try:
-            end_timestamp: float = self.convert_ffmpeg_timestamp_to_seconds(video_info["duration"])
-            if not self.is_valid_timestamp(frame_timestamp, end_timestamp):
-                raise ValueError("Invalid timestamp provided")
-
-        except KeyError as e:
-            raise KeyError("Duration information from metadata not found") from e
-
-        with tempfile.TemporaryDirectory(prefix="hmms_") as temp_dir:
-            temp_dir_path: Path = Path(temp_dir)
-            temp_frame: Path = temp_dir_path / "frame.jpeg"
-            # Execute convertion and correction
-            (
-                ffmpeg.input(
-                    str(source_file),
-                    ss=f"{frame_timestamp:.3f}",
-                    hwaccel=self.processing_config.hwaccel,
-                )
-                .output(
-                    str(temp_frame),
-                    frames="1",
-                    vf=f"lenscorrection=k1={k1}:k2={k2}",
-                    loglevel=self.processing_config.loglevel
-                )
-                .global_args("-y")
-                .run()
-            )
-
-            sample_frame: CV_Image = typing.cast(CV_Image, cv2.imread(str(temp_frame)))
-            if sample_frame is None:
-                raise InvalidFileFormat(
-                    "Can't read the file, expected to have output from ffmpeg, but none received"
-                )
-
-            frame = sample_frame
-
-        return frame, video_info
+        self.processing_config = video_processing_config
+        self.max_parallel_encoders = max(max_parallel_encoders, 1)
+        self.encoders_semaphore = threading.BoundedSemaphore(self.max_parallel_encoders)
 
     def render_frame_sample(
         self,
         source_file: Path,
         frame_timestamp: Optional[float] = None
-    ) -> tuple[CV_Image, dict[str, Any]]:
+    ) -> CV_Image:
         """
         Выводи один кадр из видео.
 
+        Если рядом с видео есть индекс кадров, кадр находится по временам показа кадров из индекса
+        и декодируется в памяти процесса. Иначе кадр декодируется ffmpeg с точным переходом
+        по временной метке и передается через канал без записи на диск.
+
         :param source_file: Исходное видео без коррекции.
         :param frame_timestamp: Временная метка для перехода к получению кадра в секундах.
-        :return: Кадр и техническая информация об исходном видео.
+        :return: Кадр видео.
         :raise FileNotFoundError: Файл не найден на диске.
         :raise ValueError: Временная метка вне длительности видео.
         :raise KeyError: Временная метка конца не найдена в метаданных.
@@ -105,45 +63,49 @@ class VideoProcessing:
         if frame_timestamp is None:
             frame_timestamp = 0.0
 
-        video_info = self.probe_video(source_file)
-        frame: Optional[CV_Image] = None
-
+        frame_index: Optional[VideoFrameIndex] = VideoFrameIndex.load(source_file)
+        cap: cv2.VideoCapture = self.open_video_capture(source_file)
         try:
-            end_timestamp: float = self.convert_ffmpeg_timestamp_to_seconds(video_info["duration"])
-            if not self.is_valid_timestamp(frame_timestamp, end_timestamp):
-                raise ValueError("Invalid timestamp provided")
-
-        except KeyError as e:
-            raise KeyError("Duration information from metadata not found") from e
+            self.check_capture_timestamp(cap, frame_timestamp)
+            frame_width: int = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            frame_height: int = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-        with tempfile.TemporaryDirectory(prefix="hmms_") as temp_dir:
-            temp_dir_path: Path = Path(temp_dir)
-            temp_frame: Path = temp_dir_path / "frame.jpeg"
-            # Execute convertion and fetching frame
-            (
-                ffmpeg.input(
-                    str(source_file),
-                    ss=f"{frame_timestamp:.3f}",
-                    hwaccel=self.processing_config.hwaccel,
+            if frame_index is not None:
+                self.set_capture_frame_index(
+                    cap, frame_index.get_frame_number(float(frame_timestamp)), frame_index
                 )
-                .output(
-                    str(temp_frame),
-                    frames="1",
-                    loglevel=self.processing_config.loglevel
+                ret, frame = cap.read()
+
+        finally:
+            cap.release()
+
+        if frame_index is None:
+            # Timestamps of variable frame rate video aren't evenly spaced, so OpenCV seek can't be used
+            try:
+                raw_frame, _ = (
+                    ffmpeg.input(str(source_file), ss=f"{frame_timestamp:.6f}")
+                    .output(
+                        "pipe:",
+                        format="rawvideo",
+                        pix_fmt="bgr24",
+                        loglevel=self.processing_config.loglevel,
+                        **{"frames:v": "1"}
+                    )
+                    .run(capture_stdout=True)
                 )
-                .global_args("-y")
-                .run()
-            )
 
-            sample_frame: CV_Image = typing.cast(CV_Image, cv2.imread(str(temp_frame)))
-            if sample_frame is None:
-                raise InvalidFileFormat(
-                    "Can't read the file, expected to have output from ffmpeg, but none received"
-                )
+            except ffmpeg.Error as err:
+                raise InvalidFileFormat("Can't decode the frame from the video") from err
+
+            ret = len(raw_frame) == frame_width * frame_height * 3
+            if ret:
+                # Writable like frames decoded by OpenCV
+                frame = np.frombuffer(bytearray(raw_frame), dtype=np.uint8).reshape(frame_height, frame_width, 3)
 
-            frame = sample_frame
+        if not ret:
+            raise InvalidFileFormat("Can't decode the frame from the video")
 
-        return frame, video_info
+        return typing.cast(CV_Image, frame)
 
     def render_corrected_video(
         self,
@@ -154,6 +116,8 @@ class VideoProcessing:
     ) -> dict[str, Any]:
         """
         Применяет фильтр коррекции искажений к видео и выводит его в новую папку.
+        Рядом с видео сохраняется индекс кадров для перехода к кадрам через ключевые кадры
+        и копия видео для анализа нейросетями.
 
         :param dest_file: Путь для переноса конечного файла после обработки.
         :param source_file: Исходное видео без коррекции.
@@ -163,50 +127,156 @@ class VideoProcessing:
         :raise FileNotFoundError: Файл не найден на диске.
         :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
         """
-        # Checking video does exist and has correct file format that can be processed
-        self.probe_video(source_file)
-        additional_options = {"b:v": self.processing_config.target_bitare}
-        additional_input_options = {}
-        if len(self.processing_config.preset):
-            additional_options["preset"] = self.processing_config.preset
+        scale_filter: str = self._get_scale_filter(
+            self.processing_config.video_width, self.processing_config.video_height
+        )
+        video_info: dict[str, Any] = self.transcode_video(
+            source_file, dest_file, f"{scale_filter},lenscorrection=k1={k1}:k2={k2}"
+        )
 
-        if len(self.processing_config.hwaccel_output_format):
-            additional_input_options["hwaccel_output_format"] = self.processing_config.hwaccel_output_format
+        self.build_frame_index(dest_file)
+        self.render_analysis_proxy(dest_file)
+        return video_info
 
-        with tempfile.TemporaryDirectory(prefix="hmms_") as temp_dir:
-            temp_dir_path: Path = Path(temp_dir)
-            temp_video: Path = temp_dir_path / "video.mp4"
-            # Execute convertion and correction
-            # Scale down without upscale and preserve aspect ratio
-            scale_filter = (
-                f"scale='min({self.processing_config.video_width},iw)':'min({self.processing_config.video_height},ih)'"
-                ":force_original_aspect_ratio=decrease"
-            )
+    def render_analysis_proxy(self, video_file: Path) -> Optional[Path]:
+        """
+        Создает рядом с видео копию для анализа нейросетями в уменьшенном разрешении.
+
+        Копия кодируется только внутрикадровым сжатием, поэтому каждый кадр декодируется независимо,
+        и содержит те же кадры, что и видео. Если разрешение копии не задано, прежняя копия удаляется.
+
+        :param video_file: Видео после коррекции.
+        :return: Путь до копии для анализа или None, если копия не создается.
+        :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
+        """
+        proxy_file: Path = self.get_analysis_proxy_path(video_file)
+
+        if self.processing_config.analysis_width <= 0 or self.processing_config.analysis_height <= 0:
+            proxy_file.unlink(missing_ok=True)
+            VideoFrameIndex.get_index_path(proxy_file).unlink(missing_ok=True)
+            return None
+
+        temp_proxy: Path = proxy_file.with_name(f"{proxy_file.stem}.tmp{proxy_file.suffix}")
+        with self.encoders_semaphore:
             (
-                ffmpeg.input(
-                    str(source_file),
-                    hwaccel=self.processing_config.hwaccel,
-                    **additional_input_options
-                )
+                ffmpeg.input(str(video_file))
                 .output(
-                    str(temp_video),
-                    vf=f"{scale_filter},lenscorrection=k1={k1}:k2={k2}",
-                    vcodec=f"{self.processing_config.codec}",
-                    crf=f"{self.processing_config.crf}",
+                    str(temp_proxy),
+                    an=None,
+                    vf=self._get_scale_filter(
+                        self.processing_config.analysis_width, self.processing_config.analysis_height
+                    ),
+                    vcodec=self.processing_config.analysis_codec,
+                    # Frames are neither dropped nor duplicated, so frame numbers stay the same
+                    vsync="passthrough",
                     loglevel=self.processing_config.loglevel,
-                    maxrate=self.processing_config.maxrate,
-                    bufsize=self.processing_config.bufsize,
-                    movflags='faststart',
-                    **additional_options
+                    **{"q:v": str(self.processing_config.analysis_quality)}
                 )
                 .global_args("-y")
                 .run()
             )
+        os.replace(temp_proxy, proxy_file)
 
-            video_info = self.probe_video(temp_video)
-            shutil.move(temp_video, dest_file)
+        self.build_frame_index(proxy_file)
+        return proxy_file
 
-        return video_info
+    def estimate_analysis_proxy_size(self, video_file: Path) -> int:
+        """
+        Оценивает сверху размер копии видео для анализа нейросетями для резервирования места на диске.
+
+        :param video_file: Видео, по которому создается копия, или исходное видео с тем же количеством кадров.
+        :return: Размер копии в байтах или 0, если копия не создается.
+        :raise FileNotFoundError: Файл не найден на диске.
+        :raise InvalidFileFormat: Файл не удается открыть как видео.
+        """
+        if self.processing_config.analysis_width <= 0 or self.processing_config.analysis_height <= 0:
+            return 0
+
+        cap: cv2.VideoCapture = self.open_video_capture(video_file)
+
+        try:
+            frames_count: int = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 1)
+
+        finally:
+            cap.release()
+
+        frame_bytes: float = (
+            self.processing_config.analysis_width * self.processing_config.analysis_height
+            * ANALYSIS_PROXY_BYTES_PER_PIXEL / self.processing_config.analysis_quality
+        )
+        return math.ceil(frames_count * frame_bytes)
+
+    @staticmethod
+    def get_analysis_proxy_path(video_file: Path) -> Path:
+        """
+        Получает путь до копии видео для анализа.
+
+        :param video_file: Путь до видео.
+        :return: Путь до копии для анализа рядом с видео.
+        """
+        return video_file.with_name(f"{video_file.stem}.analysis.mkv")
+
+    @classmethod
+    def get_analysis_video(cls, video_file: Path) -> Path:
+        """
+        Получает видео, кадры которого передаются нейросетям: копию для анализа,
+        если она создана после последнего изменения видео, иначе само видео.
+
+        :param video_file: Путь до видео.
+        :return: Путь до видео для анализа.
+        """
+        proxy_file: Path = cls.get_analysis_proxy_path(video_file)
+
+        try:
+            if proxy_file.stat().st_mtime_ns >= video_file.stat().st_mtime_ns:
+                return proxy_file
+
+        except OSError:
+            pass
+
+        return video_file
+
+    @classmethod
+    def get_video_resolution(cls, video_file: Path) -> tuple[int, int]:
+        """
+        Получает разрешение кадров видео.
+
+        :param video_file: Путь до видео.
+        :return: Ширина и высота кадра.
+        :raise FileNotFoundError: Файл не найден на диске.
+        :raise InvalidFileFormat: Файл не удается открыть как видео.
+        """
+        cap: cv2.VideoCapture = cls.open_video_capture(video_file)
+
+        try:
+            return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        finally:
+            cap.release()
+
+    @staticmethod
+    def _get_scale_filter(width: int, height: int) -> str:
+        """
+        Получает фильтр ffmpeg уменьшения кадров до разрешения без увеличения и с сохранением пропорций.
+
+        :param width: Максимальная ширина кадра.
+        :param height: Максимальная высота кадра.
+        :return: Фильтр ffmpeg.
+        """
+        return f"scale='min({width},iw)':'min({height},ih)':force_original_aspect_ratio=decrease"
+
+    @staticmethod
+    def build_frame_index(video_file: Path) -> VideoFrameIndex:
+        """
+        Строит индекс кадров видео и сохраняет его рядом с видео.
+
+        :param video_file: Путь до видео.
+        :return: Индекс кадров.
+        :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
+        """
+        frame_index: VideoFrameIndex = VideoFrameIndex.build(video_file)
+        frame_index.save(video_file)
+        return frame_index
 
     def compress_video(self, source_file: Path, dest_file: Path) -> dict[str, Any]:
         """
@@ -218,46 +288,196 @@ class VideoProcessing:
         :raise FileNotFoundError: Файл не найден на диске.
         :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
         """
+        return self.transcode_video(source_file, dest_file)
+
+    def transcode_video(
+        self,
+        source_file: Path,
+        dest_file: Path,
+        video_filter: Optional[str] = None
+    ) -> dict[str, Any]:
+        """
+        Перекодирует видео с параметрами конвертации и выводит его в новую папку.
+
+        При количестве отрезков конвертации больше 1 видео делится по ключевым кадрам на отрезки,
+        которые кодируются отдельными процессами ffmpeg и объединяются без перекодирования
+        с сохранением количества кадров. Количество одновременно запущенных процессов кодирования
+        ограничено max_parallel_encoders для всех видео, обрабатываемых экземпляром.
+
+        :param source_file: Исходный файл.
+        :param dest_file: Целевой файл.
+        :param video_filter: Фильтр ffmpeg, применяемый к кадрам.
+        :return: Информация о выведенном видео.
+        :raise FileNotFoundError: Файл не найден на диске.
+        :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
+        """
         # Checking video does exist and has correct file format that can be processed
         self.probe_video(source_file)
-        additional_options = {"b:v": self.processing_config.target_bitare}
-        additional_input_options = {}
-        if len(self.processing_config.preset):
-            additional_options["preset"] = self.processing_config.preset
-
-        if len(self.processing_config.hwaccel_output_format):
-            additional_input_options["hwaccel_output_format"] = self.processing_config.hwaccel_output_format
 
         with tempfile.TemporaryDirectory(prefix="hmms_") as temp_dir:
             temp_dir_path: Path = Path(temp_dir)
             temp_video: Path = temp_dir_path / "video.mp4"
-            # Execute convertion and correction
-            # Scale down without upscale and preserve aspect ratio
-            (
-                ffmpeg.input(
-                    str(source_file),
-                    hwaccel=self.processing_config.hwaccel,
-                    **additional_input_options
+            segments: list[tuple[int, int]] = []
+            source_index: Optional[VideoFrameIndex] = None
+
+            if self.processing_config.transcode_segments > 1:
+                source_index = VideoFrameIndex.build(source_file)
+                segments = self.split_at_keyframes(
+                    source_index.frames_count,
+                    source_index.keyframes.tolist(),
+                    self.processing_config.transcode_segments
                 )
-                .output(
-                    str(temp_video),
-                    vcodec=f"{self.processing_config.codec}",
-                    crf=f"{self.processing_config.crf}",
-                    loglevel=self.processing_config.loglevel,
-                    maxrate=self.processing_config.maxrate,
-                    bufsize=self.processing_config.bufsize,
-                    movflags='faststart',
-                    **additional_options
+
+            if source_index is not None and len(segments) > 1:
+                self._transcode_segments(
+                    source_file, temp_video, temp_dir_path, source_index, segments, video_filter
                 )
-                .global_args("-y")
-                .run()
-            )
+
+            else:
+                # Execute convertion and correction
+                with self.encoders_semaphore:
+                    (
+                        ffmpeg.input(str(source_file), **self._get_input_options())
+                        .output(
+                            str(temp_video),
+                            **({"vf": video_filter} if video_filter else {}),
+                            **self._get_encoding_options(),
+                            movflags='faststart'
+                        )
+                        .global_args("-y")
+                        .run()
+                    )
 
             video_info = self.probe_video(temp_video)
             shutil.move(temp_video, dest_file)
 
         return video_info
 
+    def _transcode_segments(
+        self,
+        source_file: Path,
+        dest_file: Path,
+        temp_dir: Path,
+        source_index: VideoFrameIndex,
+        segments: list[tuple[int, int]],
+        video_filter: Optional[str]
+    ) -> None:
+        """
+        Кодирует отрезки видео параллельно и объединяет их в один файл.
+
+        :param source_file: Исходный файл.
+        :param dest_file: Целевой файл.
+        :param temp_dir: Папка для файлов отрезков.
+        :param source_index: Индекс кадров исходного видео.
+        :param segments: Промежутки кадров отрезков [начало, конец), начинающиеся с ключевых кадров
+            (кроме первого отрезка, начинающегося с начала видео).
+        :param video_filter: Фильтр ffmpeg, применяемый к кадрам.
+        :return: Ничего.
+        """
+        segment_files: list[Path] = [temp_dir / f"segment_{n}.mp4" for n in range(len(segments))]
+
+        def encode_segment(segment: tuple[int, int], segment_file: Path) -> None:
+            start_frame, end_frame = segment
+            # Rounded down, so keyframe isn't dropped by accurate seek
+            start_time: float = math.floor(source_index.get_frame_time(start_frame) * 1e6) / 1e6
+            # Limit is shared by all videos, which are transcoded by workers at the same time
+            with self.encoders_semaphore:
+                (
+                    ffmpeg.input(str(source_file), ss=f"{start_time:.6f}", **self._get_input_options())
+                    .output(
+                        str(segment_file),
+                        an=None,
+                        **({"vf": video_filter} if video_filter else {}),
+                        **{"frames:v": str(end_frame - start_frame)},
+                        **self._get_encoding_options()
+                    )
+                    .global_args("-y")
+                    .run()
+                )
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel_encoders) as encoders:
+            # Failure of any segment is raised after all started segments are finished
+            list(encoders.map(encode_segment, segments, segment_files))
+
+        concat_list: Path = temp_dir / "segments.txt"
+        concat_list.write_text(
+            "".join(f"file '{segment_file.resolve()}'\n" for segment_file in segment_files)
+        )
+
+        video_stream = ffmpeg.input(str(concat_list), format="concat", safe=0).video
+        has_audio: bool = len(ffmpeg.probe(str(source_file), select_streams="a")["streams"]) > 0
+        output_streams = [video_stream, ffmpeg.input(str(source_file)).audio] if has_audio else [video_stream]
+        (
+            ffmpeg.output(
+                *output_streams,
+                str(dest_file),
+                vcodec="copy",
+                loglevel=self.processing_config.loglevel,
+                movflags='faststart'
+            )
+            .global_args("-y")
+            .run()
+        )
+
+    def _get_input_options(self) -> dict[str, Any]:
+        """
+        Получает параметры декодирования исходного видео.
+
+        :return: Параметры входного файла ffmpeg.
+        """
+        additional_input_options: dict[str, Any] = {"hwaccel": self.processing_config.hwaccel}
+
+        if len(self.processing_config.hwaccel_output_format):
+            additional_input_options["hwaccel_output_format"] = self.processing_config.hwaccel_output_format
+
+        return additional_input_options
+
+    def _get_encoding_options(self) -> dict[str, Any]:
+        """
+        Получает параметры кодирования видео.
+
+        :return: Параметры выходного файла ffmpeg.
+        """
+        additional_options: dict[str, Any] = {"b:v": self.processing_config.target_bitare}
+        if len(self.processing_config.preset):
+            additional_options["preset"] = self.processing_config.preset
+
+        return {
+            "vcodec": f"{self.processing_config.codec}",
+            "crf": f"{self.processing_config.crf}",
+            "loglevel": self.processing_config.loglevel,
+            "maxrate": self.processing_config.maxrate,
+            "bufsize": self.processing_config.bufsize,
+            **additional_options
+        }
+
+    @staticmethod
+    def split_at_keyframes(frames_count: int, keyframes: list[int], segments_count: int) -> list[tuple[int, int]]:
+        """
+        Разбивает видео на отрезки примерно одинаковой длины, начинающиеся с ключевых кадров.
+
+        :param frames_count: Количество кадров видео.
+        :param keyframes: Номера ключевых кадров по возрастанию.
+        :param segments_count: Желаемое количество отрезков.
+        :return: Промежутки кадров отрезков [начало, конец), отрезков может быть меньше желаемого,
+            если ключевых кадров недостаточно.
+        """
+        if frames_count <= 0 or not keyframes:
+            return [(0, frames_count)]
+
+        # First segment always starts from the beginning of the video
+        bounds: list[int] = [0]
+
+        for n in range(1, segments_count):
+            target: int = round(frames_count * n / segments_count)
+            nearest_keyframe: int = min(keyframes, key=lambda keyframe: abs(keyframe - target))
+
+            if bounds[-1] < nearest_keyframe < frames_count:
+                bounds.append(nearest_keyframe)
+
+        bounds.append(frames_count)
+        return list(zip(bounds[:-1], bounds[1:]))
+
     @staticmethod
     def probe_video(file: Path) -> dict[str, Any]:
         """
@@ -288,6 +508,45 @@ class VideoProcessing:
         except ffmpeg.Error as err:
             raise InvalidFileFormat("File is not supported by ffmpeg") from err
 
+    @staticmethod
+    def open_video_capture(file: Path) -> cv2.VideoCapture:
+        """
+        Открывает видео для декодирования кадров в памяти процесса.
+
+        :param file: Путь до файла.
+        :return: Источник захвата.
+        :raise FileNotFoundError: Файл не найден на диске.
+        :raise InvalidFileFormat: Файл не удается открыть как видео.
+        """
+        if not file.is_file():
+            raise FileNotFoundError("Video file to get sample from not found on disk")
+
+        cap: cv2.VideoCapture = cv2.VideoCapture(str(file))
+        if not cap.isOpened():
+            cap.release()
+            raise InvalidFileFormat("File is not supported as a video")
+
+        return cap
+
+    def check_capture_timestamp(self, cap: cv2.VideoCapture, timestamp: float) -> None:
+        """
+        Проверяет нахождение временной метки в пределах длительности открытого видео.
+
+        :param cap: Источник захвата.
+        :param timestamp: Временная метка в секундах.
+        :return: Ничего.
+        :raise ValueError: Временная метка вне длительности видео.
+        :raise KeyError: Длительность видео не найдена в метаданных.
+        """
+        fps: float = cap.get(cv2.CAP_PROP_FPS)
+        frames_count: float = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+
+        if fps <= 0 or frames_count <= 0:
+            raise KeyError("Duration information from metadata not found")
+
+        if not self.is_valid_timestamp(timestamp, frames_count / fps):
+            raise ValueError("Invalid timestamp provided")
+
     @staticmethod
     def set_capture_timestamp(cap: cv2.VideoCapture, timestamp: float) -> None:
         """
@@ -304,17 +563,26 @@ class VideoProcessing:
         cap.set(cv2.CAP_PROP_POS_MSEC, timestamp*1000)
 
     @staticmethod
-    def set_capture_frame_index(cap: cv2.VideoCapture, frame_index: int) -> None:
+    def set_capture_frame_index(
+        cap: cv2.VideoCapture,
+        frame_index: int,
+        video_frame_index: Optional[VideoFrameIndex] = None
+    ) -> None:
         """
         Устанавливает позицию захвата видео на кадр по номеру кадра.
 
         :param cap: Источник захвата.
         :param frame_index: Номер кадра.
+        :param video_frame_index: Индекс кадров видео для перехода через ключевой кадр.
         :return: Нет возврата.
         """
         assert isinstance(frame_index, int), \
             f"Invalid type of frame_index parameter (must be int, got {type(frame_index)})"
 
+        if video_frame_index is not None:
+            video_frame_index.seek(cap, frame_index)
+            return
+
         cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
 
     @staticmethod
@@ -0,0 +1,84 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+# Module is imported by the spawned decoder, so it must not depend on neural network packages
+from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
+from server.algorithms.video_frame_index import VideoFrameIndex
+
+
+def decode_video_slices(
+    video_file: Path,
+    slice_ranges: Sequence[tuple[int, Optional[int]]],
+    shared_memory_name: str,
+    frame_shape: tuple[int, int, int],
+    ring_size: int,
+    free_slots: multiprocessing.Queue,
+    decoded_frames: multiprocessing.Queue
+) -> None:
+    """
+    Декодирует кадры видео в отдельном процессе прямо в ячейки кольцевого буфера в общей памяти.
+
+    :param video_file: Путь до видео.
+    :param slice_ranges: Промежутки кадров [начало, конец), None - до конца видео.
+    :param shared_memory_name: Имя общей памяти кольцевого буфера.
+    :param frame_shape: Размер кадра.
+    :param ring_size: Количество ячеек кольцевого буфера.
+    :param free_slots: Очередь свободных ячеек.
+    :param decoded_frames: Очередь номеров кадров и ячеек с ними, None - конец чтения.
+    :return: Ничего.
+    """
+    # Memory is removed by the reading process, which shares resource tracker with decoder
+    shared_memory: SharedMemory = SharedMemory(shared_memory_name)
+    ring: np.ndarray = np.ndarray((ring_size, *frame_shape), dtype=np.uint8, buffer=shared_memory.buf)
+    capture: cv2.VideoCapture = cv2.VideoCapture(str(video_file), cv2.CAP_FFMPEG)
+
+    try:
+        if not capture.isOpened():
+            raise InvalidFileFormat("File is not supported as a video")
+
+        frame_index: Optional[VideoFrameIndex] = VideoFrameIndex.load(video_file)
+        reader_position: Optional[int] = None
+        # Slot left after failed read is used for the next slice
+        spare_slot: Optional[int] = None
+
+        for start_frame, end_frame in slice_ranges:
+            if frame_index is not None:
+                frame_index.seek(capture, start_frame, reader_position)
+
+            elif reader_position != start_frame:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+            reader_position = None
+            frame_n: int = start_frame
+
+            while end_frame is None or frame_n < end_frame:
+                slot: int = free_slots.get() if spare_slot is None else spare_slot
+                spare_slot = None
+                is_read, frame = capture.read(ring[slot])
+
+                if not is_read:
+                    spare_slot = slot
+                    break
+
+                if frame.shape != frame_shape:
+                    raise InvalidFileFormat(f"Frame {frame_n} has shape {frame.shape}, expected {frame_shape}")
+
+                decoded_frames.put((frame_n, slot))
+                frame_n += 1
+
+            else:
+                reader_position = frame_n
+
+        decoded_frames.put(None)
+
+    except Exception as err:
+        decoded_frames.put(err)
+
+    finally:
+        capture.release()
+        shared_memory.close()
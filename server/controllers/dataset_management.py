@@ -4,7 +4,9 @@ from typing import Annotated
 from dishka import FromDishka
 from fastapi import APIRouter, HTTPException, Query
 
+from server.algorithms.detection_cache import DetectionCache
 from server.algorithms.enums import PlayerClasses, Team
+from server.algorithms.field_mask_cache import FieldMaskCache
 from server.algorithms.services.player_predictor_service import PlayerPredictorService
 from server.controllers.dto.subset_created_repsonse import SubsetCreatedResponse
 from server.controllers.dto.tracking_points_removed import TrackingPointsRemoved
@@ -234,6 +236,8 @@ class DatasetEndpoint(APIEndpoint):
         repository: FromDishka[Repository],
         current_user: FromDishka[UserDTO],
         player_predictor: FromDishka[PlayerPredictorService],
+        detection_cache: FromDishka[DetectionCache],
+        field_mask_cache: FromDishka[FieldMaskCache],
         file_lock: FromDishka[FileLock],
         app_config: FromDishka[AppConfig],
         dataset_id: int,
@@ -246,6 +250,8 @@ class DatasetEndpoint(APIEndpoint):
         :param repository: Объект взаимодействия с БД.
         :param current_user: Текущий пользователь.
         :param player_predictor: Объект сервиса определения игроков на кадре.
+        :param detection_cache: Кэш выделений игроков по кадрам видео.
+        :param field_mask_cache: Хранилище масок поля.
         :param file_lock: Блокировщик доступа к файлам.
         :param app_config: Конфигурация приложения.
         :param dataset_id: Идентификатор набора данных.
@@ -268,7 +274,11 @@ class DatasetEndpoint(APIEndpoint):
                 app_config.prefetch_frame_buffer,
                 static_folder,
                 file_lock,
-                player_predictor
+                player_predictor,
+                detection_cache,
+                app_config.nn_config.tracker,
+                field_mask_cache,
+                app_config.nn_config.field_crop_padding if app_config.nn_config.crop_to_field else None
             )
 
             return SubsetCreatedResponse(
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+from server.controllers.dto.wait_statistics_response import WaitStatisticsResponse
+
+
+class InferenceStatisticsResponse(BaseModel):
+    player_queue: dict[str, WaitStatisticsResponse] = Field(
+        description="Время ожидания в очереди нейросети игроков по классам приоритета"
+    )
+    field_queue: dict[str, WaitStatisticsResponse] = Field(
+        description="Время ожидания в очереди нейросети поля по классам приоритета"
+    )
+    device: dict[str, WaitStatisticsResponse] = Field(
+        description="Время ожидания доступа к устройству обработки по классам приоритета"
+    )
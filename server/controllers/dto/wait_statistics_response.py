@@ -0,0 +1,12 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class WaitStatisticsResponse(BaseModel):
+    count: int = Field(description="Количество обслуженных задач")
+    average_wait_time: float = Field(description="Среднее время ожидания в секундах")
+    max_wait_time: float = Field(description="Максимальное время ожидания в секундах")
+    queued: Optional[int] = Field(
+        default=None, description="Количество задач, ожидающих в очереди в данный момент"
+    )
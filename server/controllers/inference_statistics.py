@@ -0,0 +1,87 @@
+from typing import Optional
+
+from dishka import FromDishka
+from fastapi import APIRouter
+
+from server.algorithms.data_types import WaitStatistics
+from server.algorithms.enums import InferencePriority
+from server.algorithms.services.field_predictor_service import FieldPredictorService
+from server.algorithms.services.player_predictor_service import PlayerPredictorService
+from server.controllers.dto.inference_statistics_response import InferenceStatisticsResponse
+from server.controllers.dto.wait_statistics_response import WaitStatisticsResponse
+from server.controllers.endpoints_base import APIEndpoint
+from server.data_storage.dto import UserDTO
+
+
+class InferenceStatisticsEndpoint(APIEndpoint):
+    """
+    Описывает эндпоинт получения статистики очередей обработки нейросетями.
+    """
+    def __init__(self, router: APIRouter):
+        super().__init__(router)
+        self.router.add_api_route(
+            "/inference/statistics",
+            self.get_inference_statistics,
+            methods=["get"],
+            description="Получает статистику времени ожидания задач нейросетей по классам приоритета",
+            tags=["inference"],
+            responses={
+                200: {
+                    "description": "Статистика ожидания в очередях и доступа к устройству обработки"
+                },
+                401: {
+                    "description":
+                        "Нет валидного токена авторизации"
+                },
+            }
+        )
+
+    async def get_inference_statistics(
+        self,
+        player_predictor: FromDishka[PlayerPredictorService],
+        field_predictor: FromDishka[FieldPredictorService],
+        current_user: FromDishka[UserDTO]
+    ) -> InferenceStatisticsResponse:
+        """
+        Получает статистику времени ожидания задач нейросетей.
+
+        :param player_predictor: Сервис нейросети игроков.
+        :param field_predictor: Сервис нейросети поля.
+        :param current_user: Текущий пользователь системы.
+        :return: Статистика по классам приоритета.
+        """
+        return InferenceStatisticsResponse(
+            player_queue=self.convert_statistics(
+                player_predictor.image_queue.wait_statistics,
+                player_predictor.image_queue.queued_by_priority()
+            ),
+            field_queue=self.convert_statistics(
+                field_predictor.image_queue.wait_statistics,
+                field_predictor.image_queue.queued_by_priority()
+            ),
+            device=self.convert_statistics(
+                player_predictor.device_scheduler.wait_statistics
+            )
+        )
+
+    @staticmethod
+    def convert_statistics(
+        statistics: dict[InferencePriority, WaitStatistics],
+        queued: Optional[dict[InferencePriority, int]] = None
+    ) -> dict[str, WaitStatisticsResponse]:
+        """
+        Преобразует статистику ожидания в формат ответа.
+
+        :param statistics: Статистика по классам приоритета.
+        :param queued: Количество задач в очереди по классам приоритета.
+        :return: Статистика по именам классов приоритета.
+        """
+        return {
+            priority.name: WaitStatisticsResponse(
+                count=priority_statistics.count,
+                average_wait_time=priority_statistics.average_wait_time,
+                max_wait_time=priority_statistics.max_wait_time,
+                queued=None if queued is None else queued.get(priority, 0)
+            )
+            for priority, priority_statistics in statistics.items()
+        }
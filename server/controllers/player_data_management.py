@@ -1,9 +1,11 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from dishka import FromDishka
 from fastapi import APIRouter, HTTPException, Query
 
-from server.algorithms.enums import PlayerClasses, Team
+from server.algorithms.detection_cache import DetectionCache
+from server.algorithms.enums import PlayerClasses, Team, TrackerType
+from server.algorithms.field_mask_cache import FieldMaskCache
 from server.algorithms.services.player_predictor_service import PlayerPredictorService
 from server.controllers.dto.change_alias_name_request import ChangeAliasNameRequest
 from server.controllers.dto.change_alias_team_request import ChangeAliasTeamRequest
@@ -100,6 +102,50 @@ class PlayerDataEndpoint(APIEndpoint):
                 }
             }
         )
+        self.router.add_api_route(
+            "/videos/{video_id}/tracking/team_detector",
+            self.pretrain_team_detector,
+            methods=["put"],
+            description="Заранее обучает нейросеть разделения игроков на команды по размеченному набору данных, "
+                        "чтобы получение данных об отслеживании игроков использовало сохраненную модель",
+            tags=["player data"],
+            responses={
+                401: {
+                    "description":
+                        "Нет валидного токена авторизации или отсутствуют права управление проектами"
+                },
+                404: {
+                    "description":
+                        "Видео не найдено, или файлы не найдены"
+                },
+                409: {
+                    "description":
+                        "Набор данных о командах не создан или недостаточно размечен"
+                }
+            }
+        )
+        self.router.add_api_route(
+            "/videos/{video_id}/tracking/minimap_positions",
+            self.reproject_players_to_minimap,
+            methods=["put"],
+            description="Пересчитывает положения игроков на мини-карте по текущим точкам соотнесения "
+                        "без повторной обработки видео, возвращает количество измененных записей",
+            tags=["player data"],
+            responses={
+                401: {
+                    "description":
+                        "Нет валидного токена авторизации или отсутствуют права управление проектами"
+                },
+                404: {
+                    "description":
+                        "Видео не найдено"
+                },
+                409: {
+                    "description":
+                        "Недостаточно используемых точек соотнесения с мини-картой"
+                }
+            }
+        )
         self.router.add_api_route(
             "/videos/{video_id}/tracking/map_video",
             self.generate_map_video,
@@ -614,6 +660,58 @@ class PlayerDataEndpoint(APIEndpoint):
             to_frame=to_frame
         )
 
+    async def pretrain_team_detector(
+        self,
+        repository: FromDishka[Repository],
+        current_user: FromDishka[UserDTO],
+        video_id: int,
+        file_lock: FromDishka[FileLock],
+        app_config: FromDishka[AppConfig],
+    ) -> None:
+        """
+        Заранее обучает нейросеть разделения игроков на команды.
+
+        :param repository: Объект взаимодействия с БД.
+        :param current_user: Текущий пользователь.
+        :param video_id: Идентификатор видео.
+        :param file_lock: Блокировщик доступа к файлам.
+        :param app_config: Конфигурация приложения.
+        :return: Ничего.
+        """
+        if not current_user.user_permissions.can_create_projects:
+            raise UnauthorizedResourceAccess(
+                "User is required to have permission to create projects to modify project"
+            )
+
+        try:
+            await PlayerDataView(repository).pretrain_team_detector(
+                video_id,
+                app_config.prefetch_frame_buffer,
+                file_lock,
+                app_config.static_path
+            )
+
+        except FileNotFoundError:
+            raise HTTPException(
+                404, "Video file not found"
+            )
+
+        except NotFoundError:
+            raise HTTPException(
+                404, "Video not found in database"
+            )
+
+        except InvalidProjectState:
+            raise HTTPException(
+                409,
+                "Project state conflicts and does not allow to train team detector"
+            )
+
+        except NotEnoughPlayersUniformExamples:
+            raise HTTPException(
+                409, "More uniform examples required"
+            )
+
     async def generate_tracking_data(
         self,
         repository: FromDishka[Repository],
@@ -622,6 +720,9 @@ class PlayerDataEndpoint(APIEndpoint):
         file_lock: FromDishka[FileLock],
         app_config: FromDishka[AppConfig],
         player_predictor: FromDishka[PlayerPredictorService],
+        detection_cache: FromDishka[DetectionCache],
+        field_mask_cache: FromDishka[FieldMaskCache],
+        tracker: Optional[TrackerType] = None,
     ) -> None:
         """
         Получает информацию об отслеживании игроков.
@@ -632,6 +733,10 @@ class PlayerDataEndpoint(APIEndpoint):
         :param file_lock: Блокировщик доступа к файлам.
         :param app_config: Конфигурация приложения.
         :param player_predictor: Сервис поиска игроков на изображении.
+        :param detection_cache: Кэш выделений игроков по кадрам видео.
+        :param field_mask_cache: Хранилище масок поля.
+        :param tracker: Алгоритм отслеживания идентичности игроков для этого видео
+            (по умолчанию из конфигурации).
         :return: Ничего.
         """
         if not current_user.user_permissions.can_create_projects:
@@ -645,7 +750,17 @@ class PlayerDataEndpoint(APIEndpoint):
                 app_config.prefetch_frame_buffer,
                 file_lock,
                 app_config.static_path,
-                player_predictor
+                player_predictor,
+                detection_cache,
+                app_config.nn_config.detection_stride,
+                app_config.nn_config.max_track_uncertainty,
+                app_config.nn_config.max_track_relative_speed,
+                tracker or app_config.nn_config.tracker,
+                app_config.nn_config.tracking_segments,
+                app_config.nn_config.tracking_segment_overlap,
+                field_mask_cache,
+                app_config.decoder_ring_size,
+                app_config.nn_config.field_crop_padding if app_config.nn_config.crop_to_field else None
             )
 
         except MaskNotFoundError:
@@ -685,6 +800,39 @@ class PlayerDataEndpoint(APIEndpoint):
                 "Currently processing video"
             )
 
+    async def reproject_players_to_minimap(
+        self,
+        repository: FromDishka[Repository],
+        current_user: FromDishka[UserDTO],
+        video_id: int,
+    ) -> int:
+        """
+        Пересчитывает положения игроков на мини-карте.
+
+        :param repository: Объект взаимодействия с БД.
+        :param current_user: Текущий пользователь.
+        :param video_id: Идентификатор видео.
+        :return: Количество измененных записей.
+        """
+        if not current_user.user_permissions.can_create_projects:
+            raise UnauthorizedResourceAccess(
+                "User is required to have permission to create projects to modify project"
+            )
+
+        try:
+            return await PlayerDataView(repository).reproject_players_to_minimap(video_id)
+
+        except NotFoundError:
+            raise HTTPException(
+                404, "Video not found in database"
+            )
+
+        except InvalidProjectState:
+            raise HTTPException(
+                409,
+                "Not enough used map points to compute players positions"
+            )
+
     async def generate_map_video(
         self,
         repository: FromDishka[Repository],
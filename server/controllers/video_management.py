@@ -1,17 +1,15 @@
 import pathlib
-import tempfile
-from concurrent.futures.thread import ThreadPoolExecutor
-from pathlib import Path
 from typing import Annotated, Optional
 
 import aiofiles
 from dishka.integrations.fastapi import FromDishka
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile
-from starlette.responses import FileResponse, HTMLResponse
+from starlette.responses import HTMLResponse, Response
 
 from server.algorithms.enums import CameraPosition
 from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
 from server.algorithms.exceptions.out_of_disk_space import OutOfDiskSpace
+from server.algorithms.lens_correction_previewer import LensCorrectionPreviewer
 from server.algorithms.video_processing import VideoProcessing
 from server.controllers.endpoints_base import APIEndpoint
 from server.controllers.exceptions import UnauthorizedResourceAccess
@@ -29,9 +27,15 @@ class VideoUploadEndpoint(APIEndpoint):
     Описывает эндпоинт взаимодействия с видео.
     """
 
-    def __init__(self, router: APIRouter, video_processing: VideoProcessing):
+    def __init__(
+        self,
+        router: APIRouter,
+        video_processing: VideoProcessing,
+        lens_correction_previewer: LensCorrectionPreviewer
+    ):
         super().__init__(router)
         self.video_processing: VideoProcessing = video_processing
+        self.lens_correction_previewer: LensCorrectionPreviewer = lens_correction_previewer
         self.router.add_api_route(
             "/videos_upload",
             self.upload_page,
@@ -93,7 +97,8 @@ class VideoUploadEndpoint(APIEndpoint):
                 401: {"description": "Нет валидного токена авторизации"},
                 404: {"description": "Видео с предоставленным ID не найдено или файл утерян/испорчен"},
                 500: {"description": "Отсутствует информация о длине видео"}
-            }
+            },
+            response_class=Response
         )
         self.router.add_api_route(
             "/videos/{video_id}/correction",
@@ -332,7 +337,7 @@ class VideoUploadEndpoint(APIEndpoint):
         app_config: FromDishka[AppConfig],
         video_id: int,
         frame_timestamp: Annotated[Optional[float], Query(ge=0)] = 0.0
-    ) -> FileResponse:
+    ) -> Response:
         """
         Получает пример скорректированного изображения.
 
@@ -341,23 +346,19 @@ class VideoUploadEndpoint(APIEndpoint):
         :param app_config: Конфигурация приложения.
         :param video_id: Идентификатор видео.
         :param frame_timestamp: Временная метка кадра, для получения примера.
-        :return: Ответ файлом кадра.
+        :return: Ответ изображением кадра в формате JPEG.
         """
         try:
-            temp_dir = tempfile.mkdtemp(prefix="hmms_preview_")
-            temp_dir_path: Path = Path(temp_dir)
-            temp_frame: Path = temp_dir_path / "frame.jpeg"
-
-            await VideoView(repository).generate_correction_preview(
+            frame: bytes = await VideoView(repository).generate_correction_preview(
                 video_id,
-                ThreadPoolExecutor(1),
+                None,
                 self.video_processing,
+                self.lens_correction_previewer,
                 app_config.static_path,
-                temp_frame,
                 frame_timestamp
             )
 
-            return FileResponse(temp_frame.resolve())
+            return Response(content=frame, media_type="image/jpeg")
 
         except ValueError:
             raise HTTPException(400, "Bad video timestamp")
@@ -1,12 +1,13 @@
 from pathlib import Path
 from typing import Annotated, Optional
 
-import cv2
 from dishka import FromDishka
 from fastapi import APIRouter, HTTPException, Query
 
 from server.algorithms.data_types import Mask
 from server.algorithms.exceptions import InvalidFileFormat
+from server.algorithms.field_inference_cache import FieldInferenceCache
+from server.algorithms.field_mask_cache import FieldMaskCache
 from server.algorithms.services.field_predictor_service import FieldPredictorService
 from server.algorithms.video_processing import VideoProcessing
 from server.controllers.dto.inference_anchor_point import InferenceAnchorPoint
@@ -238,6 +239,8 @@ class VideoToMapEndpoint(APIEndpoint):
         current_user: FromDishka[UserDTO],
         app_config: FromDishka[AppConfig],
         field_predictor: FromDishka[FieldPredictorService],
+        field_inference_cache: FromDishka[FieldInferenceCache],
+        field_mask_cache: FromDishka[FieldMaskCache],
         file_lock: FromDishka[FileLock],
         video_id: int,
         body: Optional[InferenceAnchorPoint] = None,
@@ -262,7 +265,6 @@ class VideoToMapEndpoint(APIEndpoint):
 
         map_view: MapView = MapView(repository)
         video_path: Path = app_config.static_path / "videos" / video.converted_video_path
-        field_mask_path: Path = video_path.parent / "field_mask.jpeg"
         video_processing: VideoProcessing = VideoProcessing(app_config.video_processing)
 
         key_points: dict[RelativePointDTO, RelativePointDTO]
@@ -273,14 +275,16 @@ class VideoToMapEndpoint(APIEndpoint):
             anchor_point = body.anchor_point
 
         try:
+            # Field is detected on analysis proxy, so field mask matches frames of player tracking
             key_points, field_mask, *_ = await map_view.get_key_points_from_video(
-                video_path,
+                VideoProcessing.get_analysis_video(video_path),
                 video.camera_position,
                 app_config.minimap_config,
                 video_processing,
                 field_predictor,
                 frame_timestamp,
-                anchor_point
+                anchor_point,
+                field_inference_cache
             )
 
         except (FileNotFoundError, InvalidFileFormat) as err:
@@ -294,8 +298,10 @@ class VideoToMapEndpoint(APIEndpoint):
         except KeyError:
             raise HTTPException(500, "Video doesn't have proper length field")
 
+        # Legacy mask is locked until it is replaced, as readers of the mask lock the same file
+        field_mask_path: Path = field_mask_cache.get_mask_path(video_path.parent)
         async with file_lock.lock_file(field_mask_path):
-            cv2.imwrite(str(field_mask_path.resolve()), field_mask.mask)
+            await field_mask_cache.save(video_path.parent, field_mask)
 
         return [
             PointsMapping(map_point=map_point, video_point=video_point)
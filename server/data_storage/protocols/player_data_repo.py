@@ -1,4 +1,4 @@
-from typing import Protocol, runtime_checkable
+from typing import Protocol, Sequence, runtime_checkable
 
 from server.algorithms.enums.player_classes_enum import PlayerClasses
 from server.algorithms.enums.team import Team
@@ -18,18 +18,51 @@ class PlayerDataRepo(Protocol):
     async def insert_player_data(
         self,
         video_id: int,
-        players_data_on_frame: list[list[PlayerDataDTO]]
+        players_data_on_frame: list[list[PlayerDataDTO]],
+        start_frame_id: int = 0
     ) -> None:
         """
         Создает информацию об игроках на кадре в базе данных.
 
         :param video_id: Видео к которому принадлежит кадр.
         :param players_data_on_frame: Информация об игроках на каждом кадре.
+        :param start_frame_id: Номер кадра, которому соответствует первый элемент
+            (для добавления данных видео по частям).
         :return: Ничего.
         :raises NotFoundError: Если кадр для вставки не найден.
         :raises DataIntegrityError: Если вставлены неправильные данные.
         """
 
+    async def delete_player_data_from_frame(self, video_id: int, frame_id: int) -> int:
+        """
+        Удаляет данные об игроках на всех кадрах видео, начиная с кадра.
+
+        :param video_id: Идентификатор видео.
+        :param frame_id: Номер первого удаляемого кадра.
+        :return: Количество удаленных записей.
+        """
+
+    async def get_players_bottom_points_on_camera(self, video_id: int) -> list[tuple[int, int, float, float]]:
+        """
+        Получает точки центра нижней стороны прямоугольников всех игроков на камере в видео.
+
+        :param video_id: Идентификатор видео.
+        :return: Номер кадра, номер отслеживания и координаты x, y точки на камере для каждой записи.
+        """
+
+    async def set_players_points_on_minimap(
+        self, video_id: int, points_on_minimap: Sequence[tuple[int, int, float, float]]
+    ) -> int:
+        """
+        Изменяет положения игроков на мини-карте одним массовым обновлением.
+
+        :param video_id: Идентификатор видео.
+        :param points_on_minimap: Номер кадра, номер отслеживания и новые координаты x, y
+            на мини-карте для каждой изменяемой записи.
+        :return: Количество измененных записей.
+        :raises DataIntegrityError: Если переданы неправильные координаты.
+        """
+
     async def kill_tracking(self, video_id: int, frame_id: int, tracking_id: int) -> int:
         """
         Удаляет данные об отслеживании игроков.
@@ -26,14 +26,24 @@ class PlayerDataRepoSQLA(PlayerDataRepo):
     async def insert_player_data(
         self,
         video_id: int,
-        players_data_on_frame: list[list[PlayerDataDTO]]
+        players_data_on_frame: list[list[PlayerDataDTO]],
+        start_frame_id: int = 0
     ) -> None:
-        # Get last frame of sequence and if it doesn't exist - error out
-        assigned_teams: dict[int, Team | None] = {}
-
         async with await self.transaction.start_nested_transaction() as tr:
-            frame: Frame = await self._get_video_frame(video_id, max(len(players_data_on_frame) - 1, 0))
-            for frame_id, frame_data in enumerate(players_data_on_frame):
+            # Get last frame of sequence and if it doesn't exist - error out
+            frame: Frame = await self._get_video_frame(
+                video_id, start_frame_id + max(len(players_data_on_frame) - 1, 0)
+            )
+
+            # Teams assigned while inserting previous parts of video must not be assigned again
+            assigned_teams: dict[int, Team | None] = {}
+            if start_frame_id > 0:
+                assigned_result: ScalarResult[int] = await tr.session.scalars(
+                    select(TeamAssignment.tracking_id).where(TeamAssignment.video_id == video_id)
+                )
+                assigned_teams = dict.fromkeys(assigned_result)
+
+            for frame_id, frame_data in enumerate(players_data_on_frame, start_frame_id):
                 players: list[PlayerData] = []
                 for data_point in frame_data:
                     player_data_record: PlayerData = PlayerData(
@@ -84,6 +94,70 @@ class PlayerDataRepoSQLA(PlayerDataRepo):
                 print(err)
                 raise DataIntegrityError("Invalid data provided") from err
 
+    async def delete_player_data_from_frame(self, video_id: int, frame_id: int) -> int:
+        async with await self.transaction.start_nested_transaction() as tr:
+            await tr.session.execute(
+                Delete(TeamAssignment).where(
+                    and_(
+                        TeamAssignment.video_id == video_id,
+                        TeamAssignment.frame_id >= frame_id
+                    )
+                )
+            )
+            deleted = await tr.session.execute(
+                Delete(PlayerData).where(
+                    and_(
+                        PlayerData.video_id == video_id,
+                        PlayerData.frame_id >= frame_id
+                    )
+                )
+            )
+            await tr.commit()
+
+        return cast(int, deleted.rowcount)
+
+    async def get_players_bottom_points_on_camera(self, video_id: int) -> list[tuple[int, int, float, float]]:
+        result: TupleResult[tuple[int, int, float, float]] = (await self.transaction.session.execute(
+            Select(
+                PlayerData.frame_id,
+                PlayerData.tracking_id,
+                (PlayerData.player_on_camera_top_x + PlayerData.player_on_camera_bottom_x) / 2,
+                PlayerData.player_on_camera_bottom_y
+            ).where(PlayerData.video_id == video_id)
+        )).tuples()
+
+        return cast(list[tuple[int, int, float, float]], list(result))
+
+    async def set_players_points_on_minimap(
+        self, video_id: int, points_on_minimap: Sequence[tuple[int, int, float, float]]
+    ) -> int:
+        if len(points_on_minimap) == 0:
+            return 0
+
+        async with await self.transaction.start_nested_transaction() as tr:
+            try:
+                # Bulk update by primary key is executed as a single executemany
+                await tr.session.execute(
+                    Update(PlayerData),
+                    [
+                        {
+                            "tracking_id": tracking_id,
+                            "video_id": video_id,
+                            "frame_id": frame_id,
+                            "point_on_minimap_x": x,
+                            "point_on_minimap_y": y
+                        }
+                        for frame_id, tracking_id, x, y in points_on_minimap
+                    ]
+                )
+                await tr.commit()
+
+            except IntegrityError as err:
+                await tr.rollback()
+                raise DataIntegrityError("Invalid points on minimap") from err
+
+        return len(points_on_minimap)
+
     async def kill_tracking(self, video_id: int, frame_id: int, tracking_id: int) -> int:
         async with await self.transaction.start_nested_transaction() as tr:
             if not await self._does_video_frame_data_exists(video_id, tracking_id):
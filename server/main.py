@@ -16,6 +16,14 @@ with open(args.config_path, mode="rb") as f:
     config_data = AppConfig(**tomllib.load(f))
 
 config_data.local_mode = args.local_mode or config_data.local_mode
+
+if args.export_format is not None:
+    sys.exit(
+        0 if MinimapServer.export_models(
+            config_data, args.export_format, args.export_sample, args.export_tolerance
+        ) else 1
+    )
+
 server = MinimapServer(config_data)
 
 if args.drop_db and args.init_db:
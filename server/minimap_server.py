@@ -4,12 +4,16 @@ import tempfile
 import time
 import typing
 from argparse import Namespace
-from asyncio import AbstractEventLoop, Lock, Queue
+from asyncio import AbstractEventLoop
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Optional
 
+import cv2
+import numpy
+import torch
 import uvicorn
+from detectron2.structures import Instances
 from dishka import AsyncContainer, Scope, make_async_container
 from dishka.integrations.fastapi import (
     DishkaRoute,
@@ -24,12 +28,28 @@ from fastapi.staticfiles import StaticFiles
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from server.algorithms.data_types import CV_Image
+from server.algorithms.detection_cache import DetectionCache
+from server.algorithms.field_inference_cache import FieldInferenceCache
+from server.algorithms.field_mask_cache import FieldMaskCache
+from server.algorithms.lens_correction_previewer import LensCorrectionPreviewer
+from server.algorithms.device_scheduler import DeviceScheduler
 from server.algorithms.disk_space_allocator import DiskSpaceAllocator
+from server.algorithms.enums import InferenceBackendType
+from server.algorithms.exceptions import InferenceBackendUnavailable, InvalidFileFormat
 from server.algorithms.nn import device
+from server.algorithms.nn.batch_predictor import BatchPredictor
+from server.algorithms.nn.inference_backends import (
+    create_inference_backend,
+    export_model,
+    get_instances_difference,
+)
+from server.algorithms.services.base.inference_queue import InferenceQueue
 from server.algorithms.services.field_predictor_service import FieldPredictorService
 from server.algorithms.services.player_predictor_service import PlayerPredictorService
 from server.algorithms.video_processing import VideoProcessing
 from server.controllers.dataset_management import DatasetEndpoint
+from server.controllers.inference_statistics import InferenceStatisticsEndpoint
 from server.controllers.player_data_management import PlayerDataEndpoint
 from server.controllers.project_management import ProjectManagementEndpoint
 from server.controllers.user_authentication import UserAuthenticationEndpoint
@@ -53,6 +73,9 @@ from server.utils.providers.nn_providers import NnProvider
 
 class MinimapServer:
     app: FastAPI
+    # ByteTrack associates low score detections of partially occluded players,
+    # other trackers filter detections by their own score threshold
+    player_detection_threshold: float = 0.1
 
     def __init__(self, config: AppConfig, **fastapi_app_config) -> None:
         self.app = FastAPI(
@@ -110,19 +133,25 @@ class MinimapServer:
             static_path_disk_allocator = temp_disk_allocator
 
         # Initialize container for providers
-        gpu_lock: Lock = Lock()
+        device_scheduler: DeviceScheduler = DeviceScheduler()
         self.player_predictor: PlayerPredictorService = PlayerPredictorService(
             config.nn_config.player_detection_model_path.resolve(),
             device,
-            Queue(),
-            threshold=0.6,
-            device_lock=gpu_lock
+            InferenceQueue(),
+            threshold=self.player_detection_threshold,
+            device_scheduler=device_scheduler,
+            max_batch_size=config.nn_config.max_batch_size,
+            max_batch_wait_time=config.nn_config.max_batch_wait_time,
+            backend_type=config.nn_config.backend
         )
         self.field_predictor: FieldPredictorService = FieldPredictorService(
             config.nn_config.field_detection_model_path.resolve(),
             device,
-            Queue(),
-            device_lock=gpu_lock
+            InferenceQueue(),
+            device_scheduler=device_scheduler,
+            max_batch_size=config.nn_config.max_batch_size,
+            max_batch_wait_time=config.nn_config.max_batch_wait_time,
+            backend_type=config.nn_config.backend
         )
 
         container: AsyncContainer = make_async_container(
@@ -145,7 +174,13 @@ class MinimapServer:
             NnProvider(
                 device,
                 self.player_predictor,
-                self.field_predictor
+                self.field_predictor,
+                DetectionCache(
+                    config.static_path / "cache" / "detections",
+                    max_size=config.nn_config.detection_cache_max_size_mb * 1024 * 1024
+                ),
+                FieldInferenceCache(config.nn_config.field_inference_cache_size),
+                FieldMaskCache()
             )
         )
 
@@ -153,13 +188,18 @@ class MinimapServer:
 
         # Setup routes
         api = APIRouter(prefix="/api", route_class=DishkaRoute)
-        VideoUploadEndpoint(api, VideoProcessing(config.video_processing))
+        VideoUploadEndpoint(
+            api,
+            VideoProcessing(config.video_processing, config.video_processing_workers),
+            LensCorrectionPreviewer(config.video_processing.correction_preview_cache_size)
+        )
         UserManagementEndpoint(api)
         UserAuthenticationEndpoint(api)
         VideoToMapEndpoint(api)
         ProjectManagementEndpoint(api)
         DatasetEndpoint(api)
         PlayerDataEndpoint(api)
+        InferenceStatisticsEndpoint(api)
 
         self.app.mount("/static", StaticFiles(directory=config.static_path), name="static")
         self.register_routes(api)
@@ -233,6 +273,22 @@ class MinimapServer:
             dest="local_mode",
             help="Запускает сервер в локальном режиме работы с пользователем по умолчанию под логином Admin"
         )
+        parser.add_argument(
+            "--export-models", choices=("torchscript", "onnx"), default=None,
+            dest="export_format",
+            help="Экспортирует модели detectron2 в TorchScript или ONNX рядом с файлами весов, не запуская сервер"
+        )
+        parser.add_argument(
+            "--export-sample", default=None, type=Path,
+            dest="export_sample",
+            help="Путь до изображения или видео, на первом кадре которого проверяется "
+                 "совпадение результатов экспортированных моделей с исходными"
+        )
+        parser.add_argument(
+            "--export-tolerance", default=0.01, type=float,
+            dest="export_tolerance",
+            help="Допустимое отклонение результатов экспортированных моделей от исходных"
+        )
 
         return parser.parse_args()
 
@@ -272,6 +328,89 @@ class MinimapServer:
             tmp_repo: RepositorySQLA = typing.cast(RepositorySQLA, await container_fetch.get(Repository))
         await tmp_repo.drop_db(engine)
 
+    @classmethod
+    def export_models(
+        cls,
+        config: AppConfig,
+        export_format: str,
+        sample_path: Optional[Path] = None,
+        tolerance: float = 0.01
+    ) -> bool:
+        """
+        Экспортирует модели detectron2 рядом с файлами весов и сверяет результаты
+        экспортированных моделей с исходными.
+
+        :param config: Конфигурация приложения.
+        :param export_format: Формат экспорта (torchscript или onnx).
+        :param sample_path: Путь до изображения или видео для проверки результатов.
+        :param tolerance: Допустимое отклонение результатов.
+        :return: Совпадают ли результаты всех проверенных моделей в пределах отклонения.
+        :raise InvalidFileFormat: Не удалось прочитать кадр для проверки.
+        """
+        backend_type: InferenceBackendType = (
+            InferenceBackendType.TorchScript if export_format == "torchscript"
+            else InferenceBackendType.OnnxRuntime
+        )
+        sample_image: CV_Image
+
+        if sample_path is None:
+            sample_image = numpy.full((720, 1280, 3), 127, dtype=numpy.uint8)
+
+        else:
+            capture: cv2.VideoCapture = cv2.VideoCapture(str(sample_path))
+            success, frame = capture.read()
+            capture.release()
+
+            if not success:
+                raise InvalidFileFormat(f"Can't read frame from {sample_path}")
+
+            sample_image = typing.cast(CV_Image, frame)
+
+        player_weights: Path = config.nn_config.player_detection_model_path.resolve()
+        field_weights: Path = config.nn_config.field_detection_model_path.resolve()
+        results_match: bool = True
+
+        for weights, predictor in (
+            (
+                player_weights,
+                BatchPredictor(
+                    PlayerPredictorService.create_config(
+                        player_weights, device, cls.player_detection_threshold
+                    )
+                )
+            ),
+            (
+                field_weights,
+                BatchPredictor(FieldPredictorService.create_config(field_weights, device))
+            )
+        ):
+            exported_path: Path = export_model(
+                predictor.model,
+                backend_type,
+                weights,
+                predictor.prepare_inputs(sample_image)[0]["image"].to(device, torch.float32)
+            )
+            print(f"Exported {weights.name} to {exported_path}")
+
+            expected: Instances = predictor.batch_predict(sample_image)[0]["instances"]
+
+            try:
+                predictor.backend = create_inference_backend(
+                    backend_type, predictor.model, weights, device
+                )
+
+            except InferenceBackendUnavailable as err:
+                print(f"Skipped verification of {exported_path.name}: {err}")
+                continue
+
+            difference: float = get_instances_difference(
+                expected, predictor.batch_predict(sample_image)[0]["instances"]
+            )
+            print(f"Max difference of {exported_path.name} from eager model: {difference}")
+            results_match = results_match and difference <= tolerance
+
+        return results_match
+
     def start(self) -> None:
         """
         Запускает приложение.
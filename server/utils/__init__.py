@@ -1,9 +1,15 @@
 from .async_video_reader import async_video_reader
 from .async_buffered_generator import buffered_generator
 from .chain_video_slices import chain_video_slices
+from .enumerate_frames import enumerate_frames
+from .file_hash import hash_file
+from .process_video_reader import process_video_reader
 
 __all__ = (
     "async_video_reader",
     "buffered_generator",
-    "chain_video_slices"
+    "chain_video_slices",
+    "enumerate_frames",
+    "hash_file",
+    "process_video_reader"
 )
@@ -1,22 +1,32 @@
-from typing import AsyncGenerator, Sequence
+import asyncio
+from typing import AsyncGenerator, Optional, Sequence
 
 import cv2
 
 from .async_video_reader import async_video_reader
 from server.algorithms.data_types import CV_Image
+from server.algorithms.video_frame_index import VideoFrameIndex
 
 
 async def chain_video_slices(
-    video_reader: cv2.VideoCapture, slice_ranges: Sequence[tuple[int, int]]
+    video_reader: cv2.VideoCapture,
+    slice_ranges: Sequence[tuple[int, int]],
+    frame_index: Optional[VideoFrameIndex] = None
 ) -> AsyncGenerator[tuple[int, CV_Image], None]:
     """
     Получает отдельные кадры в переданных промежутках кадров.
 
     :param video_reader: Объект чтения кадров.
     :param slice_ranges: Промежутки с какого кадра по какой кадр вычитывать кадры.
+    :param frame_index: Индекс кадров видео для перехода через ключевые кадры,
+        без индекса переход выполняется по номеру кадра средствами OpenCV.
     :return: Генератор считанных кадров, содержащий номер кадра и сам кадр.
     :raise IndexError: Если кадры не находятся в допустимом промежутке.
     """
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    # Frame which is read next without seeking
+    reader_position: Optional[int] = None
+
     # validate ranges
     for start_frame, end_frame in slice_ranges:
         if start_frame > end_frame:
@@ -28,8 +38,14 @@ async def chain_video_slices(
         if end_frame < 0:
             raise IndexError(f"{end_frame=} must be greater or equal to 0")
 
-        video_reader.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        if frame_index is not None:
+            await loop.run_in_executor(None, frame_index.seek, video_reader, start_frame, reader_position)
+
+        elif reader_position != start_frame:
+            video_reader.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
         current_frame_num: int = start_frame
+        reader_position = None
         video_generator: AsyncGenerator[CV_Image, None] = async_video_reader(video_reader)
 
         async for frame in video_generator:
@@ -37,4 +53,5 @@ async def chain_video_slices(
             current_frame_num += 1
 
             if current_frame_num >= end_frame:
+                reader_position = current_frame_num
                 break
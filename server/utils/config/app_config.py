@@ -23,6 +23,7 @@ class AppConfig(BaseModel):
     players_data_extraction_workers: int = Field(ge=1, lt=20)
     minimap_frame_buffer: int = Field(ge=1, lt=120)
     prefetch_frame_buffer: int = Field(ge=1)
+    decoder_ring_size: int = Field(default=0, ge=0)
     minimap_rendering_workers: int = Field(ge=1, lt=64)
     video_processing_workers: int = Field(ge=1, lt=64)
 
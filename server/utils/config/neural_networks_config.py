@@ -4,6 +4,9 @@ from pathlib import Path
 from pydantic import BaseModel, Field, field_validator
 from pydantic_core import PydanticCustomError
 
+from server.algorithms.enums.inference_backend_type import InferenceBackendType
+from server.algorithms.enums.tracker_type import TrackerType
+
 
 class NeuralNetworkConfig(BaseModel):
     """
@@ -14,6 +17,18 @@ class NeuralNetworkConfig(BaseModel):
 
     device: Optional[str] = None
     max_batch_size: int = Field(ge=1, lt=50)
+    max_batch_wait_time: float = Field(default=0.01, ge=0, le=1)
+    backend: InferenceBackendType = InferenceBackendType.Eager
+    detection_stride: int = Field(default=1, ge=1, le=8)
+    max_track_uncertainty: float = Field(default=0.3, gt=0)
+    max_track_relative_speed: float = Field(default=0.2, gt=0)
+    tracker: TrackerType = TrackerType.Sort
+    tracking_segments: int = Field(default=1, ge=1)
+    tracking_segment_overlap: int = Field(default=30, ge=1)
+    field_inference_cache_size: int = Field(default=8, ge=0)
+    detection_cache_max_size_mb: int = Field(default=4096, ge=0)
+    crop_to_field: bool = False
+    field_crop_padding: int = Field(default=32, ge=0)
 
     @field_validator(
         'field_detection_model_path',
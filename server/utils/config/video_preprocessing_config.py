@@ -16,3 +16,9 @@ class VideoPreprocessingConfig(BaseModel):
     maxrate: str = Field(default="5M")
     bufsize: str = Field("10M")
     loglevel: str = Field(default="quiet")
+    correction_preview_cache_size: int = Field(default=4, ge=0)
+    transcode_segments: int = Field(default=1, ge=1)
+    analysis_width: int = Field(default=0, ge=0)
+    analysis_height: int = Field(default=0, ge=0)
+    analysis_codec: str = Field(default="mjpeg")
+    analysis_quality: int = Field(default=3, ge=1, le=31)
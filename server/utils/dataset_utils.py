@@ -11,12 +11,12 @@ def split_dataset(dataset: Any, train_ratio=0.67) -> tuple[Subset, Subset]:
     Разделяет набор данных в случайном порядке,
     стараясь сохранить соотношения количества классов в поднаборах.
 
-    :param dataset: Исходный набор данных.
+    :param dataset: Исходный набор данных с номерами классов в targets (например, ImageFolder).
     :param train_ratio: Соотношение обучающей выборки к проверочной.
     :return: Обучающая и проверочная выборка.
     """
     # Get the labels for weighted sampling
-    labels = torch.tensor([sample[1] for sample in dataset.samples])
+    labels = torch.tensor(dataset.targets)
 
     stratified_split = StratifiedShuffleSplit(
         n_splits=1, test_size=1 - train_ratio, random_state=42
@@ -39,7 +39,7 @@ def count_labels_in_subsets(dataset, train_indices, val_indices) -> tuple[Tensor
     :return: Результаты подсчетов.
     """
     # Get the labels for the dataset
-    labels = torch.tensor([sample[1] for sample in dataset.samples])
+    labels = torch.tensor(dataset.targets)
 
     # Count labels in each subset
     train_labels = labels[train_indices]
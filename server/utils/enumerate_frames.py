@@ -0,0 +1,19 @@
+from typing import AsyncGenerator, AsyncIterable
+
+from server.algorithms.data_types import CV_Image
+
+
+async def enumerate_frames(
+    frames: AsyncIterable[CV_Image], start: int = 0
+) -> AsyncGenerator[tuple[int, CV_Image], None]:
+    """
+    Добавляет номер кадра к каждому кадру из асинхронного потока.
+
+    :param frames: Поток кадров.
+    :param start: Номер первого кадра.
+    :return: Генератор, содержащий номер кадра и сам кадр.
+    """
+    frame_n: int = start
+    async for frame in frames:
+        yield frame_n, frame
+        frame_n += 1
@@ -0,0 +1,19 @@
+import hashlib
+from pathlib import Path
+
+
+def hash_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Вычисляет хеш содержимого файла, читая его частями.
+
+    :param path: Путь до файла.
+    :param chunk_size: Размер читаемой части в байтах.
+    :return: Хеш содержимого в шестнадцатеричном виде.
+    """
+    file_hash = hashlib.blake2b(digest_size=16)
+
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
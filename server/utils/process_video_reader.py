@@ -0,0 +1,166 @@
+import asyncio
+import multiprocessing
+import queue
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, AsyncGenerator, Optional, Sequence, cast
+
+import cv2
+import numpy as np
+
+from server.algorithms.data_types import CV_Image
+from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
+from server.algorithms.video_slices_decoder import decode_video_slices
+
+
+def _wait_for_frame(
+    decoded_frames: multiprocessing.Queue,
+    decoder: multiprocessing.Process,
+    is_reading: list[bool]
+) -> Any:
+    """
+    Ожидает сообщение процесса декодирования, пока чтение не прекращено.
+
+    :param decoded_frames: Очередь номеров кадров и ячеек с ними.
+    :param decoder: Процесс декодирования.
+    :param is_reading: Флаг продолжения чтения.
+    :return: Сообщение процесса декодирования или None при прекращении чтения.
+    """
+    while is_reading[0]:
+        try:
+            return decoded_frames.get(timeout=0.1)
+
+        except queue.Empty:
+            if not decoder.is_alive() and decoded_frames.empty():
+                return RuntimeError(f"Video decoder exited with code {decoder.exitcode}")
+
+    return None
+
+
+def _get_frame_shape(video_file: Path) -> tuple[int, int, int]:
+    """
+    Получает размер кадров видео.
+
+    :param video_file: Путь до видео.
+    :return: Высота, ширина и количество каналов кадра.
+    :raise FileNotFoundError: Файл не найден на диске.
+    :raise InvalidFileFormat: Файл не удается открыть как видео.
+    """
+    if not video_file.is_file():
+        raise FileNotFoundError("Video file not found on disk")
+
+    capture: cv2.VideoCapture = cv2.VideoCapture(str(video_file), cv2.CAP_FFMPEG)
+    try:
+        if not capture.isOpened():
+            raise InvalidFileFormat("File is not supported as a video")
+
+        return int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), 3
+
+    finally:
+        capture.release()
+
+
+async def process_video_reader(
+    video_file: Path,
+    slice_ranges: Sequence[tuple[int, Optional[int]]],
+    ring_size: int = 32
+) -> AsyncGenerator[tuple[int, CV_Image], None]:
+    """
+    Создает асинхронный генератор кадров, декодируемых в отдельном процессе.
+
+    Декодирование не разделяет GIL с обработкой кадров: процесс записывает кадры в кольцевой буфер
+    в общей памяти, а генератор выдает представления ячеек буфера без копирования. Ячейка
+    возвращается процессу декодирования после удаления всех ссылок на выданный кадр, поэтому кадры
+    можно удерживать (например, в буфере или пакете нейросети) без копирования. Если все ячейки,
+    кроме одной, удерживаются, кадр копируется, чтобы декодирование не остановилось.
+
+    :param video_file: Путь до видео.
+    :param slice_ranges: Промежутки кадров [начало, конец), None - до конца видео.
+    :param ring_size: Количество кадров в кольцевом буфере (не меньше 2).
+    :return: Генератор номеров кадров и кадров.
+    :raise FileNotFoundError: Файл не найден на диске.
+    :raise InvalidFileFormat: Файл не удается прочитать как видео.
+    """
+    ring_size = max(ring_size, 2)
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    frame_shape: tuple[int, int, int] = await loop.run_in_executor(None, _get_frame_shape, video_file)
+    frame_bytes: int = int(np.prod(frame_shape))
+
+    # Decoder doesn't inherit state of the server (CUDA context, threads)
+    context: Any = multiprocessing.get_context("spawn")
+    shared_memory: SharedMemory = SharedMemory(create=True, size=ring_size * frame_bytes)
+    free_slots: multiprocessing.Queue = context.Queue()
+    decoded_frames: multiprocessing.Queue = context.Queue()
+    held_slots: set[int] = set()
+    is_reading: list[bool] = [True]
+    is_decoded: list[bool] = [False]
+
+    def release_slot(slot: int, _: SharedMemory) -> None:
+        held_slots.discard(slot)
+        if is_reading[0]:
+            free_slots.put(slot)
+
+    for slot in range(ring_size):
+        free_slots.put(slot)
+
+    decoder: multiprocessing.Process = context.Process(
+        target=decode_video_slices,
+        args=(
+            video_file, list(slice_ranges), shared_memory.name, frame_shape,
+            ring_size, free_slots, decoded_frames
+        ),
+        daemon=True
+    )
+    decoder.start()
+
+    try:
+        while True:
+            message: Any = await loop.run_in_executor(
+                None, _wait_for_frame, decoded_frames, decoder, is_reading
+            )
+
+            if message is None or isinstance(message, Exception):
+                # Decoder exits by itself after sending the last message
+                is_decoded[0] = True
+
+            if message is None:
+                break
+
+            if isinstance(message, Exception):
+                raise message
+
+            frame_n, slot = cast(tuple[int, int], message)
+            frame: np.ndarray = np.ndarray(
+                frame_shape, dtype=np.uint8, buffer=shared_memory.buf, offset=slot * frame_bytes
+            )
+
+            if len(held_slots) >= ring_size - 1:
+                frame = frame.copy()
+                free_slots.put(slot)
+
+            else:
+                held_slots.add(slot)
+                # Memory stays mapped until the last held frame is deleted
+                weakref.finalize(frame, release_slot, slot, shared_memory)
+
+            yield frame_n, cast(CV_Image, frame)
+            del frame
+
+    finally:
+        # Also stops waiting for frames, if reading was cancelled
+        is_reading[0] = False
+
+        if not is_decoded[0]:
+            decoder.terminate()
+
+        # Decoder has already attached to memory, so its name isn't needed anymore
+        shared_memory.unlink()
+        await loop.run_in_executor(None, decoder.join)
+
+        # Otherwise memory is unmapped after the last held frame is deleted
+        if not held_slots:
+            shared_memory.close()
+
+        for process_queue in (free_slots, decoded_frames):
+            process_queue.close()
@@ -2,6 +2,9 @@ from typing import NewType
 
 from dishka import Provider, Scope, provide
 
+from server.algorithms.detection_cache import DetectionCache
+from server.algorithms.field_inference_cache import FieldInferenceCache
+from server.algorithms.field_mask_cache import FieldMaskCache
 from server.algorithms.services.field_predictor_service import FieldPredictorService
 from server.algorithms.services.player_predictor_service import PlayerPredictorService
 
@@ -16,12 +19,18 @@ class NnProvider(Provider):
         self,
         device_id: str,
         player_predictor: PlayerPredictorService,
-        field_predictor: FieldPredictorService
+        field_predictor: FieldPredictorService,
+        detection_cache: DetectionCache,
+        field_inference_cache: FieldInferenceCache,
+        field_mask_cache: FieldMaskCache
     ) -> None:
         super().__init__()
         self.device_id: DeviceID =  DeviceID(device_id)
         self.player_predictor: PlayerPredictorService = player_predictor
         self.field_predictor: FieldPredictorService = field_predictor
+        self.detection_cache: DetectionCache = detection_cache
+        self.field_inference_cache: FieldInferenceCache = field_inference_cache
+        self.field_mask_cache: FieldMaskCache = field_mask_cache
 
     @provide(scope=Scope.REQUEST)
     def get_player_predictor(self) -> PlayerPredictorService:
@@ -31,6 +40,18 @@ class NnProvider(Provider):
     def get_field_predictor(self) -> FieldPredictorService:
         return self.field_predictor
 
+    @provide(scope=Scope.REQUEST)
+    def get_detection_cache(self) -> DetectionCache:
+        return self.detection_cache
+
+    @provide(scope=Scope.REQUEST)
+    def get_field_inference_cache(self) -> FieldInferenceCache:
+        return self.field_inference_cache
+
+    @provide(scope=Scope.REQUEST)
+    def get_field_mask_cache(self) -> FieldMaskCache:
+        return self.field_mask_cache
+
     @provide(scope=Scope.REQUEST)
     def get_device_id(self) -> DeviceID:
         return self.device_id
@@ -1,15 +1,19 @@
-from asyncio import Future
+import asyncio
 from pathlib import Path
-from typing import cast
+from typing import Optional
 
 import cv2
 from detectron2.structures import Instances
 
-from server.algorithms.data_types import BoundingBox, CV_Image, Mask
-from server.algorithms.enums import PlayerClasses, Team
+from server.algorithms.data_types import BoundingBox, Mask
+from server.algorithms.detection_cache import DetectionCache, VideoDetectionCache
+from server.algorithms.enums import InferencePriority, PlayerClasses, Team, TrackerType
+from server.algorithms.field_mask_cache import FieldMaskCache
 from server.algorithms.player_tracker import PlayerTracker
 from server.algorithms.services.player_predictor_service import PlayerPredictorService
 from server.algorithms.services.player_tracking_service import PlayerTrackingService
+from server.algorithms.video_frame_index import VideoFrameIndex
+from server.algorithms.video_processing import VideoProcessing
 from server.data_storage.dto import DatasetDTO, VideoDTO, SubsetDataInputDTO
 from server.data_storage.exceptions import NotFoundError
 from server.data_storage.protocols import Repository
@@ -62,7 +66,11 @@ class DatasetView:
         frame_buffer_size: int,
         static_directory: Path,
         file_lock: FileLock,
-        player_predictor: PlayerPredictorService
+        player_predictor: PlayerPredictorService,
+        detection_cache: Optional[DetectionCache] = None,
+        tracker_type: TrackerType = TrackerType.Sort,
+        field_mask_cache: Optional[FieldMaskCache] = None,
+        field_crop_padding: Optional[int] = None
     ) -> int:
         """
         Создает новый поднабор данных в наборе данных.
@@ -74,6 +82,11 @@ class DatasetView:
         :param static_directory: Папка со статическими файлами.
         :param file_lock: Блокировщик доступа к файлам.
         :param player_predictor: Объект сервиса поиска игроков на поле.
+        :param detection_cache: Кэш выделений игроков по кадрам видео.
+        :param tracker_type: Алгоритм отслеживания идентичности игроков.
+        :param field_mask_cache: Хранилище масок поля.
+        :param field_crop_padding: Отступ области кадра, обрабатываемой нейросетью, от маски поля
+            в пикселях (None - нейросеть обрабатывает кадр целиком).
         :return: Идентификатор нового поднабора данных.
         :raise FileNotFound: Если файл с откорректированным искажением не найден.
         :raise ValueError: Неправильные входные данные идентификаторов
@@ -121,7 +134,8 @@ class DatasetView:
             raise IndexError("Already has crossover with some other dataset")
 
         video_path: Path = static_directory / "videos" / video_info.converted_video_path
-        field_mask_path: Path = video_path.parent / "field_mask.jpeg"
+        field_mask_cache = field_mask_cache or FieldMaskCache()
+        field_mask_path: Path = field_mask_cache.get_mask_path(video_path.parent)
 
         if not video_path.is_file():
             raise FileNotFoundError(
@@ -134,32 +148,54 @@ class DatasetView:
             )
 
         async with file_lock.lock_file(field_mask_path):
-            mask: Mask = Mask(
-                mask=cast(CV_Image, cv2.imread(str(field_mask_path)))
+            mask: Mask = await field_mask_cache.load(field_mask_path)
+
+        # Neural networks process frames of analysis proxy, mask is fit to its resolution
+        analysis_path: Path = VideoProcessing.get_analysis_video(video_path)
+        mask = mask.resize(
+            *await asyncio.get_running_loop().run_in_executor(
+                None, VideoProcessing.get_video_resolution, analysis_path
             )
+        )
+        detection_region: Optional[tuple[int, int, int, int]] = (
+            None if field_crop_padding is None else mask.get_padded_region(field_crop_padding)
+        )
 
         field_bounding_box: BoundingBox = BoundingBox(
             *mask.get_corners_of_mask()
         )
         player_tracker: PlayerTrackingService = PlayerTrackingService(
-            PlayerTracker(),
+            PlayerTracker(tracker_type=tracker_type),
             mask,
             field_bounding_box
         )
 
         # TODO: перенести в отдельный сервис обработки данных
         subset_data: list[list[SubsetDataInputDTO]] = []
-        capture = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
+        capture = cv2.VideoCapture(str(analysis_path), cv2.CAP_FFMPEG)
 
         async with file_lock.lock_file(video_path, timeout=1):
-            async for frame_n, frame in buffered_generator(
-                chain_video_slices(capture, [(from_frame, to_frame)]),
-                frame_buffer_size
+            video_detection_cache: Optional[VideoDetectionCache] = None
+            if detection_cache is not None:
+                video_detection_cache = await detection_cache.open_video_cache(
+                    analysis_path,
+                    player_predictor.get_region_fingerprint(player_predictor.model_fingerprint, detection_region)
+                )
+
+            resulting_players_instances: Instances
+            async for frame_n, _, resulting_players_instances in player_predictor.stream_inference(
+                buffered_generator(
+                    chain_video_slices(
+                        capture, [(from_frame, to_frame)], VideoFrameIndex.load(analysis_path)
+                    ),
+                    frame_buffer_size
+                ),
+                # Подмножество набора данных небольшое и ожидается пользователем
+                priority=InferencePriority.Interactive,
+                job_key=video_info.video_id,
+                detection_cache=video_detection_cache,
+                region=detection_region
             ):
-                result_instances: Future[
-                    list[Instances]
-                ] = await player_predictor.add_inference_task_to_queue(frame)
-                resulting_players_instances: Instances = (await result_instances)[0].to("cpu")
                 subset_data.append(
                     player_tracker.process_frame(frame_n, resulting_players_instances)
                 )
@@ -1,6 +1,5 @@
 import asyncio
 from asyncio import AbstractEventLoop, Future
-from concurrent.futures.thread import ThreadPoolExecutor
 from pathlib import Path
 from typing import NewType, Optional
 
@@ -9,8 +8,8 @@ from detectron2.structures import Instances
 from server.algorithms.data_types import BoundingBox, CV_Image, Mask, Point, RelativePoint
 from server.algorithms.data_types.field_extracted_data import FieldExtractedData
 from server.algorithms.enums import CameraPosition
+from server.algorithms.field_inference_cache import FieldInferenceCache
 from server.algorithms.key_point_placer import KeyPointPlacer
-from server.algorithms.services.base.field_data_extraction_protocol import FieldDataExtractionProtocol
 from server.algorithms.services.field_data_extraction_service import FieldDataExtractionService
 from server.algorithms.services.field_predictor_service import FieldPredictorService
 from server.algorithms.video_processing import VideoProcessing
@@ -116,12 +115,16 @@ class MapView:
         video_processing: VideoProcessing,
         field_predictor_service: FieldPredictorService,
         timestamp: Optional[float] = None,
-        anchor_point: Optional[RelativePointDTO] = None
+        anchor_point: Optional[RelativePointDTO] = None,
+        field_inference_cache: Optional[FieldInferenceCache] = None
     ) -> tuple[dict[RelativePointDTO, RelativePointDTO], Mask]:
         """
         Получает из кадра видео по временной метке разметку поля и соотношение точек
         к точкам камеры.
 
+        Кадр и выделения нейросети сохраняются в кэше, поэтому повторный запрос на том же кадре
+        выполняет только расстановку ключевых точек.
+
         :param video_path: Путь до видео файла.
         :param camera_position: Положение камеры относительно поля.
         :param map_config: Конфигурация ключевых точек поля.
@@ -129,6 +132,7 @@ class MapView:
         :param field_predictor_service: Сервис нейросети для выделения ключевых точек.
         :param timestamp: Временная метка.
         :param anchor_point: Опциональная ключевая точка центра.
+        :param field_inference_cache: Кэш кадров и выделений поля по временным меткам.
         :return: Соотнесение ключевых точек поля к точкам с камеры и маска поля.
         :raise FileNotFound: Файл не найден на диске.
         :raise ValueError: Временная метка вне длительности видео.
@@ -140,7 +144,22 @@ class MapView:
         relative_map_config: RelativeMinimapKeyPointConfig = self.get_relative_minimap_points(
             map_config
         )
-        frame: CV_Image = await self.extract_field_frame(video_path, video_processing, timestamp)
+        frame: CV_Image
+        field_elements: Instances
+
+        cached: Optional[tuple[CV_Image, Instances]] = None
+        if field_inference_cache is not None:
+            cached = field_inference_cache.get(video_path, timestamp or 0.0)
+
+        if cached is None:
+            frame = await self.extract_field_frame(video_path, video_processing, timestamp)
+            field_elements = await self.infer_field_elements(frame, field_predictor_service)
+
+            if field_inference_cache is not None:
+                field_inference_cache.put(video_path, timestamp or 0.0, frame, field_elements)
+
+        else:
+            frame, field_elements = cached
 
         width: int
         height: int
@@ -166,8 +185,8 @@ class MapView:
             )
 
         # Get field data where map points and field points are relative
-        field_data: FieldExtractedData = await self.compute_key_points_of_field_from_frame(
-            frame, field_data_extractor, field_predictor_service, absolute_anchor_point
+        field_data: FieldExtractedData = field_data_extractor.get_field_data(
+            field_elements, absolute_anchor_point
         )
 
         field_points_mapping: dict[RelativePointDTO, RelativePointDTO] = {
@@ -178,30 +197,23 @@ class MapView:
         return field_points_mapping, field_data.map_mask
 
     @staticmethod
-    async def compute_key_points_of_field_from_frame(
+    async def infer_field_elements(
         frame: CV_Image,
-        field_data_extractor: FieldDataExtractionProtocol,
-        field_predictor_service: FieldPredictorService,
-        anchor_point: Optional[Point] = None
-    ) -> FieldExtractedData:
+        field_predictor_service: FieldPredictorService
+    ) -> Instances:
         """
-        Рассчитывает положение точек
+        Выделяет элементы поля на кадре нейросетью.
 
         :param frame: Кадр видео.
-        :param field_data_extractor: Сервис получения ключевых точек и их расположения по полю.
         :param field_predictor_service: Нейросеть предсказания объекта поля.
-        :param anchor_point: Ключевая точка центра.
-        :return: Объект с данными о поле.
+        :return: Выделения нейросети на CPU.
         """
         fut: Future[list[Instances]] = await field_predictor_service.add_inference_task_to_queue(
             frame
         )
         results: list[Instances] = await fut
 
-        field_elements: Instances = results[0].to("cpu")
-        return field_data_extractor.get_field_data(
-            field_elements, anchor_point
-        )
+        return results[0].to("cpu")
 
     @staticmethod
     async def extract_field_frame(
@@ -222,17 +234,13 @@ class MapView:
         :raise InvalidFileFormat: Неподдерживаемый формат файла предоставлен в качестве файла.
         """
         loop: AbstractEventLoop = asyncio.get_running_loop()
-        result_frame: CV_Image
-
-        with ThreadPoolExecutor(1) as executor:
-            result_frame, _ = await loop.run_in_executor(
-                executor,
-                video_processing.render_frame_sample,
-                source_path,
-                timestamp
-            )
 
-        return result_frame
+        return await loop.run_in_executor(
+            None,
+            video_processing.render_frame_sample,
+            source_path,
+            timestamp
+        )
 
     @staticmethod
     def get_relative_minimap_points(map_config: MinimapKeyPointConfig) -> RelativeMinimapKeyPointConfig:
@@ -1,24 +1,31 @@
 import asyncio
-from asyncio import AbstractEventLoop, Future, Task
-from concurrent.futures import Executor
+import hashlib
+import os
+import pickle
+from asyncio import AbstractEventLoop, Task
+from collections import deque
 from concurrent.futures.thread import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import AsyncGenerator, cast
+from typing import Any, AsyncGenerator, AsyncIterable, Callable, Hashable, Iterator, Optional, cast
 
 import cv2
+import numpy as np
+import torch
 from detectron2.structures import Instances
 from torch.utils.data import Subset
-from torchvision.datasets import ImageFolder, VisionDataset
 
-from server.algorithms.data_types import BoundingBox, CV_Image, Mask, PlayerData, Point
-from server.algorithms.enums import PlayerClasses, Team
+from server.algorithms.data_types import BoundingBox, CV_Image, Mask, PlayerData, Point, TrackingCheckpoint
+from server.algorithms.detection_cache import DetectionCache, VideoDetectionCache
+from server.algorithms.enums import InferencePriority, PlayerClasses, Team, TrackerType
+from server.algorithms.field_mask_cache import FieldMaskCache
 from server.algorithms.nn import (
+    TeamDataset,
     TeamDetectionPredictor,
     TeamDetectorModel,
     TeamDetectorTeacher,
     device,
-    team_detector_transform,
 )
 from server.algorithms.player_tracker import PlayerTracker
 from server.algorithms.players_mapper import PlayersMapper
@@ -26,13 +33,18 @@ from server.algorithms.services.map_video_renderer_service import MapVideoRender
 from server.algorithms.services.player_data_extraction_service import PlayerDataExtractionService
 from server.algorithms.services.player_predictor_service import PlayerPredictorService
 from server.algorithms.services.player_tracking_service import PlayerTrackingService
+from server.algorithms.track_stitcher import TrackStitcher
+from server.algorithms.video_frame_index import VideoFrameIndex
+from server.algorithms.video_processing import VideoProcessing
 from server.data_storage.dto import BoxDTO, DatasetDTO, FrameDataDTO, MinimapDataDTO, SubsetDataDTO, VideoDTO
 from server.data_storage.dto.player_alias import PlayerAlias
 from server.data_storage.dto.player_data_dto import PlayerDataDTO
 from server.data_storage.dto.relative_point_dto import RelativePointDTO
 from server.data_storage.exceptions import NotFoundError
 from server.data_storage.protocols import Repository
-from server.utils import async_video_reader, buffered_generator, chain_video_slices
+from server.utils import (
+    async_video_reader, buffered_generator, chain_video_slices, enumerate_frames, process_video_reader
+)
 from server.utils.config import MinimapKeyPointConfig, VideoPreprocessingConfig
 from server.utils.dataset_utils import split_dataset
 from server.utils.file_lock import FileLock
@@ -40,6 +52,14 @@ from server.utils.providers import RenderBuffer, RenderWorker
 from server.views.exceptions import InvalidProjectState, MaskNotFoundError, NotEnoughPlayersUniformExamples
 
 
+# Количество эпох обучения нейросети разделения игроков на команды
+TEAM_DETECTOR_EPOCHS: int = 100
+# Количество кадров, данные которых сохраняются в БД вместе с состоянием обработки видео
+TRACKING_CHECKPOINT_FRAMES: int = 1000
+# Количество кадров отрезка видео, данные которых записываются во временный файл за раз
+TRACKING_SEGMENT_SPILL_FRAMES: int = 250
+
+
 class PlayerDataView:
     """
     Предоставляет интерфейс получения данных об игроках и управления ими.
@@ -53,16 +73,59 @@ class PlayerDataView:
         frame_buffer_size: int,
         file_lock: FileLock,
         static_directory: Path,
-        player_predictor: PlayerPredictorService
+        player_predictor: PlayerPredictorService,
+        detection_cache: Optional[DetectionCache] = None,
+        detection_stride: int = 1,
+        max_track_uncertainty: float = 0.3,
+        max_track_relative_speed: float = 0.2,
+        tracker_type: TrackerType = TrackerType.Sort,
+        tracking_segments: int = 1,
+        tracking_segment_overlap: int = 30,
+        field_mask_cache: Optional[FieldMaskCache] = None,
+        decoder_ring_size: int = 0,
+        field_crop_padding: Optional[int] = None
     ) -> None:
         """
         Генерирует данные о перемещениях игроков.
 
+        При шаге обработки больше 1 нейросеть обрабатывает каждый detection_stride кадр,
+        а положения игроков на остальных кадрах предсказываются по их движению. Кадр
+        обрабатывается нейросетью вне очереди, если предсказание становится неточным.
+
+        Данные сохраняются в БД частями по TRACKING_CHECKPOINT_FRAMES кадров вместе с состоянием
+        отслеживания, поэтому прерванная обработка продолжается с последней сохраненной части,
+        если параметры обработки не изменились.
+
+        При количестве отрезков больше 1 видео делится на перекрывающиеся отрезки, которые
+        отслеживаются одновременно, а отслеживания объединяются по перекрывающимся кадрам.
+        Такая обработка не продолжается с сохраненной части и начинается заново. Если видео
+        проиндексировано, чтение каждого отрезка начинается с ключевого кадра.
+
+        При размере кольцевого буфера декодирования больше 0 кадры каждого отрезка декодируются
+        в отдельном процессе.
+
+        Если задан отступ области поля, нейросеть обрабатывает только область кадра вокруг маски поля,
+        так как выделения за пределами поля все равно отбрасываются.
+
         :param video_id: Идентификатор видео.
         :param frame_buffer_size: Объем буфера кадров для чтения.
         :param file_lock: Блокировщик доступа к файлам.
         :param static_directory: Путь до статической директории.
         :param player_predictor: Сервис определения игроков.
+        :param detection_cache: Кэш выделений игроков по кадрам видео.
+        :param detection_stride: Шаг между кадрами, обрабатываемыми нейросетью.
+        :param max_track_uncertainty: Допустимая неопределенность предсказанного положения
+            относительно высоты игрока.
+        :param max_track_relative_speed: Допустимая скорость игрока за кадр относительно его высоты
+            для предсказания положения без нейросети.
+        :param tracker_type: Алгоритм отслеживания идентичности игроков.
+        :param tracking_segments: Количество одновременно обрабатываемых отрезков видео.
+        :param tracking_segment_overlap: Количество кадров перекрытия соседних отрезков.
+        :param field_mask_cache: Хранилище масок поля.
+        :param decoder_ring_size: Количество кадров в общей памяти процесса декодирования
+            (0 - кадры декодируются в процессе сервера).
+        :param field_crop_padding: Отступ области кадра, обрабатываемой нейросетью, от маски поля
+            в пикселях (None - нейросеть обрабатывает кадр целиком).
         :return: Ничего.
         :raise FileNotFoundError: Видеофайл не найден на диске.
         :raise MaskNotFoundError: Не найдена маска для видео.
@@ -89,31 +152,14 @@ class PlayerDataView:
             if video_info is None:
                 raise NotFoundError("Video was not found")
 
-            if video_info.dataset_id is None:
-                raise InvalidProjectState("Project does not have dataset")
-
-            if video_info.converted_video_path is None:
-                raise InvalidProjectState("Project must have converted video for this stage")
-
             if video_info.is_processed:
                 raise InvalidProjectState("Project was already processed")
 
-            dataset_sizes: dict[Team, int] = await self.repository.dataset_repo.get_teams_dataset_size(
-                video_info.dataset_id
-            )
+            dataset_info: DatasetDTO = await self._get_labelled_team_dataset(video_info)
 
-            if any((class_size < 50 for class_size in dataset_sizes.values())):
-                raise NotEnoughPlayersUniformExamples(
-                    "Not enough of examples for uniform",
-                    dataset_sizes
-                )
-
-            dataset_info: DatasetDTO = await self.repository.dataset_repo.get_team_dataset_by_id(
-                video_info.dataset_id
-            )
-
-        video_file: Path = static_directory / "videos" / video_info.converted_video_path
-        mask_file: Path = video_file.parent / "field_mask.jpeg"
+        video_file: Path = static_directory / "videos" / cast(str, video_info.converted_video_path)
+        field_mask_cache = field_mask_cache or FieldMaskCache()
+        mask_file: Path = field_mask_cache.get_mask_path(video_file.parent)
 
         if not video_file.is_file():
             raise FileNotFoundError("Video file was deleted from disk")
@@ -124,107 +170,165 @@ class PlayerDataView:
             if not mask_file.is_file():
                 raise MaskNotFoundError("Field mask was not found")
 
-            mask: CV_Image = cast(
-                CV_Image,
-                cv2.imread(
-                    str(mask_file.resolve())
-                )
+            field_mask: Mask = await field_mask_cache.load(mask_file)
+
+        # Neural networks process frames of analysis proxy, mask is fit to its resolution
+        analysis_file: Path = VideoProcessing.get_analysis_video(video_file)
+        field_mask = field_mask.resize(
+            *await asyncio.get_running_loop().run_in_executor(
+                None, VideoProcessing.get_video_resolution, analysis_file
             )
+        )
+        detection_region: Optional[tuple[int, int, int, int]] = (
+            None if field_crop_padding is None else field_mask.get_padded_region(field_crop_padding)
+        )
 
         # 1 second to get a hold of video,
         # or else it is assumed that video is processing already
         async with file_lock.lock_file(video_file, timeout=1):
-            frame_slices: list[tuple[int, int]] = []
-            players_on_frames: dict[int, list[SubsetDataDTO]] = {}
+            model: TeamDetectorModel = await self._get_team_detector(
+                video_file, dataset_info, frame_buffer_size, file_lock
+            )
+
+            # Prepare methods
+            team_predictor: TeamDetectionPredictor = TeamDetectionPredictor(model, device)
+            mapper: PlayersMapper = self.create_players_mapper(map_data)
+            field_bounding_box: BoundingBox = BoundingBox(*field_mask.get_corners_of_mask())
+
+            def create_player_data_extractor(player_tracker: PlayerTracker) -> PlayerDataExtractionService:
+                return PlayerDataExtractionService(
+                    team_predictor, mapper, player_tracker, field_mask, field_bounding_box
+                )
 
-            for subset in dataset_info.subsets:
-                frame_slices.append(
-                    (subset.from_frame_id, subset.to_frame_id)
+            video_detection_cache: Optional[VideoDetectionCache] = None
+            if detection_cache is not None:
+                video_detection_cache = await detection_cache.open_video_cache(
+                    analysis_file,
+                    player_predictor.get_region_fingerprint(player_predictor.model_fingerprint, detection_region)
                 )
 
-                for player_data in subset.subset_data:
-                    players_on_frames.setdefault(
-                        player_data.frame_id, []
-                    ).append(player_data)
+            segments: list[tuple[int, int]] = [(0, 0)]
+            if tracking_segments > 1:
+                async with self.repository.transaction:
+                    _, last_frame_id = await self.repository.player_data_repo.get_frames_min_and_max_ids_in_video(
+                        video_info.video_id
+                    )
 
-            with TemporaryDirectory(prefix="hmms_dataset_") as tmp:
-                train_subset, validate_subset = await self._prepare_dataset_for_team_detection(
-                    video_file,
-                    Path(tmp),
-                    frame_buffer_size,
-                    frame_slices, players_on_frames
+                frame_index: Optional[VideoFrameIndex] = VideoFrameIndex.load(analysis_file)
+                segments = TrackStitcher.split_into_segments(
+                    last_frame_id + 1,
+                    tracking_segments,
+                    tracking_segment_overlap,
+                    None if frame_index is None else frame_index.keyframes.tolist()
                 )
-                model: TeamDetectorModel = await self._prepare_team_detector(
-                    train_subset, validate_subset
+
+            checkpoint_file: Path = video_file.parent / "tracking_checkpoint.pkl"
+            player_data_on_frames: list[list[PlayerDataDTO]]
+            chunk_start_frame_id: int
+
+            if len(segments) > 1:
+                # Segments are tracked independently of each other, so there is no single state to resume from
+                checkpoint_file.unlink(missing_ok=True)
+                async with self.repository.transaction as tr:
+                    await self.repository.player_data_repo.delete_player_data_from_frame(
+                        video_info.video_id, 0
+                    )
+                    await tr.commit()
+
+                player_data_on_frames, chunk_start_frame_id = await self._track_video_segments(
+                    video_info.video_id,
+                    analysis_file,
+                    segments,
+                    tracking_segment_overlap,
+                    frame_buffer_size,
+                    lambda: create_player_data_extractor(PlayerTracker(tracker_type=tracker_type)),
+                    player_predictor,
+                    video_detection_cache,
+                    detection_stride,
+                    max_track_uncertainty,
+                    max_track_relative_speed,
+                    decoder_ring_size,
+                    detection_region
                 )
 
-            # Prepare methods
-            team_predictor: TeamDetectionPredictor = TeamDetectionPredictor(
-                model, team_detector_transform, device
-            )
-            mapper: PlayersMapper = PlayersMapper(
-                # Inside a relative bounding box
-                BoundingBox(Point(0, 0), Point(1, 1)),
-                {
-                    mapping.point_on_minimap: mapping.point_on_camera
-                        for mapping in map_data
-                }
-            )
-            field_mask: Mask = Mask(mask=mask)
-            player_data_extractor: PlayerDataExtractionService = PlayerDataExtractionService(
-                team_predictor,
-                mapper,
-                PlayerTracker(),
-                field_mask,
-                BoundingBox(*field_mask.get_corners_of_mask())
-            )
-
-            capture = cv2.VideoCapture(str(video_file), cv2.CAP_FFMPEG)
-            player_data_on_frames: list[list[PlayerDataDTO]] = []
+            else:
+                # Resume processing from the last saved part of video, if it was processed with same parameters
+                run_fingerprint: str = self.get_tracking_run_fingerprint(
+                    self.get_team_dataset_fingerprint(dataset_info),
+                    player_predictor.model_fingerprint,
+                    map_data,
+                    tracker_type,
+                    detection_stride,
+                    max_track_uncertainty,
+                    max_track_relative_speed,
+                    # Tracker state is kept in pixels of analyzed frames
+                    field_mask.frame_shape[:2],
+                    detection_region
+                )
+                checkpoint: Optional[TrackingCheckpoint] = await asyncio.get_running_loop().run_in_executor(
+                    None, self._load_tracking_checkpoint, checkpoint_file, run_fingerprint
+                )
+                start_frame_id: int = 0 if checkpoint is None else checkpoint.next_frame_id
 
-            # Process video
-            async for frame in buffered_generator(
-                async_video_reader(capture),
-                frame_buffer_size
-            ):
-                fut: Future[list[Instances]] = await player_predictor.add_inference_task_to_queue(frame)
-                player_instances: Instances = (await fut)[0].to('cpu')
-                player_inferred_data: list[PlayerData] = player_data_extractor.process_frame(
-                    frame, player_instances
+                player_data_extractor: PlayerDataExtractionService = create_player_data_extractor(
+                    PlayerTracker(tracker_type=tracker_type) if checkpoint is None else checkpoint.player_tracker
                 )
+                if checkpoint is not None:
+                    player_data_extractor.known_tracked_players_teams.update(
+                        checkpoint.known_tracked_players_teams
+                    )
 
-                frame_data: list[PlayerDataDTO] = []
-                for player in player_inferred_data:
-                    player_info: PlayerDataDTO = PlayerDataDTO(
-                        tracking_id=player.tracking_id,
-                        player_id=None,
-                        player_name=None,
-                        team_id=player.team_id,
-                        class_id=player.class_id,
-                        player_on_camera=BoxDTO(
-                            top_point=RelativePointDTO(
-                                x=player.bounding_box_on_camera.min_point.x,
-                                y=player.bounding_box_on_camera.min_point.y
-                            ),
-                            bottom_point=RelativePointDTO(
-                                x=player.bounding_box_on_camera.max_point.x,
-                                y=player.bounding_box_on_camera.max_point.y
-                            )
-                        ),
-                        player_on_minimap=RelativePointDTO(
-                            x=player.position.x,
-                            y=player.position.y
-                        )
+                # Data saved after checkpoint (or by interrupted run without checkpoint) is generated again
+                async with self.repository.transaction as tr:
+                    await self.repository.player_data_repo.delete_player_data_from_frame(
+                        video_info.video_id, start_frame_id
+                    )
+                    await tr.commit()
+
+                player_data_on_frames = []
+                chunk_start_frame_id = start_frame_id
+
+                # Process video
+                async for frame_n, player_inferred_data in self._track_frames(
+                    buffered_generator(
+                        self._read_video_frames(analysis_file, start_frame_id, None, decoder_ring_size),
+                        frame_buffer_size
+                    ),
+                    player_data_extractor,
+                    player_predictor,
+                    video_detection_cache,
+                    video_id,
+                    detection_stride,
+                    max_track_uncertainty,
+                    max_track_relative_speed,
+                    detection_region
+                ):
+                    player_data_on_frames.append(
+                        [self._to_player_data_dto(player) for player in player_inferred_data]
                     )
-                    frame_data.append(player_info)
 
-                player_data_on_frames.append(frame_data)
+                    if len(player_data_on_frames) >= TRACKING_CHECKPOINT_FRAMES:
+                        await self._save_tracking_chunk(
+                            video_info.video_id,
+                            chunk_start_frame_id,
+                            player_data_on_frames,
+                            checkpoint_file,
+                            TrackingCheckpoint(
+                                frame_n + 1,
+                                run_fingerprint,
+                                player_data_extractor.player_tracker,
+                                player_data_extractor.known_tracked_players_teams
+                            )
+                        )
+                        chunk_start_frame_id = frame_n + 1
+                        player_data_on_frames = []
 
-            # Add records
+            # Add remaining records
             async with self.repository.transaction as tr:
                 await self.repository.player_data_repo.insert_player_data(
                     video_info.video_id,
-                    player_data_on_frames
+                    player_data_on_frames,
+                    chunk_start_frame_id
                 )
                 await self.repository.video_repo.set_flag_video_is_processed(
                     video_info.video_id,
@@ -232,6 +336,388 @@ class PlayerDataView:
                 )
                 await tr.commit()
 
+            checkpoint_file.unlink(missing_ok=True)
+
+    async def reproject_players_to_minimap(self, video_id: int) -> int:
+        """
+        Пересчитывает положения игроков на мини-карте по текущим точкам соотнесения
+        без повторной обработки видео: точки всех игроков на камере преобразуются
+        одним вызовом и сохраняются массовым обновлением.
+
+        :param video_id: Идентификатор видео.
+        :return: Количество измененных записей.
+        :raise NotFoundError: Видео не найдено.
+        :raise InvalidProjectState: Недостаточно используемых точек соотнесения.
+        """
+        async with self.repository.transaction as tr:
+            video_info: VideoDTO | None = await self.repository.video_repo.get_video(
+                video_id
+            )
+
+            if video_info is None:
+                raise NotFoundError("Video was not found")
+
+            map_data: list[MinimapDataDTO] = list(filter(
+                lambda p: p.is_used,
+                await self.repository.map_data_repo.get_points_mapping_for_video(
+                    video_id
+                )
+            ))
+
+            if len(map_data) < 4:
+                raise InvalidProjectState("Not enough used map points")
+
+            mapper: PlayersMapper = self.create_players_mapper(map_data)
+            records: np.ndarray = np.array(
+                await self.repository.player_data_repo.get_players_bottom_points_on_camera(video_id),
+                dtype=np.float64
+            ).reshape(-1, 4)
+            points_on_minimap: np.ndarray = mapper.transform_points_array(records[:, 2:]).astype(np.float64)
+
+            updated: int = await self.repository.player_data_repo.set_players_points_on_minimap(
+                video_id,
+                list(zip(
+                    records[:, 0].astype(np.int64).tolist(),
+                    records[:, 1].astype(np.int64).tolist(),
+                    points_on_minimap[:, 0].tolist(),
+                    points_on_minimap[:, 1].tolist()
+                ))
+            )
+            await tr.commit()
+
+        return updated
+
+    @staticmethod
+    def create_players_mapper(map_data: list[MinimapDataDTO]) -> PlayersMapper:
+        """
+        Создает преобразование координат игроков с камеры на мини-карту.
+
+        :param map_data: Используемые точки соотнесения видео с мини-картой.
+        :return: Преобразование координат игроков.
+        :raise NotEnoughFieldPoints: Недостаточно точек соотнесения.
+        """
+        return PlayersMapper(
+            # Inside a relative bounding box
+            BoundingBox(Point(0, 0), Point(1, 1)),
+            {
+                mapping.point_on_minimap: mapping.point_on_camera
+                    for mapping in map_data
+            }
+        )
+
+    async def _track_frames(
+        self,
+        frames: AsyncIterable[tuple[int, CV_Image]],
+        player_data_extractor: PlayerDataExtractionService,
+        player_predictor: PlayerPredictorService,
+        video_detection_cache: Optional[VideoDetectionCache],
+        job_key: Hashable,
+        detection_stride: int,
+        max_track_uncertainty: float,
+        max_track_relative_speed: float,
+        detection_region: Optional[tuple[int, int, int, int]] = None
+    ) -> AsyncGenerator[tuple[int, list[PlayerData]], None]:
+        """
+        Определяет и отслеживает игроков на последовательных кадрах видео.
+
+        :param frames: Поток из номера кадра и самого кадра.
+        :param player_data_extractor: Сервис получения данных игроков с кадра.
+        :param player_predictor: Сервис определения игроков.
+        :param video_detection_cache: Кэш выделений игроков по кадрам видео.
+        :param job_key: Ключ задания обработки нейросетью.
+        :param detection_stride: Шаг между кадрами, обрабатываемыми нейросетью.
+        :param max_track_uncertainty: Допустимая неопределенность предсказанного положения
+            относительно высоты игрока.
+        :param max_track_relative_speed: Допустимая скорость игрока за кадр относительно его высоты
+            для предсказания положения без нейросети.
+        :param detection_region: Область кадра, обрабатываемая нейросетью (None - кадр целиком).
+        :return: Генератор из номера кадра и данных игроков на нем.
+        """
+        player_instances: Optional[Instances]
+        async for frame_n, frame, player_instances in player_predictor.stream_strided_inference(
+            frames,
+            detection_stride,
+            priority=InferencePriority.Bulk,
+            job_key=job_key,
+            detection_cache=video_detection_cache,
+            region=detection_region
+        ):
+            if player_instances is None and player_data_extractor.player_tracker.needs_detection(
+                max_track_uncertainty, max_track_relative_speed
+            ):
+                # Prediction of player positions is too uncertain, so frame is processed out of stride
+                player_instances = (
+                    await (await player_predictor.infer_frame(
+                        frame, frame_n, video_detection_cache,
+                        priority=InferencePriority.Bulk, job_key=job_key, region=detection_region
+                    ))
+                )[0]
+
+            yield frame_n, player_data_extractor.process_frame(frame, player_instances)
+
+    async def _track_video_segments(
+        self,
+        video_id: int,
+        video_file: Path,
+        segments: list[tuple[int, int]],
+        segment_overlap: int,
+        frame_buffer_size: int,
+        create_player_data_extractor: Callable[[], PlayerDataExtractionService],
+        player_predictor: PlayerPredictorService,
+        video_detection_cache: Optional[VideoDetectionCache],
+        detection_stride: int,
+        max_track_uncertainty: float,
+        max_track_relative_speed: float,
+        decoder_ring_size: int,
+        detection_region: Optional[tuple[int, int, int, int]] = None
+    ) -> tuple[list[list[PlayerDataDTO]], int]:
+        """
+        Отслеживает игроков на отрезках видео одновременно и объединяет отслеживания отрезков.
+
+        Каждый отрезок читается своим объектом чтения видео или процессом декодирования
+        и отслеживается своим алгоритмом отслеживания, начиная с segment_overlap кадров
+        до начала отрезка. Кадры всех отрезков
+        обрабатываются нейросетью общими пакетами. Результаты отрезков временно сохраняются на диск,
+        после чего отслеживания сопоставляются по перекрывающимся кадрам и сохраняются в БД
+        частями по TRACKING_CHECKPOINT_FRAMES кадров.
+
+        :param video_id: Идентификатор видео.
+        :param video_file: Путь до видео.
+        :param segments: Промежутки кадров отрезков без учета перекрытия.
+        :param segment_overlap: Количество кадров перекрытия соседних отрезков.
+        :param frame_buffer_size: Объем буфера кадров для чтения.
+        :param create_player_data_extractor: Создает сервис получения данных игроков для отрезка.
+        :param player_predictor: Сервис определения игроков.
+        :param video_detection_cache: Кэш выделений игроков по кадрам видео.
+        :param detection_stride: Шаг между кадрами, обрабатываемыми нейросетью.
+        :param max_track_uncertainty: Допустимая неопределенность предсказанного положения
+            относительно высоты игрока.
+        :param max_track_relative_speed: Допустимая скорость игрока за кадр относительно его высоты
+            для предсказания положения без нейросети.
+        :param decoder_ring_size: Количество кадров в общей памяти процесса декодирования отрезка
+            (0 - кадры декодируются в процессе сервера).
+        :param detection_region: Область кадра, обрабатываемая нейросетью (None - кадр целиком).
+        :return: Не сохраненные данные последних кадров и номер первого из них.
+        """
+        with TemporaryDirectory(prefix="hmms_tracking_") as tmp_dir:
+            segment_files: list[Path] = [
+                Path(tmp_dir) / f"segment_{segment_n}.pkl" for segment_n in range(len(segments))
+            ]
+
+            # Failure of one segment cancels processing of others
+            async with asyncio.TaskGroup() as task_group:
+                for (start_frame_id, end_frame_id), segment_file in zip(segments, segment_files):
+                    task_group.create_task(
+                        self._track_video_segment(
+                            video_file,
+                            max(0, start_frame_id - segment_overlap),
+                            end_frame_id,
+                            segment_file,
+                            frame_buffer_size,
+                            create_player_data_extractor(),
+                            player_predictor,
+                            video_detection_cache,
+                            # Segments share fair share of the video in the queue of neural network
+                            video_id,
+                            detection_stride,
+                            max_track_uncertainty,
+                            max_track_relative_speed,
+                            decoder_ring_size,
+                            detection_region
+                        )
+                    )
+
+            stitcher: TrackStitcher = TrackStitcher()
+            previous_overlap: list[list[PlayerData]] = []
+            player_data_on_frames: list[list[PlayerDataDTO]] = []
+            chunk_start_frame_id: int = 0
+
+            for (start_frame_id, _), segment_file in zip(segments, segment_files):
+                segment_frames: Iterator[list[PlayerData]] = self._read_tracked_segment(segment_file)
+                overlap: list[list[PlayerData]] = list(
+                    islice(segment_frames, min(segment_overlap, start_frame_id))
+                )
+                stitcher.start_segment(previous_overlap, overlap)
+                segment_tail: deque[list[PlayerData]] = deque(maxlen=segment_overlap)
+
+                for players in segment_frames:
+                    players = stitcher.renumber(players)
+                    segment_tail.append(players)
+                    player_data_on_frames.append([self._to_player_data_dto(player) for player in players])
+
+                    if len(player_data_on_frames) >= TRACKING_CHECKPOINT_FRAMES:
+                        async with self.repository.transaction as tr:
+                            await self.repository.player_data_repo.insert_player_data(
+                                video_id, player_data_on_frames, chunk_start_frame_id
+                            )
+                            await tr.commit()
+
+                        chunk_start_frame_id += len(player_data_on_frames)
+                        player_data_on_frames = []
+
+                previous_overlap = list(segment_tail)
+
+        return player_data_on_frames, chunk_start_frame_id
+
+    async def _track_video_segment(
+        self,
+        video_file: Path,
+        start_frame_id: int,
+        end_frame_id: int,
+        segment_file: Path,
+        frame_buffer_size: int,
+        player_data_extractor: PlayerDataExtractionService,
+        player_predictor: PlayerPredictorService,
+        video_detection_cache: Optional[VideoDetectionCache],
+        job_key: Hashable,
+        detection_stride: int,
+        max_track_uncertainty: float,
+        max_track_relative_speed: float,
+        decoder_ring_size: int,
+        detection_region: Optional[tuple[int, int, int, int]] = None
+    ) -> None:
+        """
+        Отслеживает игроков на отрезке видео и сохраняет результат в файл частями
+        по TRACKING_SEGMENT_SPILL_FRAMES кадров.
+
+        :param video_file: Путь до видео.
+        :param start_frame_id: Первый кадр отрезка.
+        :param end_frame_id: Кадр, следующий за последним кадром отрезка.
+        :param segment_file: Файл результата отслеживания отрезка.
+        :param frame_buffer_size: Объем буфера кадров для чтения.
+        :param player_data_extractor: Сервис получения данных игроков с кадра.
+        :param player_predictor: Сервис определения игроков.
+        :param video_detection_cache: Кэш выделений игроков по кадрам видео.
+        :param job_key: Ключ задания обработки нейросетью.
+        :param detection_stride: Шаг между кадрами, обрабатываемыми нейросетью.
+        :param max_track_uncertainty: Допустимая неопределенность предсказанного положения
+            относительно высоты игрока.
+        :param max_track_relative_speed: Допустимая скорость игрока за кадр относительно его высоты
+            для предсказания положения без нейросети.
+        :param decoder_ring_size: Количество кадров в общей памяти процесса декодирования
+            (0 - кадры декодируются в процессе сервера).
+        :param detection_region: Область кадра, обрабатываемая нейросетью (None - кадр целиком).
+        :return: Ничего.
+        """
+        tracked_frames: list[list[PlayerData]] = []
+
+        with open(segment_file, "wb") as f:
+            async for _, player_inferred_data in self._track_frames(
+                buffered_generator(
+                    self._read_video_frames(video_file, start_frame_id, end_frame_id, decoder_ring_size),
+                    frame_buffer_size
+                ),
+                player_data_extractor,
+                player_predictor,
+                video_detection_cache,
+                job_key,
+                detection_stride,
+                max_track_uncertainty,
+                max_track_relative_speed,
+                detection_region
+            ):
+                tracked_frames.append(player_inferred_data)
+
+                if len(tracked_frames) >= TRACKING_SEGMENT_SPILL_FRAMES:
+                    pickle.dump(tracked_frames, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    tracked_frames = []
+
+            pickle.dump(tracked_frames, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    async def _read_video_frames(
+        video_file: Path,
+        start_frame_id: int,
+        end_frame_id: Optional[int],
+        decoder_ring_size: int
+    ) -> AsyncGenerator[tuple[int, CV_Image], None]:
+        """
+        Читает кадры видео в отдельном процессе декодирования или в процессе сервера.
+
+        :param video_file: Путь до видео.
+        :param start_frame_id: Первый кадр.
+        :param end_frame_id: Кадр, следующий за последним кадром (None - до конца видео).
+        :param decoder_ring_size: Количество кадров в общей памяти процесса декодирования
+            (0 - кадры декодируются в процессе сервера).
+        :return: Генератор номеров кадров и кадров.
+        """
+        if decoder_ring_size > 0:
+            async for frame_n, frame in process_video_reader(
+                video_file, [(start_frame_id, end_frame_id)], decoder_ring_size
+            ):
+                yield frame_n, frame
+
+            return
+
+        capture = cv2.VideoCapture(str(video_file), cv2.CAP_FFMPEG)
+        frame_index: Optional[VideoFrameIndex] = VideoFrameIndex.load(video_file)
+
+        try:
+            if end_frame_id is not None:
+                async for frame_n, frame in chain_video_slices(
+                    capture, [(start_frame_id, end_frame_id)], frame_index
+                ):
+                    yield frame_n, frame
+
+                return
+
+            if start_frame_id > 0:
+                VideoProcessing.set_capture_frame_index(capture, start_frame_id, frame_index)
+
+            async for frame_n, frame in enumerate_frames(async_video_reader(capture), start_frame_id):
+                yield frame_n, frame
+
+        finally:
+            capture.release()
+
+    @staticmethod
+    def _read_tracked_segment(segment_file: Path) -> Iterator[list[PlayerData]]:
+        """
+        Читает результат отслеживания отрезка видео по кадрам.
+
+        :param segment_file: Файл результата отслеживания отрезка.
+        :return: Генератор данных игроков на кадрах отрезка.
+        """
+        with open(segment_file, "rb") as f:
+            while True:
+                try:
+                    tracked_frames: list[list[PlayerData]] = pickle.load(f)
+
+                except EOFError:
+                    return
+
+                yield from tracked_frames
+
+    @staticmethod
+    def _to_player_data_dto(player: PlayerData) -> PlayerDataDTO:
+        """
+        Преобразует данные игрока на кадре в формат хранения.
+
+        :param player: Данные игрока на кадре.
+        :return: Данные игрока для сохранения в БД.
+        """
+        return PlayerDataDTO(
+            tracking_id=player.tracking_id,
+            player_id=None,
+            player_name=None,
+            team_id=player.team_id,
+            class_id=player.class_id,
+            player_on_camera=BoxDTO(
+                top_point=RelativePointDTO(
+                    x=player.bounding_box_on_camera.min_point.x,
+                    y=player.bounding_box_on_camera.min_point.y
+                ),
+                bottom_point=RelativePointDTO(
+                    x=player.bounding_box_on_camera.max_point.x,
+                    y=player.bounding_box_on_camera.max_point.y
+                )
+            ),
+            player_on_minimap=RelativePointDTO(
+                x=player.position.x,
+                y=player.position.y
+            )
+        )
+
     async def kill_tracking(self, video_id: int, frame_id: int, tracking_id: int) -> int:
         """
         Удаляет данные об отслеживании игроков.
@@ -573,66 +1059,335 @@ class PlayerDataView:
                 video_id
             )
 
-    async def _prepare_dataset_for_team_detection(
+    async def pretrain_team_detector(
+        self,
+        video_id: int,
+        frame_buffer_size: int,
+        file_lock: FileLock,
+        static_directory: Path
+    ) -> None:
+        """
+        Заранее обучает нейросеть разделения игроков на команды по размеченному набору данных,
+        чтобы генерация данных о перемещениях игроков использовала сохраненную модель.
+
+        :param video_id: Идентификатор видео.
+        :param frame_buffer_size: Объем буфера кадров для чтения.
+        :param file_lock: Блокировщик доступа к файлам.
+        :param static_directory: Путь до статической директории.
+        :return: Ничего.
+        :raise FileNotFoundError: Видеофайл не найден на диске.
+        :raise NotFoundError: Видео не найдено.
+        :raise InvalidProjectState: Нет данных для проведения обучения.
+        :raise NotEnoughPlayersUniformExamples: Нет достаточного количества примеров формы игроков.
+        """
+        async with self.repository.transaction:
+            video_info: VideoDTO | None = await self.repository.video_repo.get_video(
+                video_id
+            )
+
+            if video_info is None:
+                raise NotFoundError("Video was not found")
+
+            dataset_info: DatasetDTO = await self._get_labelled_team_dataset(video_info)
+
+        video_file: Path = static_directory / "videos" / cast(str, video_info.converted_video_path)
+
+        if not video_file.is_file():
+            raise FileNotFoundError("Video file was deleted from disk")
+
+        await self._get_team_detector(
+            video_file, dataset_info, frame_buffer_size, file_lock
+        )
+
+    async def _get_labelled_team_dataset(self, video_info: VideoDTO) -> DatasetDTO:
+        """
+        Получает набор данных о командах, проверяя его готовность к обучению.
+        Выполняется внутри транзакции.
+
+        :param video_info: Информация о видео.
+        :return: Набор данных о командах.
+        :raise InvalidProjectState: Нет набора данных или обработанного видео.
+        :raise NotEnoughPlayersUniformExamples: Нет достаточного количества примеров формы игроков.
+        """
+        if video_info.dataset_id is None:
+            raise InvalidProjectState("Project does not have dataset")
+
+        if video_info.converted_video_path is None:
+            raise InvalidProjectState("Project must have converted video for this stage")
+
+        dataset_sizes: dict[Team, int] = await self.repository.dataset_repo.get_teams_dataset_size(
+            video_info.dataset_id
+        )
+
+        if any((class_size < 50 for class_size in dataset_sizes.values())):
+            raise NotEnoughPlayersUniformExamples(
+                "Not enough of examples for uniform",
+                dataset_sizes
+            )
+
+        return await self.repository.dataset_repo.get_team_dataset_by_id(
+            video_info.dataset_id
+        )
+
+    async def _get_team_detector(
         self,
         video_path: Path,
-        dest_directory: Path,
+        dataset_info: DatasetDTO,
         frame_buffer_size: int,
-        frame_slices: list[tuple[int, int]],
-        players_on_frames: dict[int, list[SubsetDataDTO]],
-    ) -> tuple[Subset, Subset]:
+        file_lock: FileLock
+    ) -> TeamDetectorModel:
         """
-        Создает набор данных о разделении игроков на команды.
+        Получает нейросеть разделения игроков на команды, обученную на наборе данных.
+
+        Обученные модели сохраняются рядом с видео под отпечатком набора данных,
+        поэтому модель обучается заново только при изменении набора данных.
 
         :param video_path: Путь до видео.
-        :param dest_directory: Путь набора данных.
+        :param dataset_info: Набор данных о командах.
         :param frame_buffer_size: Объем буфера кадров.
-        :param frame_slices: Срезы кадров с наборами данных.
-        :param players_on_frames: Информация об игроках на кадрах.
-        :return: Обучающая и проверочная подвыборка из набора данных.
+        :param file_lock: Блокировщик доступа к файлам.
+        :return: Обученная модель.
         """
+        models_directory: Path = video_path.parent / "team_models"
+        model_file: Path = models_directory / f"{self.get_team_dataset_fingerprint(dataset_info)}.pt"
         loop: AbstractEventLoop = asyncio.get_running_loop()
-        capture = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
 
-        home_team_dir: Path = dest_directory / "Team_home"
-        away_team_dir: Path = dest_directory / "Team_away"
-        home_team_dir.mkdir(exist_ok=True)
-        away_team_dir.mkdir(exist_ok=True)
+        # Ожидает завершения обучения той же модели, запущенного заранее
+        async with file_lock.lock_file(model_file):
+            if model_file.is_file():
+                try:
+                    return await loop.run_in_executor(
+                        None, self._load_team_detector, model_file
+                    )
 
-        home_team_counter: int = 0
-        away_team_counter: int = 0
+                except (OSError, RuntimeError, KeyError, pickle.UnpicklingError):
+                    # Поврежденная модель обучается заново
+                    model_file.unlink(missing_ok=True)
 
-        with ThreadPoolExecutor(1) as executor:
-            async for frame_n, frame in buffered_generator(
-                chain_video_slices(capture, frame_slices),
-                frame_buffer_size
-            ):
-                players: list[tuple[Team, CV_Image]] = PlayerTrackingService.get_players_data_from_frame(
-                    frame,
-                    players_on_frames[frame_n]
+            train_subset, validate_subset = await self._prepare_dataset_for_team_detection(
+                video_path, frame_buffer_size, dataset_info
+            )
+            model: TeamDetectorModel = await self._prepare_team_detector(
+                train_subset, validate_subset
+            )
+            await loop.run_in_executor(
+                None, self._save_team_detector, model, model_file
+            )
+
+        return model
+
+    @staticmethod
+    def get_team_dataset_fingerprint(dataset_info: DatasetDTO) -> str:
+        """
+        Вычисляет отпечаток содержимого набора данных о командах и параметров обучения,
+        не зависящий от порядка получения данных из БД.
+
+        :param dataset_info: Набор данных о командах.
+        :return: Отпечаток набора данных.
+        """
+        fingerprint = hashlib.blake2b(digest_size=16)
+        fingerprint.update(f"epochs={TEAM_DETECTOR_EPOCHS};".encode())
+
+        for subset in sorted(dataset_info.subsets, key=lambda s: (s.from_frame_id, s.to_frame_id)):
+            fingerprint.update(f"subset={subset.from_frame_id},{subset.to_frame_id};".encode())
+
+            for player_data in sorted(subset.subset_data, key=lambda p: (p.frame_id, p.tracking_id)):
+                box: BoxDTO = player_data.box
+                fingerprint.update(
+                    (
+                        f"{player_data.frame_id},{player_data.tracking_id},"
+                        f"{int(player_data.class_id)},{player_data.team_id and int(player_data.team_id)},"
+                        f"{box.top_point.x},{box.top_point.y},{box.bottom_point.x},{box.bottom_point.y};"
+                    ).encode()
                 )
 
-                for player_team, player_image in players:
-                    if player_team == Team.Home:
-                        home_team_counter += 1
-                        await self._write_image(
-                            player_image,
-                            home_team_dir / f"Home_{home_team_counter}.png",
-                            loop, executor
-                        )
+        return fingerprint.hexdigest()
 
-                    else:
-                        away_team_counter += 1
-                        await self._write_image(
-                            player_image,
-                            away_team_dir / f"Away_{home_team_counter}.png",
-                            loop, executor
-                        )
+    @staticmethod
+    def get_tracking_run_fingerprint(
+        dataset_fingerprint: str,
+        model_fingerprint: str,
+        map_data: list[MinimapDataDTO],
+        *params: Any
+    ) -> str:
+        """
+        Вычисляет отпечаток параметров генерации данных о перемещениях игроков,
+        при совпадении которого прерванная обработка может быть продолжена.
+
+        :param dataset_fingerprint: Отпечаток набора данных о командах.
+        :param model_fingerprint: Отпечаток модели определения игроков.
+        :param map_data: Используемые точки соотнесения с мини-картой.
+        :param params: Прочие параметры обработки.
+        :return: Отпечаток параметров.
+        """
+        fingerprint = hashlib.blake2b(digest_size=16)
+        fingerprint.update(f"{dataset_fingerprint};{model_fingerprint};".encode())
+
+        for mapping in sorted(map_data, key=lambda m: (m.point_on_minimap.x, m.point_on_minimap.y)):
+            fingerprint.update(
+                (
+                    f"{mapping.point_on_minimap.x},{mapping.point_on_minimap.y},"
+                    f"{mapping.point_on_camera.x},{mapping.point_on_camera.y};"
+                ).encode()
+            )
+
+        fingerprint.update(repr(params).encode())
+        return fingerprint.hexdigest()
+
+    async def _save_tracking_chunk(
+        self,
+        video_id: int,
+        start_frame_id: int,
+        player_data_on_frames: list[list[PlayerDataDTO]],
+        checkpoint_file: Path,
+        checkpoint: TrackingCheckpoint
+    ) -> None:
+        """
+        Сохраняет данные о перемещениях игроков на части кадров и состояние обработки после них.
 
-        dataset: VisionDataset = ImageFolder(
-            dest_directory,
-            transform=team_detector_transform
+        :param video_id: Идентификатор видео.
+        :param start_frame_id: Номер первого кадра части.
+        :param player_data_on_frames: Данные об игроках на кадрах части.
+        :param checkpoint_file: Путь до файла состояния обработки.
+        :param checkpoint: Состояние обработки после части кадров.
+        :return: Ничего.
+        :raise DataIntegrityError: Если уже имеются добавленные данные.
+        """
+        # Состояние сериализуется сразу, так как обработка продолжает его изменять
+        try:
+            checkpoint_data: Optional[bytes] = pickle.dumps(checkpoint)
+
+        except (pickle.PicklingError, TypeError, AttributeError):
+            checkpoint_data = None
+
+        async with self.repository.transaction as tr:
+            await self.repository.player_data_repo.insert_player_data(
+                video_id,
+                player_data_on_frames,
+                start_frame_id
+            )
+            await tr.commit()
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_tracking_checkpoint, checkpoint_file, checkpoint_data
         )
+
+    @staticmethod
+    def _write_tracking_checkpoint(checkpoint_file: Path, checkpoint_data: Optional[bytes]) -> None:
+        """
+        Записывает состояние обработки видео с заменой предыдущего.
+
+        :param checkpoint_file: Путь до файла состояния обработки.
+        :param checkpoint_data: Сериализованное состояние или None,
+            если состояние алгоритма отслеживания не может быть сохранено.
+        :return: Ничего.
+        """
+        if checkpoint_data is None:
+            checkpoint_file.unlink(missing_ok=True)
+            return
+
+        tmp_file: Path = checkpoint_file.with_suffix(".tmp")
+        tmp_file.write_bytes(checkpoint_data)
+        os.replace(tmp_file, checkpoint_file)
+
+    @staticmethod
+    def _load_tracking_checkpoint(checkpoint_file: Path, run_fingerprint: str) -> Optional[TrackingCheckpoint]:
+        """
+        Загружает состояние прерванной обработки видео.
+
+        :param checkpoint_file: Путь до файла состояния обработки.
+        :param run_fingerprint: Отпечаток параметров текущей обработки.
+        :return: Состояние обработки или None, если его нет или оно получено с другими параметрами.
+        """
+        if not checkpoint_file.is_file():
+            return None
+
+        try:
+            checkpoint: Any = pickle.loads(checkpoint_file.read_bytes())
+
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+            return None
+
+        if not isinstance(checkpoint, TrackingCheckpoint) or checkpoint.run_fingerprint != run_fingerprint:
+            return None
+
+        return checkpoint
+
+    @staticmethod
+    def _load_team_detector(model_file: Path) -> TeamDetectorModel:
+        """
+        Загружает сохраненную модель разделения игроков на команды.
+
+        :param model_file: Путь до файла весов модели.
+        :return: Модель с загруженными весами.
+        """
+        model: TeamDetectorModel = TeamDetectorModel()
+        model.load_state_dict(
+            torch.load(model_file, map_location="cpu", weights_only=True)
+        )
+        return model
+
+    @staticmethod
+    def _save_team_detector(model: TeamDetectorModel, model_file: Path) -> None:
+        """
+        Сохраняет модель разделения игроков на команды, удаляя модели устаревших наборов данных.
+
+        :param model: Обученная модель.
+        :param model_file: Путь до файла весов модели.
+        :return: Ничего.
+        """
+        model_file.parent.mkdir(exist_ok=True)
+        tmp_file: Path = model_file.with_suffix(".tmp")
+        torch.save(model.state_dict(), tmp_file)
+        os.replace(tmp_file, model_file)
+
+        for outdated_file in model_file.parent.glob("*.pt"):
+            if outdated_file != model_file:
+                outdated_file.unlink(missing_ok=True)
+
+    async def _prepare_dataset_for_team_detection(
+        self,
+        video_path: Path,
+        frame_buffer_size: int,
+        dataset_info: DatasetDTO
+    ) -> tuple[Subset, Subset]:
+        """
+        Создает набор данных о разделении игроков на команды в памяти.
+
+        :param video_path: Путь до видео.
+        :param frame_buffer_size: Объем буфера кадров.
+        :param dataset_info: Набор данных о командах.
+        :return: Обучающая и проверочная подвыборка из набора данных.
+        """
+        frame_slices: list[tuple[int, int]] = []
+        players_on_frames: dict[int, list[SubsetDataDTO]] = {}
+
+        for subset in dataset_info.subsets:
+            frame_slices.append(
+                (subset.from_frame_id, subset.to_frame_id)
+            )
+
+            for player_data in subset.subset_data:
+                players_on_frames.setdefault(
+                    player_data.frame_id, []
+                ).append(player_data)
+
+        analysis_path: Path = VideoProcessing.get_analysis_video(video_path)
+        capture = cv2.VideoCapture(str(analysis_path), cv2.CAP_FFMPEG)
+        dataset: TeamDataset = TeamDataset()
+
+        async for frame_n, frame in buffered_generator(
+            chain_video_slices(capture, frame_slices, VideoFrameIndex.load(analysis_path)),
+            frame_buffer_size
+        ):
+            players: list[tuple[Team, CV_Image]] = PlayerTrackingService.get_players_data_from_frame(
+                frame,
+                players_on_frames[frame_n]
+            )
+
+            for player_team, player_image in players:
+                dataset.add(player_image, player_team)
+
         return split_dataset(dataset)
 
     @staticmethod
@@ -649,7 +1404,7 @@ class PlayerDataView:
         trainer: TeamDetectorTeacher = TeamDetectorTeacher(
             train_subset,
             val_subset,
-            100,
+            TEAM_DETECTOR_EPOCHS,
             TeamDetectorModel(),
             device
         )
@@ -661,27 +1416,3 @@ class PlayerDataView:
             )
 
         return model
-
-    @staticmethod
-    async def _write_image(
-        image: CV_Image,
-        dest: Path,
-        loop: AbstractEventLoop,
-        executor: Executor
-    ) -> None:
-        """
-        Сохраняет изображение на диск.
-
-        :param image: Объект изображения.
-        :param dest: Путь до файла.
-        :param loop: Используемый цикл программы.
-        :param executor: Исполнитель задачи.
-        :return: Ничего.
-        """
-        await loop.run_in_executor(
-            executor,
-            cv2.imwrite,
-            str(dest.resolve()),
-            image,
-            []
-        )
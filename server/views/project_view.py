@@ -10,6 +10,7 @@ from typing import Optional
 import aiofiles
 import orjson
 
+from server.algorithms.field_mask_cache import FIELD_MASK_FILE_NAME, LEGACY_FIELD_MASK_FILE_NAME, FieldMaskCache
 from server.data_storage.dto import ProjectDTO, ProjectExportDTO, VideoDTO
 from server.data_storage.exceptions import NotFoundError
 from server.data_storage.protocols import Repository
@@ -141,7 +142,7 @@ class ProjectView:
         json_output_path: Path = video_project_dir / "project_data.json"
         source_video_path: Path = projects_directory / video.source_video_path
         converted_video_path: Path = projects_directory / video.converted_video_path
-        video_mask: Path = video_project_dir / "field_mask.jpeg"
+        video_mask: Path = FieldMaskCache.get_mask_path(video_project_dir)
         exported_zip_path: Path = video_project_dir / "export.zip"
 
         currently_used_space: int = source_video_path.stat().st_size + converted_video_path.stat().st_size
@@ -220,8 +221,16 @@ class ProjectView:
                 if "project_data.json" not in filenames:
                     raise FileNotFoundError("project_data.json must be included into archive")
 
-                if "field_mask.jpeg" not in filenames:
-                    raise FileNotFoundError("field_mask.jpeg must be included into archive")
+                # Archives exported by previous versions contain lossy mask
+                mask_file_name: str = next(
+                    (
+                        file_name for file_name in (FIELD_MASK_FILE_NAME, LEGACY_FIELD_MASK_FILE_NAME)
+                        if file_name in filenames
+                    ),
+                    ""
+                )
+                if not mask_file_name:
+                    raise FileNotFoundError(f"{FIELD_MASK_FILE_NAME} must be included into archive")
 
                 json_text: str = imported_zip.read("project_data.json").decode("utf-8")
                 project_data: ProjectExportDTO = ProjectExportDTO(
@@ -253,7 +262,7 @@ class ProjectView:
                     await loop.run_in_executor(
                         executor,
                         imported_zip.extract,
-                        "field_mask.jpeg",
+                        mask_file_name,
                         project_dest_path
                     )
                     await loop.run_in_executor(
@@ -9,6 +9,8 @@ import cv2
 from server.algorithms.data_types import CV_Image
 from server.algorithms.disk_space_allocator import DiskSpaceAllocator
 from server.algorithms.enums import CameraPosition
+from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
+from server.algorithms.lens_correction_previewer import LensCorrectionPreviewer
 from server.algorithms.video_processing import VideoProcessing
 from server.data_storage.dto import VideoDTO
 from server.data_storage.exceptions import NotFoundError
@@ -135,22 +137,22 @@ class VideoView:
     async def generate_correction_preview(
         self,
         video_id: int,
-        executor: Executor,
+        executor: Optional[Executor],
         video_processing: VideoProcessing,
+        lens_correction_previewer: LensCorrectionPreviewer,
         static_directory: Path,
-        dest: Path,
         frame_timestamp: Optional[float] = None
-    ) -> None:
+    ) -> bytes:
         """
         Подготавливает пример кадра с примененной коррекцией.
 
         :param video_id: Идентификатор видео.
-        :param executor: Объект запуска обработки.
+        :param executor: Объект запуска обработки (None - исполнитель цикла событий по умолчанию).
         :param video_processing: Обработчик видео.
+        :param lens_correction_previewer: Объект создания примеров коррекции.
         :param static_directory: Путь до директории с видео.
-        :param dest: Путь для сохранения примера кадра.
         :param frame_timestamp: Временная метка для примера.
-        :return: Ничего.
+        :return: Кадр в формате JPEG.
         :raise NotFoundError: Если видео не найдено в БД.
         :raise FileNotFound: Файл не найден на диске.
         :raise ValueError: Временная метка вне длительности видео.
@@ -165,23 +167,33 @@ class VideoView:
             if video is None:
                 raise NotFoundError("Video was not found")
 
-        image: CV_Image
-        image, _ = await loop.run_in_executor(
+        image: CV_Image = await loop.run_in_executor(
             executor,
-            video_processing.render_correction_sample,
+            lens_correction_previewer.render_correction_sample,
+            video_processing,
             static_directory / "videos" / video.source_video_path,
             video.corrective_coefficient_k1,
             video.corrective_coefficient_k2,
             frame_timestamp
         )
 
-        await loop.run_in_executor(
-            executor,
-            cv2.imwrite,
-            str(dest.resolve()),
-            image,
-            []
-        )
+        return await loop.run_in_executor(executor, self.encode_jpeg, image)
+
+    @staticmethod
+    def encode_jpeg(image: CV_Image) -> bytes:
+        """
+        Кодирует изображение в JPEG в памяти.
+
+        :param image: Изображение.
+        :return: Содержимое файла JPEG.
+        :raise InvalidFileFormat: Изображение не удалось закодировать.
+        """
+        is_encoded, encoded = cv2.imencode(".jpeg", image)
+
+        if not is_encoded:
+            raise InvalidFileFormat("Frame can't be encoded to JPEG")
+
+        return encoded.tobytes()
 
     async def apply_video_correction(
         self,
@@ -222,7 +234,23 @@ class VideoView:
         source_video: Path = video_dir / video.source_video_path
         dest_file: Path = source_video.parent / "corrected_video.mp4"
 
+        # Proxy has the same frames as the corrected video, so its size is estimated by the source video
+        proxy_size: int = await loop.run_in_executor(
+            executor, video_processing.estimate_analysis_proxy_size, source_video
+        )
+
         if video.corrective_coefficient_k1 == 0 and video.corrective_coefficient_k2 == 0:
+            # Source video is used as is, so it's indexed instead of rendered video
+            await loop.run_in_executor(executor, video_processing.build_frame_index, source_video)
+
+            if proxy_size > 0:
+                async with dest_disk_space_allocator.preallocate_disk_space(proxy_size):
+                    await loop.run_in_executor(executor, video_processing.render_analysis_proxy, source_video)
+
+            else:
+                # Removes the outdated proxy
+                await loop.run_in_executor(executor, video_processing.render_analysis_proxy, source_video)
+
             async with self.repository.transaction as tr:
                 await self.repository.video_repo.set_flag_video_is_converted(
                     video_id,
@@ -235,7 +263,7 @@ class VideoView:
 
         async with (
             temp_disk_space_allocator.preallocate_disk_space(source_video.stat().st_size),
-            dest_disk_space_allocator.preallocate_disk_space(source_video.stat().st_size),
+            dest_disk_space_allocator.preallocate_disk_space(source_video.stat().st_size + proxy_size),
             file_lock.lock_file(dest_file, timeout=1)
         ):
             await loop.run_in_executor(
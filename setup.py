@@ -45,6 +45,8 @@ setup(
     ],
     extras_require={
         "uvicorn": ["uvicorn~=0.34.0"],
+        "onnx": ["onnx>=1.16.0", "onnxruntime>=1.18.0"],
+        "openvino": ["onnx>=1.16.0", "openvino>=2024.1.0"],
         "linters": ["ruff~=0.11.2", "mypy~=1.15.0"],
         "dev": [
             "ruff>=0.11.2",
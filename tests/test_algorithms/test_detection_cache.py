@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from server.algorithms.data_types import RawDetections
+from server.algorithms.detection_cache import DetectionCache, VideoDetectionCache
+
+
+def make_detections(count: int) -> RawDetections:
+    return RawDetections(
+        np.arange(count * 4, dtype=np.float32).reshape(-1, 4),
+        np.linspace(0.5, 1, count, dtype=np.float32),
+        np.arange(count, dtype=np.int64) % 3,
+        (720, 1280)
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_frames(tmp_path: Path):
+    cache = VideoDetectionCache(tmp_path, chunk_size=4, max_loaded_chunks=1)
+
+    for frame_id in range(10):
+        cache.put(frame_id, make_detections(frame_id % 3))
+
+    await cache.flush()
+    reopened_cache = VideoDetectionCache(tmp_path, chunk_size=4)
+
+    for frame_id in range(10):
+        detections = await reopened_cache.get(frame_id)
+        expected = make_detections(frame_id % 3)
+
+        assert detections is not None
+        assert np.array_equal(detections.boxes, expected.boxes)
+        # Scores near thresholds are stored without loss of precision
+        assert np.array_equal(detections.scores, expected.scores)
+        assert np.array_equal(detections.classes, expected.classes)
+        assert detections.image_size == (720, 1280)
+
+    assert await reopened_cache.get(10) is None
+
+
+@pytest.mark.asyncio
+async def test_frames_added_without_reading_chunk_are_merged(tmp_path: Path):
+    cache = VideoDetectionCache(tmp_path, chunk_size=4)
+    cache.put(0, make_detections(1))
+    await cache.flush()
+
+    # Chunk is not read before adding a frame to it
+    reopened_cache = VideoDetectionCache(tmp_path, chunk_size=4)
+    reopened_cache.put(1, make_detections(2))
+    assert await reopened_cache.get(0) is not None
+
+    other_cache = VideoDetectionCache(tmp_path, chunk_size=4)
+    other_cache.put(2, make_detections(2))
+    await other_cache.flush()
+
+    result_cache = VideoDetectionCache(tmp_path, chunk_size=4)
+    assert await result_cache.get(0) is not None
+    assert await result_cache.get(2) is not None
+
+
+@pytest.mark.asyncio
+async def test_cache_keyed_by_video_content(tmp_path: Path):
+    first_video: Path = tmp_path / "first.mp4"
+    second_video: Path = tmp_path / "second.mp4"
+    first_video.write_bytes(b"video")
+    second_video.write_bytes(b"video")
+
+    cache = DetectionCache(tmp_path / "cache")
+    video_cache = await cache.open_video_cache(first_video, "model")
+    video_cache.put(0, make_detections(2))
+    await video_cache.flush()
+
+    same_content_cache = await cache.open_video_cache(second_video, "model")
+    other_model_cache = await cache.open_video_cache(second_video, "other_model")
+
+    assert await same_content_cache.get(0) is not None
+    assert await other_model_cache.get(0) is None
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_video_caches_are_removed(tmp_path: Path):
+    cache = DetectionCache(tmp_path / "cache", chunk_size=4)
+    videos: list[Path] = []
+
+    for n in range(3):
+        video: Path = tmp_path / f"video_{n}.mp4"
+        video.write_bytes(f"video {n}".encode())
+        videos.append(video)
+
+        video_cache = await cache.open_video_cache(video, "model")
+        for frame_id in range(8):
+            video_cache.put(frame_id, make_detections(50))
+
+        await video_cache.flush()
+        os.utime(video_cache.directory, ns=(n * 10 ** 9, n * 10 ** 9))
+
+    chunks_size: int = sum(file.stat().st_size for file in video_cache.directory.iterdir())
+    cache.max_size = chunks_size * 2
+
+    # Opening the oldest cache keeps it, so the second video is removed
+    assert await (await cache.open_video_cache(videos[0], "model")).get(0) is not None
+    assert await (await cache.open_video_cache(videos[2], "model")).get(0) is not None
+    assert await (await cache.open_video_cache(videos[1], "model")).get(0) is None
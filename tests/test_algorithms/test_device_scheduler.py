@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from server.algorithms.device_scheduler import DeviceScheduler
+from server.algorithms.enums import InferencePriority
+
+
+async def occupy(
+    scheduler: DeviceScheduler,
+    priority: InferencePriority,
+    order: list[str],
+    name: str,
+    delay: float = 0.01
+):
+    async with scheduler.acquire(priority):
+        order.append(name)
+        await asyncio.sleep(delay)
+
+
+@pytest.mark.asyncio
+async def test_interactive_overtakes_bulk():
+    scheduler: DeviceScheduler = DeviceScheduler()
+    order: list[str] = []
+
+    async with scheduler.acquire(InferencePriority.Bulk):
+        tasks = [
+            asyncio.create_task(occupy(scheduler, InferencePriority.Bulk, order, "bulk_1")),
+            asyncio.create_task(occupy(scheduler, InferencePriority.Bulk, order, "bulk_2")),
+        ]
+        await asyncio.sleep(0)
+        tasks.append(
+            asyncio.create_task(occupy(scheduler, InferencePriority.Interactive, order, "interactive"))
+        )
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*tasks)
+    assert order == ["interactive", "bulk_1", "bulk_2"]
+    assert not scheduler.locked()
+    assert scheduler.wait_statistics[InferencePriority.Bulk].count == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_hold_device():
+    scheduler: DeviceScheduler = DeviceScheduler()
+    order: list[str] = []
+
+    async with scheduler.acquire():
+        cancelled = asyncio.create_task(occupy(scheduler, InferencePriority.Interactive, order, "cancelled"))
+        waiting = asyncio.create_task(occupy(scheduler, InferencePriority.Bulk, order, "waiting"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+    await waiting
+    assert order == ["waiting"]
+    assert not scheduler.locked()
@@ -0,0 +1,65 @@
+import numpy as np
+import torch
+
+from server.algorithms.data_types import BoundingBox, Mask, Point
+from server.algorithms.field_detections_filter import filter_detections_on_field
+
+
+def make_detections(count: int) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    generator = torch.Generator().manual_seed(0)
+    top_left = torch.rand((count, 2), generator=generator) * torch.tensor([280.0, 160.0])
+    sizes = 10 + torch.rand((count, 2), generator=generator) * 30
+    boxes = torch.cat((top_left, top_left + sizes), dim=1)
+    scores = torch.rand(count, generator=generator)
+    classes = torch.randint(0, 4, (count,), generator=generator)
+    return boxes, scores, classes
+
+
+def make_field_mask() -> np.ndarray:
+    mask = np.zeros((200, 320), dtype=np.uint8)
+    mask[40:180, 30:290] = 255
+    return mask
+
+
+def test_matches_per_box_filtering():
+    boxes, scores, classes = make_detections(200)
+    field_mask = make_field_mask()
+    field_bbox = BoundingBox(Point(50, 50), Point(260, 170))
+
+    detections = filter_detections_on_field(
+        boxes, scores, classes, field_mask, score_threshold=0.5, field_bbox=field_bbox
+    )
+
+    expected = []
+    for box, score, class_id in zip(boxes.tolist(), scores.tolist(), classes.tolist()):
+        x, y = (box[0] + box[2]) / 2, box[3]
+        if score > 0.5 and field_mask[int(y) - 1, int(x) - 1] > 0 and (x, y) in field_bbox:
+            expected.append([*box, score, class_id])
+
+    assert detections.shape == (len(expected), 6)
+    assert np.allclose(detections, np.array(expected).reshape(-1, 6), atol=1e-5)
+
+
+def test_empty_and_out_of_frame_detections():
+    field_mask = make_field_mask()
+    boxes = torch.tensor([[300.0, 190.0, 400.0, 260.0], [100.0, 60.0, 120.0, 100.0]])
+
+    detections = filter_detections_on_field(
+        boxes, torch.tensor([0.9, 0.4]), torch.tensor([1, 2]), field_mask
+    )
+    assert detections.shape == (0, 6)
+
+    empty = filter_detections_on_field(
+        torch.zeros((0, 4)), torch.zeros(0), torch.zeros(0, dtype=torch.int64), field_mask
+    )
+    assert empty.shape == (0, 6)
+
+
+def test_cropped_mask_matches_mask_image():
+    boxes, scores, classes = make_detections(200)
+    field_mask = make_field_mask()
+
+    detections = filter_detections_on_field(boxes, scores, classes, field_mask)
+    cropped_detections = filter_detections_on_field(boxes, scores, classes, Mask(field_mask))
+
+    assert np.array_equal(detections, cropped_detections)
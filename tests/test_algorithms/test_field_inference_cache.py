@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from server.algorithms.field_inference_cache import FieldInferenceCache
+
+
+def test_cache_returns_stored_frame(tmp_path: Path):
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"video")
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    field_elements = object()
+
+    cache = FieldInferenceCache()
+    assert cache.get(video_path, 1.0) is None
+
+    cache.put(video_path, 1.0, frame, field_elements)
+
+    # Timestamps are matched with millisecond precision
+    cached = cache.get(video_path, 1.0001)
+    assert cached is not None
+    assert cached[0] is frame and cached[1] is field_elements
+    assert cache.get(video_path, 2.0) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"video")
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    cache = FieldInferenceCache(max_entries=2)
+    cache.put(video_path, 0.0, frame, object())
+    cache.put(video_path, 1.0, frame, object())
+    cache.get(video_path, 0.0)
+    cache.put(video_path, 2.0, frame, object())
+
+    assert cache.get(video_path, 0.0) is not None
+    assert cache.get(video_path, 1.0) is None
+    assert cache.get(video_path, 2.0) is not None
+
+
+def test_cache_is_invalidated_by_file_change(tmp_path: Path):
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"video")
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    cache = FieldInferenceCache()
+    cache.put(video_path, 0.0, frame, object())
+
+    video_path.write_bytes(b"another video")
+    os.utime(video_path, ns=(0, 0))
+
+    assert cache.get(video_path, 0.0) is None
+    assert cache.get(tmp_path / "missing.mp4", 0.0) is None
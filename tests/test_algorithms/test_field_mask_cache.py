@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from server.algorithms.data_types import Mask
+from server.algorithms.field_mask_cache import FIELD_MASK_FILE_NAME, LEGACY_FIELD_MASK_FILE_NAME, FieldMaskCache
+
+
+def make_mask_image() -> np.ndarray:
+    image = np.zeros((120, 200), dtype=np.uint8)
+    cv2.circle(image, (100, 60), 40, 255, -1)
+    return image
+
+
+@pytest.mark.asyncio
+async def test_mask_is_saved_losslessly(tmp_path: Path):
+    image = make_mask_image()
+    cache = FieldMaskCache()
+
+    mask_path = await cache.save(tmp_path, Mask(image))
+
+    assert mask_path == tmp_path / FIELD_MASK_FILE_NAME
+    assert np.array_equal(cv2.imread(str(mask_path), cv2.IMREAD_GRAYSCALE), image)
+    # Mask is read from disk by another process
+    assert np.array_equal((await FieldMaskCache().load(mask_path)).to_image(), image)
+
+
+@pytest.mark.asyncio
+async def test_loaded_mask_is_reused_until_file_changes(tmp_path: Path):
+    cache = FieldMaskCache()
+    mask_path = await cache.save(tmp_path, Mask(make_mask_image()))
+
+    first = await cache.load(mask_path)
+    assert await cache.load(mask_path) is first
+
+    other_image = np.zeros((120, 200), dtype=np.uint8)
+    other_image[10:20, 10:20] = 255
+    await FieldMaskCache().save(tmp_path, Mask(other_image))
+
+    assert np.array_equal((await cache.load(mask_path)).to_image(), other_image)
+
+
+@pytest.mark.asyncio
+async def test_legacy_mask_is_read_and_replaced(tmp_path: Path):
+    image = make_mask_image()
+    legacy_path = tmp_path / LEGACY_FIELD_MASK_FILE_NAME
+    cv2.imwrite(str(legacy_path), cv2.cvtColor(image, cv2.COLOR_GRAY2BGR))
+    cache = FieldMaskCache()
+
+    assert cache.get_mask_path(tmp_path) == legacy_path
+    loaded = await cache.load(legacy_path)
+    assert loaded.crop.ndim == 2
+    assert np.count_nonzero(loaded.to_image() != image) < 0.01 * image.size
+
+    await cache.save(tmp_path, loaded)
+
+    assert not legacy_path.exists()
+    assert cache.get_mask_path(tmp_path) == tmp_path / FIELD_MASK_FILE_NAME
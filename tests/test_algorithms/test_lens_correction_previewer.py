@@ -0,0 +1,72 @@
+import shutil
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from server.algorithms.lens_correction_previewer import LensCorrectionPreviewer
+from server.algorithms.video_frame_index import VideoFrameIndex
+from server.algorithms.video_processing import VideoPreprocessingConfig, VideoProcessing
+
+test_video_path: Path = Path(__file__).parent.parent / "videos" / "converted_demo.mp4"
+
+
+class CountingVideoProcessing(VideoProcessing):
+    def __init__(self):
+        super().__init__(VideoPreprocessingConfig())
+        self.rendered_frames: int = 0
+
+    def render_frame_sample(self, source_file, frame_timestamp=None):
+        self.rendered_frames += 1
+        return super().render_frame_sample(source_file, frame_timestamp)
+
+
+def test_zero_coefficients_keep_frame_except_border():
+    frame = np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    previewer = LensCorrectionPreviewer()
+
+    map_x, map_y = previewer.build_correction_maps(64, 48, 0.0, 0.0)
+
+    assert np.array_equal(map_x[1:-1, 1:-1], np.broadcast_to(np.arange(1, 63), (46, 62)))
+    assert np.array_equal(map_y[1:-1, 1:-1], np.broadcast_to(np.arange(1, 47)[:, None], (46, 62)))
+    # Border pixels are filled with black as in ffmpeg
+    assert (map_x[0] == -1).all() and (map_x[:, -1] == -1).all()
+
+    corrected = cv2.remap(frame, map_x, map_y, cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT)
+    assert np.array_equal(corrected[1:-1, 1:-1], frame[1:-1, 1:-1])
+    assert (corrected[0] == 0).all() and (corrected[:, -1] == 0).all()
+
+
+def test_barrel_correction_samples_closer_to_center():
+    map_x, map_y = LensCorrectionPreviewer.build_correction_maps(640, 360, -0.2, 0.0)
+
+    # Center stays in place, corners sample pixels closer to the center
+    assert map_x[180, 320] == 320 and map_y[180, 320] == 180
+    assert 10 < map_x[10, 10] and 10 < map_y[10, 10]
+
+
+def test_coefficients_change_does_not_decode_frame_again(tmp_path: Path):
+    video_file: Path = tmp_path / "video.mp4"
+    shutil.copyfile(test_video_path, video_file)
+    # Frame sample is found by timestamps of 25 fps video in 1/12800 time base
+    packets = [{"pts": n * 512, "pos": str(n), "flags": "K_" if n == 0 else "__"} for n in range(640)]
+    VideoFrameIndex.from_packets(packets, 1 / 12800, video_file.stat().st_size).save(video_file)
+
+    video_processing = CountingVideoProcessing()
+    previewer = LensCorrectionPreviewer()
+
+    first = previewer.render_correction_sample(video_processing, video_file, -0.1, 0.0, 1.0)
+    second = previewer.render_correction_sample(video_processing, video_file, -0.2, 0.05, 1.0)
+
+    assert video_processing.rendered_frames == 1
+    assert first.shape == second.shape == (720, 1280, 3)
+    assert not np.array_equal(first, second)
+    assert previewer.get_correction_maps(1280, 720, -0.1, 0.0) is previewer.get_correction_maps(1280, 720, -0.1, 0.0)
+
+
+def test_invalid_timestamp_is_rejected():
+    with pytest.raises(ValueError):
+        LensCorrectionPreviewer().render_correction_sample(
+            CountingVideoProcessing(), test_video_path, 0.1, 0.0, 1000.0
+        )
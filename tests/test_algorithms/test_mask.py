@@ -0,0 +1,90 @@
+import cv2
+import numpy as np
+
+from server.algorithms.data_types import Line, Mask, Point
+
+
+def make_image(height: int = 120, width: int = 200) -> np.ndarray:
+    image = np.zeros((height, width), dtype=np.uint8)
+    image[30:50, 40:90] = 255
+    return image
+
+
+def test_mask_stores_only_nonzero_part():
+    image = make_image()
+    mask = Mask(image)
+
+    assert mask.crop.shape == (20, 50)
+    assert mask.offset == (40, 30)
+    assert np.array_equal(mask.to_image(), image)
+    assert mask.get_corners_of_mask() == (Point(40, 30), Point(89, 49))
+
+
+def test_mask_from_binary_output():
+    binary = make_image() > 0
+    mask = Mask.from_binary_mask(binary)
+
+    assert mask.crop.dtype == np.uint8
+    assert np.array_equal(mask.to_image(), make_image())
+
+
+def test_expanding_mask_matches_full_frame_dilation():
+    image = make_image()
+    image[110:120, 0:10] = 255
+    kernel = np.ones((21, 21), np.uint8)
+
+    expanded = Mask(image).expand_mask(kernel)
+
+    assert np.array_equal(expanded.to_image(), cv2.dilate(image, kernel, iterations=1))
+
+
+def test_union_of_masks():
+    first = np.zeros((100, 100), dtype=np.uint8)
+    first[10:20, 10:20] = 255
+    second = np.zeros((100, 100), dtype=np.uint8)
+    second[15:40, 50:60] = 255
+
+    union = Mask.from_multiple_masks(Mask(first), Mask(second), Mask(np.zeros((100, 100), dtype=np.uint8)))
+
+    assert np.array_equal(union.to_image(), np.maximum(first, second))
+    assert union.crop.shape == (30, 50)
+
+
+def test_points_in_mask_area():
+    mask = Mask(make_image())
+
+    assert mask.check_points_are_in_mask_area(Point(50, 40), Point(10, 10), Point(199, 119)) == [True, False, False]
+
+
+def test_packing_mask():
+    mask = Mask(make_image())
+    packed = mask.pack()
+
+    assert packed.bits.nbytes == (20 * 50 + 7) // 8
+    assert np.array_equal(Mask.unpack(packed).to_image(), make_image())
+
+
+def test_finding_line_on_mask_crop():
+    image = np.zeros((200, 300), dtype=np.uint8)
+    cv2.line(image, (50, 60), (250, 140), 255, 5)
+
+    assert Line.find_lines(Mask(image)) == Line.find_lines(image)
+
+
+def test_resizing_mask_matches_resizing_full_image():
+    image = make_image()
+    resized = Mask(image).resize(100, 60)
+
+    expected = cv2.resize(image, (100, 60), interpolation=cv2.INTER_NEAREST)
+    assert resized.frame_shape == (60, 100)
+    assert np.array_equal(resized.to_image(), expected)
+    assert Mask(image).resize(200, 120).frame_shape == (120, 200)
+
+
+def test_padded_region_is_clipped_to_image():
+    mask = Mask(make_image())
+
+    assert mask.get_padded_region() == (40, 30, 90, 50)
+    assert mask.get_padded_region(10) == (30, 20, 100, 60)
+    assert mask.get_padded_region(50) == (0, 0, 140, 100)
+    assert mask.get_padded_region(500) == (0, 0, 200, 120)
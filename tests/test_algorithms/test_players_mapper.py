@@ -0,0 +1,38 @@
+import numpy as np
+
+from server.algorithms.data_types import BoundingBox, Point, RelativePoint
+from server.algorithms.players_mapper import PlayersMapper
+
+
+def make_mapper() -> PlayersMapper:
+    return PlayersMapper(
+        BoundingBox(Point(0, 0), Point(1, 1)),
+        {
+            Point(0, 0): Point(0.1, 0.1),
+            Point(1, 0): Point(0.9, 0.1),
+            Point(1, 1): Point(1.0, 0.9),
+            Point(0, 1): Point(0.0, 0.9),
+        }
+    )
+
+
+def test_points_array_matches_single_points():
+    mapper = make_mapper()
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 1, (100, 2))
+
+    transformed = mapper.transform_points_array(points)
+    expected = mapper.transform_point_to_minimap_coordinates(*(RelativePoint(x, y) for x, y in points))
+
+    assert transformed.shape == (100, 2)
+    assert np.allclose(transformed, np.array(expected), atol=1e-6)
+
+
+def test_points_array_is_clipped_to_map():
+    mapper = make_mapper()
+
+    transformed = mapper.transform_points_array(np.array([[0.0, 0.0], [0.5, 0.5]]))
+
+    assert np.allclose(transformed[0], [0.0, 0.0])
+    assert 0 <= transformed[1, 0] <= 1 and 0 <= transformed[1, 1] <= 1
+    assert mapper.transform_points_array(np.zeros((0, 2))).shape == (0, 2)
@@ -0,0 +1,42 @@
+import pytest
+import torch
+
+pytest.importorskip("detectron2")
+
+from detectron2.structures import Boxes, Instances  # noqa: E402
+
+from server.algorithms.services.base.predictor_service import PredictorService  # noqa: E402
+
+
+def test_instances_of_region_are_shifted_to_full_image():
+    masks = torch.zeros((1, 40, 60), dtype=torch.bool)
+    masks[0, 10:20, 5:15] = True
+    instances = Instances(
+        (40, 60),
+        pred_boxes=Boxes(torch.tensor([[5.0, 10.0, 15.0, 20.0]])),
+        scores=torch.tensor([0.9]),
+        pred_classes=torch.tensor([0]),
+        pred_masks=masks
+    )
+
+    shifted = PredictorService.shift_instances(instances, (100, 50), (720, 1280))
+
+    assert shifted.image_size == (720, 1280)
+    assert shifted.pred_boxes.tensor.tolist() == [[105.0, 60.0, 115.0, 70.0]]
+    assert torch.equal(shifted.scores, instances.scores)
+    assert shifted.pred_masks.shape == (1, 720, 1280)
+    assert shifted.pred_masks.sum() == masks.sum()
+    assert shifted.pred_masks[0, 60:70, 105:115].all()
+
+
+def test_instances_without_masks_are_shifted():
+    instances = Instances(
+        (40, 60),
+        pred_boxes=Boxes(torch.tensor([[0.0, 0.0, 60.0, 40.0]])),
+        scores=torch.tensor([0.5])
+    )
+
+    shifted = PredictorService.shift_instances(instances, (10, 20), (100, 100))
+
+    assert shifted.pred_boxes.tensor.tolist() == [[10.0, 20.0, 70.0, 60.0]]
+    assert not shifted.has("pred_masks")
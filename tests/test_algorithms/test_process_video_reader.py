@@ -0,0 +1,84 @@
+import gc
+import subprocess
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
+from server.utils import process_video_reader
+
+test_video_path: Path = Path(__file__).parent.parent / "videos" / "converted_demo.mp4"
+
+
+def read_frames(count: int) -> list[np.ndarray]:
+    cap = cv2.VideoCapture(str(test_video_path))
+    frames = [cap.read()[1] for _ in range(count)]
+    cap.release()
+    return frames
+
+
+@pytest.mark.asyncio
+async def test_frames_are_decoded_in_separate_process():
+    frames = read_frames(40)
+
+    result = [
+        (frame_n, np.array_equal(frame, frames[frame_n]))
+        async for frame_n, frame in process_video_reader(test_video_path, [(3, 10), (10, 14), (30, 35)], 4)
+    ]
+
+    assert [frame_n for frame_n, _ in result] == [*range(3, 14), *range(30, 35)]
+    assert all(is_equal for _, is_equal in result)
+
+
+@pytest.mark.asyncio
+async def test_held_frames_are_not_overwritten():
+    frames = read_frames(30)
+
+    # More frames are held than fit into the ring
+    result = [item async for item in process_video_reader(test_video_path, [(0, 30)], 4)]
+    gc.collect()
+
+    assert len(result) == 30
+    assert all(np.array_equal(frame, frames[frame_n]) for frame_n, frame in result)
+
+
+@pytest.mark.asyncio
+async def test_reading_stops_early():
+    reader = process_video_reader(test_video_path, [(0, None)], 4)
+    async for frame_n, _ in reader:
+        if frame_n == 5:
+            break
+
+    await reader.aclose()
+
+    assert frame_n == 5
+
+
+@pytest.mark.asyncio
+async def test_invalid_video_is_rejected(tmp_path: Path):
+    not_video: Path = tmp_path / "video.mp4"
+    not_video.write_bytes(b"not a video")
+
+    with pytest.raises(InvalidFileFormat):
+        async for _ in process_video_reader(not_video, [(0, None)]):
+            pass
+
+
+def test_decoder_process_does_not_import_neural_network_packages():
+    # Decoder is spawned, so it imports the module of the target from scratch
+    loaded_modules = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys; import server.algorithms.video_slices_decoder; print(' '.join(sys.modules))"
+        ],
+        cwd=Path(__file__).parent.parent.parent,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.split()
+
+    for heavy_module in ("torch", "detectron2", "server.utils", "server.algorithms.data_types"):
+        assert heavy_module not in loaded_modules
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+from server.algorithms.enums import Team
+from server.algorithms.nn import TeamDataset, team_detector_transform
+from server.utils.dataset_utils import count_labels_in_subsets, split_dataset
+
+
+def make_dataset(home_count: int, away_count: int) -> TeamDataset:
+    generator = np.random.default_rng(0)
+    dataset = TeamDataset()
+
+    for n in range(home_count + away_count):
+        image = cv2.GaussianBlur(
+            generator.integers(0, 255, (60 + n % 7, 30 + n % 5, 3), dtype=np.uint8), (5, 5), 2
+        )
+        dataset.add(image, Team.Home if n < home_count else Team.Away)
+
+    return dataset
+
+
+def test_samples_match_transform():
+    generator = np.random.default_rng(1)
+    image = cv2.GaussianBlur(generator.integers(0, 255, (90, 41, 3), dtype=np.uint8), (5, 5), 2)
+    dataset = TeamDataset()
+    dataset.add(image, Team.Away)
+    dataset.add(image.copy(), Team.Home)
+
+    expected = team_detector_transform(Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)))
+    (away_image, away_label), (_, home_label) = dataset[0], dataset[1]
+
+    assert away_image.shape == expected.shape
+    assert torch.allclose(away_image, expected, atol=0.03)
+    assert (away_label, home_label) == (0, 1)
+    assert dataset.class_to_idx == {"Team_away": 0, "Team_home": 1}
+
+
+def test_split_keeps_team_ratio():
+    dataset = make_dataset(60, 30)
+    train, val = split_dataset(dataset)
+
+    assert len(train) + len(val) == len(dataset)
+    assert set(train.indices).isdisjoint(val.indices)
+    assert dataset.count_by_team() == {Team.Home: 60, Team.Away: 30}
+
+    train_counts, val_counts = count_labels_in_subsets(dataset, train.indices, val.indices)
+    assert train_counts.tolist() == [20, 40]
+    assert val_counts.tolist() == [10, 20]
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from torch import nn
+
+from server.algorithms.enums import Team
+from server.algorithms.nn import TeamDetectionPredictor, team_detector_transform
+
+
+def make_player_images() -> list[np.ndarray]:
+    generator = np.random.default_rng(0)
+    return [
+        cv2.GaussianBlur(
+            generator.integers(0, 255, (height, width, 3), dtype=np.uint8), (5, 5), 2
+        )
+        for height, width in ((80, 37), (120, 50), (64, 64), (33, 17))
+    ]
+
+
+def test_batch_preparation_matches_transform():
+    predictor = TeamDetectionPredictor(nn.Flatten())
+
+    for image, prepared in zip(make_player_images(), predictor.prepare_batch(make_player_images())):
+        expected = team_detector_transform(Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)))
+        assert torch.allclose(prepared, expected, atol=0.02)
+
+
+def test_batch_prediction_matches_single_predictions():
+    torch.manual_seed(0)
+    model = nn.Sequential(nn.AdaptiveAvgPool2d(4), nn.Flatten(), nn.Linear(48, 2))
+    predictor = TeamDetectionPredictor(model, max_batch_size=3)
+    images = make_player_images()
+
+    teams = predictor.predict_batch(images)
+
+    assert teams == [predictor(image) for image in images]
+    assert all(team in (Team.Home, Team.Away) for team in teams)
+    assert predictor.predict_batch([]) == []
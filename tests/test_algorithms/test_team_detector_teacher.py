@@ -0,0 +1,68 @@
+import torch
+from torch import nn
+from torch.utils.data import TensorDataset
+
+from server.algorithms.nn.team_detector_teacher import TeamDetectorTeacher
+
+
+class FrozenBackboneModel(nn.Module):
+    # Same layout as TeamDetectorModel: frozen backbone and trainable resnet18.fc
+    def __init__(self):
+        super().__init__()
+        self.resnet18 = nn.Module()
+        self.resnet18.backbone = nn.Linear(4, 8)
+        self.resnet18.fc = nn.Linear(8, 2)
+
+        for param in self.resnet18.backbone.parameters():
+            param.requires_grad = False
+
+    def forward(self, x):
+        return self.resnet18.fc(self.resnet18.backbone(x))
+
+
+def make_team_dataset(count: int, is_flipped: bool = False) -> TensorDataset:
+    generator = torch.Generator().manual_seed(count)
+    labels = torch.arange(count) % 2
+    inputs = torch.randn((count, 4), generator=generator) * 0.3 + (labels[:, None] * 2 - 1) * 2.0
+    return TensorDataset(inputs, 1 - labels if is_flipped else labels)
+
+
+def get_accuracy(model: nn.Module, dataset: TensorDataset) -> float:
+    inputs, labels = dataset.tensors
+    with torch.no_grad():
+        return (torch.argmax(model(inputs), dim=1) == labels).float().mean().item()
+
+
+def test_head_trained_on_cached_features_converges():
+    torch.manual_seed(0)
+    model = FrozenBackboneModel()
+    backbone_state = {key: value.clone() for key, value in model.resnet18.backbone.state_dict().items()}
+    teacher = TeamDetectorTeacher(make_team_dataset(256), make_team_dataset(64), 100, model, patience=None)
+
+    assert teacher.is_backbone_frozen()
+    teacher.train_nn()
+
+    assert teacher.trained_epochs == 100
+    assert get_accuracy(model, make_team_dataset(64)) == 1.0
+    assert all(torch.equal(value, backbone_state[key]) for key, value in model.resnet18.backbone.state_dict().items())
+
+
+def test_training_stops_early_and_keeps_best_state():
+    # Validation labels are opposite, so validation loss is the lowest after the first epoch
+    val_dataset = make_team_dataset(64, is_flipped=True)
+    models = []
+
+    for epochs, expected_epochs in ((100, 4), (1, 1)):
+        torch.manual_seed(0)
+        model = FrozenBackboneModel()
+        teacher = TeamDetectorTeacher(make_team_dataset(256), val_dataset, epochs, model, patience=3)
+        teacher.train_nn()
+        models.append(model)
+
+        assert teacher.trained_epochs == expected_epochs
+
+    early_stopped_model, first_epoch_model = models
+    assert all(
+        torch.equal(value, first_epoch_model.state_dict()[key])
+        for key, value in early_stopped_model.state_dict().items()
+    )
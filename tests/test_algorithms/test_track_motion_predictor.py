@@ -0,0 +1,48 @@
+from server.algorithms.data_types import BoundingBox, Point
+from server.algorithms.data_types.raw_player_tracking_data import RawPlayerTrackingData
+from server.algorithms.enums import PlayerClasses
+from server.algorithms.track_motion_predictor import TrackMotionPredictor
+
+
+def make_track(tracking_id: int, x: float, y: float) -> RawPlayerTrackingData:
+    return RawPlayerTrackingData(
+        tracking_id,
+        BoundingBox(Point(x, y), Point(x + 20, y + 50)),
+        PlayerClasses.Player,
+        0.9
+    )
+
+
+def test_predicts_constant_motion():
+    predictor = TrackMotionPredictor()
+
+    # Player moves 4 pixels right per frame, detected every 2 frames
+    for frame in range(0, 40, 2):
+        predictor.update([make_track(1, 100 + 4 * frame, 200)])
+        predicted = predictor.predict()
+
+    assert len(predicted) == 1
+    assert predicted[0].tracking_id == 1
+    assert abs(predicted[0].bounding_box.min_point.x - (100 + 4 * 39)) < 1
+    assert abs(predicted[0].bounding_box.min_point.y - 200) < 1
+
+
+def test_keeps_only_present_tracks():
+    predictor = TrackMotionPredictor()
+    predictor.update([make_track(1, 0, 0), make_track(2, 100, 100)])
+    predictor.update([make_track(2, 102, 100), make_track(3, 300, 300)])
+
+    assert [track.tracking_id for track in predictor.predict()] == [2, 3]
+
+
+def test_uncertainty_grows_without_detections():
+    predictor = TrackMotionPredictor()
+    assert predictor.max_uncertainty() == 0.0
+
+    predictor.update([make_track(1, 0, 0)])
+    uncertainty_after_detection: float = predictor.max_uncertainty()
+
+    for _ in range(5):
+        predictor.predict()
+
+    assert predictor.max_uncertainty() > uncertainty_after_detection
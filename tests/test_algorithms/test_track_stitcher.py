@@ -0,0 +1,57 @@
+from server.algorithms.data_types import PlayerData, RelativeBoundingBox, RelativePoint
+from server.algorithms.enums import PlayerClasses
+from server.algorithms.track_stitcher import TrackStitcher
+
+
+def make_player(tracking_id: int, x: float, frame_n: int) -> PlayerData:
+    x += frame_n * 0.001
+    return PlayerData(
+        tracking_id,
+        None,
+        RelativePoint(x, 0.5),
+        RelativeBoundingBox(RelativePoint(x, 0.4), RelativePoint(x + 0.05, 0.6)),
+        PlayerClasses.Player
+    )
+
+
+def test_split_into_segments():
+    assert TrackStitcher.split_into_segments(1000, 4, 30) == [(0, 250), (250, 500), (500, 750), (750, 1000)]
+    # Segments shorter than two overlaps are merged
+    assert TrackStitcher.split_into_segments(100, 4, 30) == [(0, 100)]
+    assert TrackStitcher.split_into_segments(130, 4, 30) == [(0, 65), (65, 130)]
+
+
+def test_split_into_segments_aligned_to_keyframes():
+    keyframes = list(range(0, 1000, 250)) + [480, 700]
+
+    # Reading of segment with overlap starts from keyframe
+    assert TrackStitcher.split_into_segments(1000, 4, 30, keyframes) == [(0, 280), (280, 510), (510, 730), (730, 1000)]
+    # Bound isn't moved, if segment becomes shorter than two overlaps
+    assert TrackStitcher.split_into_segments(130, 2, 30, [0, 100]) == [(0, 65), (65, 130)]
+
+
+def test_stitching_keeps_ids_across_segments():
+    stitcher = TrackStitcher()
+    first_segment = [stitcher.renumber([make_player(7, 0.1, n), make_player(3, 0.5, n)]) for n in range(10)]
+
+    assert {player.tracking_id for player in first_segment[0]} == {1, 2}
+
+    # Second segment starts 5 frames before end of first one and uses its own ids,
+    # player with id 1 is lost and new player appears
+    overlap = [[make_player(1, 0.5, n), make_player(2, 0.1, n)] for n in range(5, 10)]
+    stitcher.start_segment(first_segment[5:], overlap)
+    renumbered = stitcher.renumber([make_player(1, 0.5, 10), make_player(2, 0.1, 10), make_player(5, 0.8, 10)])
+
+    previous_ids = {round(player.position.x, 1): player.tracking_id for player in first_segment[-1]}
+    assert renumbered[0].tracking_id == previous_ids[0.5]
+    assert renumbered[1].tracking_id == previous_ids[0.1]
+    assert renumbered[2].tracking_id == 3
+
+
+def test_stitching_does_not_join_distant_tracks():
+    stitcher = TrackStitcher()
+    previous = [stitcher.renumber([make_player(1, 0.1, n)]) for n in range(5)]
+
+    stitcher.start_segment(previous, [[make_player(1, 0.7, n)] for n in range(5)])
+
+    assert stitcher.renumber([make_player(1, 0.7, 5)])[0].tracking_id == 2
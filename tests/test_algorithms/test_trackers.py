@@ -0,0 +1,103 @@
+import numpy as np
+import torch
+
+from server.algorithms.field_detections_filter import filter_detections_on_field
+from server.algorithms.trackers import ByteTracker, IoUTracker, associate_by_iou, iou_matrix
+
+
+def make_frame(frame_n: int, scores: tuple[float, ...] = (0.9, 0.9, 0.9)) -> np.ndarray:
+    detections = []
+    for n, score in enumerate(scores):
+        x = 50 + n * 120 + frame_n * 3
+        y = 80 + n * 10
+        detections.append([x, y, x + 30, y + 70, score, n % 2])
+    return np.array(detections, dtype=np.float64).reshape(-1, 6)
+
+
+def test_iou_matrix():
+    boxes_a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float64)
+    boxes_b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [100, 100, 110, 110]], dtype=np.float64)
+
+    iou = iou_matrix(boxes_a, boxes_b)
+
+    assert iou.shape == (2, 3)
+    assert np.allclose(iou[0], [1.0, 50 / 150, 0.0])
+    assert np.allclose(iou[1], 0.0)
+    assert iou_matrix(np.zeros((0, 4)), boxes_b).shape == (0, 3)
+
+
+def test_association_respects_threshold():
+    iou = np.array([[0.9, 0.1], [0.3, 0.05], [0.0, 0.0]])
+
+    matches, unmatched_rows, unmatched_columns = associate_by_iou(iou, 0.2)
+
+    assert matches.tolist() == [[0, 0]]
+    assert unmatched_rows.tolist() == [1, 2]
+    assert unmatched_columns.tolist() == [1]
+
+
+def test_iou_tracker_keeps_identities():
+    tracker = IoUTracker()
+    outputs = [tracker.update(make_frame(frame_n)) for frame_n in range(20)]
+
+    assert all(len(output) == 3 for output in outputs)
+    assert all(sorted(output[:, 4].tolist()) == [1, 2, 3] for output in outputs)
+    assert np.allclose(outputs[-1][np.argsort(outputs[-1][:, 4]), :4], make_frame(19)[:, :4], atol=1.0)
+
+
+def test_missing_detection_ends_output_until_confirmed_again():
+    tracker = IoUTracker(min_hits=2)
+
+    for frame_n in range(10):
+        tracker.update(make_frame(frame_n))
+
+    gap = tracker.update(make_frame(10)[:2])
+    assert sorted(gap[:, 4].tolist()) == [1, 2]
+
+    returned = tracker.update(make_frame(11))
+    assert sorted(returned[:, 4].tolist()) == [1, 2]
+
+    confirmed = tracker.update(make_frame(12))
+    assert sorted(confirmed[:, 4].tolist()) == [1, 2, 3]
+
+
+def test_byte_tracker_matches_low_score_detections():
+    byte_tracker = ByteTracker(detection_score_threshold=0.3, high_score_threshold=0.7)
+
+    for frame_n in range(10):
+        byte_tracker.update(make_frame(frame_n))
+
+    # Partially occluded player gets lower score
+    occluded = make_frame(10, (0.9, 0.4, 0.9))
+    output = byte_tracker.update(occluded)
+    assert sorted(output[:, 4].tolist()) == [1, 2, 3]
+    assert np.isclose(output[output[:, 4] == 2, 6], 0.4).all()
+
+    # Less confident detection does not start a new track
+    assert len(ByteTracker().update(make_frame(0, (0.5,)))) == 0
+
+
+def test_byte_tracker_defaults_keep_track_of_low_score_detection():
+    # Detector threshold is lowered for ByteTrack, so detections below confident score reach the tracker
+    byte_tracker = ByteTracker()
+
+    for frame_n in range(10):
+        byte_tracker.update(make_frame(frame_n))
+
+    output = byte_tracker.update(make_frame(10, (0.9, 0.3, 0.9)))
+    assert sorted(output[:, 4].tolist()) == [1, 2, 3]
+    assert np.isclose(output[output[:, 4] == 2, 6], 0.3).all()
+
+
+def test_trackers_filter_detections_of_low_score_detector():
+    # Detector keeps detections from 0.1 for every tracker
+    boxes = torch.tensor([[10.0, 10.0, 20.0, 40.0], [50.0, 10.0, 60.0, 40.0]])
+    scores = torch.tensor([0.9, 0.3])
+    classes = torch.tensor([0, 0])
+    field_mask = np.full((100, 100), 255, dtype=np.uint8)
+
+    for tracker, expected_scores in ((IoUTracker(), [0.9]), (ByteTracker(), [0.9, 0.3])):
+        detections = filter_detections_on_field(
+            boxes, scores, classes, field_mask, score_threshold=tracker.detection_score_threshold
+        )
+        assert np.allclose(detections[:, 4], expected_scores)
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from server.algorithms.video_frame_index import VideoFrameIndex
+from server.utils import chain_video_slices
+
+test_video_path: Path = Path(__file__).parent.parent / "videos" / "converted_demo.mp4"
+
+
+def read_frames(count: int) -> list[np.ndarray]:
+    cap = cv2.VideoCapture(str(test_video_path))
+    frames = [cap.read()[1] for _ in range(count)]
+    cap.release()
+    return frames
+
+
+def make_index(frames_count: int, keyframes: list[int]) -> VideoFrameIndex:
+    # Timestamps of 25 fps video in 1/12800 time base
+    packets = [
+        {"pts": n * 512, "pos": str(n * 1000), "flags": "K_" if n in keyframes else "__"}
+        for n in range(frames_count)
+    ]
+    return VideoFrameIndex.from_packets(packets, 1 / 12800, test_video_path.stat().st_size)
+
+
+def test_index_orders_frames_by_presentation_time():
+    # I P B B packets in decode order
+    packets = [
+        {"pts": 0, "pos": "48", "flags": "K_"},
+        {"pts": 3072, "pos": "900", "flags": "__"},
+        {"pts": 1024, "pos": "1200", "flags": "__"},
+        {"pts": 2048, "pos": "1300", "flags": "__"},
+        {"pts": 4096, "pos": "1400", "flags": "K_"},
+        {"pts": 5120, "pos": "2000", "flags": "__"},
+    ]
+
+    index = VideoFrameIndex.from_packets(packets, 1 / 1024, 10000)
+
+    assert index.frames_count == 6
+    assert index.pts.tolist() == [0, 1024, 2048, 3072, 4096, 5120]
+    assert index.keyframes.tolist() == [0, 4]
+    assert index.keyframe_positions.tolist() == [48, 1400]
+    assert [index.get_keyframe(n) for n in range(6)] == [0, 0, 0, 0, 4, 4]
+    assert index.get_frame_time(4) == 4.0
+
+
+def test_index_is_saved_next_to_video_and_invalidated(tmp_path: Path):
+    video_file = tmp_path / "video.mp4"
+    video_file.write_bytes(b"0" * 100)
+    index = VideoFrameIndex.from_packets([{"pts": 0, "pos": "0", "flags": "K_"}], 1 / 25, 100)
+
+    assert VideoFrameIndex.load(video_file) is None
+
+    index.save(video_file)
+    loaded = VideoFrameIndex.load(video_file)
+    assert loaded is not None and loaded.keyframes.tolist() == [0]
+
+    # Index of previous version of video is not used
+    video_file.write_bytes(b"0" * 200)
+    assert VideoFrameIndex.load(video_file) is None
+
+
+def test_seek_decodes_forward_from_keyframe():
+    frames = read_frames(40)
+    index = make_index(250, [0, 25])
+    cap = cv2.VideoCapture(str(test_video_path))
+
+    index.seek(cap, 30)
+    assert np.array_equal(cap.read()[1], frames[30])
+
+    # Frame in the same group of frames is reached without seeking
+    index.seek(cap, 35, current_frame=31)
+    assert np.array_equal(cap.read()[1], frames[35])
+
+    index.seek(cap, 3, current_frame=36)
+    assert np.array_equal(cap.read()[1], frames[3])
+    cap.release()
+
+
+class VariableFrameRateCapture:
+    """
+    Capture of variable frame rate video which seeks by frame number of average frame rate, like OpenCV.
+    """
+
+    def __init__(self, frame_times: list[float]):
+        self.frame_times = frame_times
+        self.average_fps = len(frame_times) / (frame_times[-1] + frame_times[1] - frame_times[0])
+        self.position = 0
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            self.position = round(value / 1000 * self.average_fps)
+
+        else:
+            self.position = int(value)
+
+        return True
+
+    def get(self, prop: int) -> float:
+        assert prop == cv2.CAP_PROP_POS_MSEC
+        return self.frame_times[self.position - 1] * 1000
+
+    def grab(self) -> bool:
+        self.position += 1
+        return self.position <= len(self.frame_times)
+
+    def read(self) -> tuple[bool, int]:
+        self.position += 1
+        return True, self.position - 1
+
+
+def test_seek_corrects_position_of_variable_frame_rate_video():
+    # 50 frames at 25 fps followed by 50 frames at 50 fps
+    frame_times = [n / 25 for n in range(50)] + [2 + n / 50 for n in range(50)]
+    index = VideoFrameIndex.from_packets(
+        [
+            {"pts": round(frame_time * 1000), "pos": "0", "flags": "K_" if n % 10 == 0 else "__"}
+            for n, frame_time in enumerate(frame_times)
+        ],
+        1 / 1000,
+        100
+    )
+    cap = VariableFrameRateCapture(frame_times)
+
+    for frame_number in (80, 99, 30, 1, 0, 50):
+        index.seek(cap, frame_number)  # type: ignore[arg-type]
+        assert cap.read()[1] == frame_number
+
+
+@pytest.mark.asyncio
+async def test_chained_slices_with_index_match_sequential_read():
+    frames = read_frames(40)
+    index = make_index(250, [0, 25])
+
+    cap = cv2.VideoCapture(str(test_video_path))
+    result = [item async for item in chain_video_slices(cap, [(2, 5), (5, 8), (27, 30), (10, 12)], index)]
+    cap.release()
+
+    assert [n for n, _ in result] == [2, 3, 4, 5, 6, 7, 27, 28, 29, 10, 11]
+    assert all(np.array_equal(frame, frames[n]) for n, frame in result)
@@ -0,0 +1,111 @@
+import os
+import shutil
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from server.algorithms.exceptions.invalid_file_format import InvalidFileFormat
+from server.algorithms.video_frame_index import VideoFrameIndex
+from server.algorithms.video_processing import VideoPreprocessingConfig, VideoProcessing
+
+test_video_path: Path = Path(__file__).parent.parent / "videos" / "converted_demo.mp4"
+
+
+@pytest.fixture
+def video_processing() -> VideoProcessing:
+    return VideoProcessing(VideoPreprocessingConfig(video_width=1280, video_height=720, crf=30))
+
+
+def test_frame_sample_is_found_by_frame_index(video_processing: VideoProcessing, tmp_path: Path):
+    video_file: Path = tmp_path / "video.mp4"
+    shutil.copyfile(test_video_path, video_file)
+    # Timestamps of 25 fps video in 1/12800 time base
+    packets = [{"pts": n * 512, "pos": str(n), "flags": "K_" if n == 0 else "__"} for n in range(640)]
+    VideoFrameIndex.from_packets(packets, 1 / 12800, video_file.stat().st_size).save(video_file)
+
+    frame = video_processing.render_frame_sample(video_file, 2.0)
+
+    cap = cv2.VideoCapture(str(test_video_path))
+    expected = [cap.read()[1] for _ in range(51)][-1]
+    cap.release()
+
+    assert frame.shape == (720, 1280, 3)
+    assert (frame == expected).all()
+
+
+def test_frame_sample_without_frame_index_is_decoded_by_ffmpeg(video_processing: VideoProcessing):
+    frame = video_processing.render_frame_sample(test_video_path, 2.0)
+
+    cap = cv2.VideoCapture(str(test_video_path))
+    expected = [cap.read()[1] for _ in range(51)][-1]
+    cap.release()
+
+    assert frame.shape == (720, 1280, 3)
+    # Color conversion of ffmpeg may round differently from OpenCV
+    assert np.abs(frame.astype(np.int16) - expected).mean() < 2
+
+
+def test_frame_sample_outside_of_video_is_rejected(video_processing: VideoProcessing):
+    with pytest.raises(ValueError):
+        video_processing.render_frame_sample(test_video_path, 1000.0)
+
+
+def test_frame_sample_from_invalid_file_is_rejected(video_processing: VideoProcessing, tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        video_processing.render_frame_sample(tmp_path / "missing.mp4")
+
+    not_video: Path = tmp_path / "video.mp4"
+    not_video.write_bytes(b"not a video")
+
+    with pytest.raises(InvalidFileFormat):
+        video_processing.render_frame_sample(not_video)
+
+
+def test_segments_start_at_keyframes_and_cover_video():
+    segments = VideoProcessing.split_at_keyframes(100, [0, 12, 24, 48, 60, 75, 90], 4)
+
+    assert segments == [(0, 24), (24, 48), (48, 75), (75, 100)]
+
+
+def test_segments_are_merged_without_enough_keyframes():
+    # Targets 33 and 67 both snap to keyframe 50
+    assert VideoProcessing.split_at_keyframes(100, [0, 50], 3) == [(0, 50), (50, 100)]
+    assert VideoProcessing.split_at_keyframes(100, [0], 4) == [(0, 100)]
+    assert VideoProcessing.split_at_keyframes(0, [], 4) == [(0, 0)]
+
+
+def test_analysis_proxy_is_used_only_when_newer_than_video(tmp_path: Path):
+    video_file = tmp_path / "corrected_video.mp4"
+    video_file.write_bytes(b"video")
+
+    assert VideoProcessing.get_analysis_video(video_file) == video_file
+
+    proxy_file = VideoProcessing.get_analysis_proxy_path(video_file)
+    proxy_file.write_bytes(b"proxy")
+    assert VideoProcessing.get_analysis_video(video_file) == proxy_file
+
+    # Video rendered again after the proxy
+    os.utime(video_file, ns=(proxy_file.stat().st_mtime_ns + 1, proxy_file.stat().st_mtime_ns + 1))
+    assert VideoProcessing.get_analysis_video(video_file) == video_file
+
+
+def test_video_resolution_is_read_from_capture():
+    assert VideoProcessing.get_video_resolution(test_video_path) == (1280, 720)
+
+
+def test_encoders_limit_is_shared_by_all_transcodes():
+    video_processing = VideoProcessing(VideoPreprocessingConfig(), 2)
+
+    assert video_processing.encoders_semaphore.acquire(blocking=False)
+    assert video_processing.encoders_semaphore.acquire(blocking=False)
+    # Third encoder waits, whatever video it belongs to
+    assert not video_processing.encoders_semaphore.acquire(blocking=False)
+
+
+def test_analysis_proxy_size_is_estimated_by_frames_count():
+    config = VideoPreprocessingConfig(analysis_width=960, analysis_height=540, analysis_quality=3)
+
+    assert VideoProcessing(config).estimate_analysis_proxy_size(test_video_path) == 640 * 960 * 540 // 2
+    assert VideoProcessing(VideoPreprocessingConfig()).estimate_analysis_proxy_size(test_video_path) == 0
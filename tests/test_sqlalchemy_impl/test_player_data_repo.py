@@ -171,6 +171,67 @@ async def test_fetching_partial_player_data(video_fps: float, video_frames_count
     assert len(list(filter(len, fetched.frames))) == 3
 
 
+async def test_inserting_player_data_in_parts(video_fps: float, video_frames_count: int, repo: RepositorySQLA):
+    async with repo.transaction as tr:
+        video = await repo.video_repo.create_new_video(
+            video_fps, test_video_path.relative_to(test_video_directory)
+        )
+        await tr.commit()
+
+    async with repo.transaction as tr:
+        await repo.frames_repo.create_frames(1, video_frames_count)
+        await tr.commit()
+
+    frames_data = [
+        [
+            PlayerDataDTO(
+                tracking_id=p,
+                team_id=Team.Home,
+                player_id=None,
+                player_name=None,
+                class_id=PlayerClasses.Player,
+                player_on_minimap=RelativePointDTO(x=0.35, y=0.3),
+                player_on_camera=BoxDTO(
+                    top_point=RelativePointDTO(x=0.2, y=0.2),
+                    bottom_point=RelativePointDTO(x=0.35, y=0.4)
+                )
+            )
+            for p in range(10)
+        ]
+        for _ in range(10)
+    ]
+
+    for start_frame_id in (0, 5):
+        async with repo.transaction as tr:
+            await repo.player_data_repo.insert_player_data(
+                video.video_id, frames_data[start_frame_id:start_frame_id + 5], start_frame_id
+            )
+            await tr.commit()
+
+    async with repo.transaction:
+        fetched = await repo.player_data_repo.get_all_tracking_data(video.video_id)
+
+    assert len(list(filter(len, fetched.frames))) == len(frames_data)
+    assert all(player.team_id == Team.Home for frame in fetched.frames for player in frame)
+
+    async with repo.transaction as tr:
+        deleted = await repo.player_data_repo.delete_player_data_from_frame(video.video_id, 5)
+        await tr.commit()
+
+    assert deleted == 50
+
+    async with repo.transaction:
+        fetched = await repo.player_data_repo.get_all_tracking_data(video.video_id)
+
+    assert len(list(filter(len, fetched.frames))) == 5
+
+    async with repo.transaction as tr:
+        deleted = await repo.player_data_repo.delete_player_data_from_frame(video.video_id, 0)
+        await tr.commit()
+
+    assert deleted == 50
+
+
 async def test_get_frames_min_and_max_ids_out_of_range(
     video_fps: float, video_frames_count: int, repo: RepositorySQLA
 ):
@@ -580,3 +641,66 @@ async def test_editing_non_existing_aliases_for_players(
     with pytest.raises(NotFoundError):
         async with repo.transaction as tr:
             await repo.player_data_repo.rename_player_alias(3, "Away 33")
+
+async def test_setting_players_points_on_minimap(video_fps: float, video_frames_count: int, repo: RepositorySQLA):
+    async with repo.transaction as tr:
+        video = await repo.video_repo.create_new_video(
+            video_fps, test_video_path.relative_to(test_video_directory)
+        )
+        await tr.commit()
+
+    async with repo.transaction as tr:
+        await repo.frames_repo.create_frames(1, video_frames_count)
+        await tr.commit()
+
+    frames_data = [
+        [
+            PlayerDataDTO(
+                tracking_id=p,
+                team_id=Team.Home,
+                player_id=None,
+                player_name=None,
+                class_id=PlayerClasses.Player,
+                player_on_minimap=RelativePointDTO(x=0.35, y=0.3),
+                player_on_camera=BoxDTO(
+                    top_point=RelativePointDTO(x=0.2, y=0.2),
+                    bottom_point=RelativePointDTO(x=0.4, y=0.4)
+                )
+            )
+            for p in range(3)
+        ]
+        for _ in range(4)
+    ]
+
+    async with repo.transaction as tr:
+        await repo.player_data_repo.insert_player_data(video.video_id, frames_data)
+        await tr.commit()
+
+    async with repo.transaction:
+        bottom_points = await repo.player_data_repo.get_players_bottom_points_on_camera(video.video_id)
+
+    assert len(bottom_points) == 12
+    assert all(x == pytest.approx(0.3) and y == pytest.approx(0.4) for _, _, x, y in bottom_points)
+
+    async with repo.transaction as tr:
+        updated = await repo.player_data_repo.set_players_points_on_minimap(
+            video.video_id,
+            [(frame_id, tracking_id, 0.5, 0.6) for frame_id, tracking_id, _, _ in bottom_points]
+        )
+        await tr.commit()
+
+    assert updated == 12
+
+    async with repo.transaction:
+        fetched = await repo.player_data_repo.get_all_tracking_data(video.video_id)
+
+    assert all(
+        player.player_on_minimap == RelativePointDTO(x=0.5, y=0.6)
+        for frame in fetched.frames for player in frame
+    )
+
+    async with repo.transaction as tr:
+        with pytest.raises(DataIntegrityError):
+            await repo.player_data_repo.set_players_points_on_minimap(
+                video.video_id, [(bottom_points[0][0], bottom_points[0][1], 1.5, 0.6)]
+            )
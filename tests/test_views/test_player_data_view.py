@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, AsyncIterable
+
+import numpy as np
+import pytest
+
+pytest.importorskip("detectron2")
+
+from server.views.player_data_view import PlayerDataView  # noqa: E402
+
+
+class UncertainTracker:
+    def needs_detection(self, max_uncertainty: float, max_relative_speed: float) -> bool:
+        return True
+
+
+class RecordingExtractor:
+    def __init__(self):
+        self.player_tracker = UncertainTracker()
+        self.processed: list[tuple[Any, Any]] = []
+
+    def process_frame(self, frame, instances) -> list:
+        self.processed.append((frame, instances))
+        return []
+
+
+class StridedPredictor:
+    def __init__(self):
+        self.inferred_frames: list[int] = []
+
+    async def stream_strided_inference(self, frames: AsyncIterable, detection_stride: int, **kwargs):
+        async for frame_n, frame in frames:
+            # Frames inside the stride are yielded without detections
+            yield frame_n, frame, "strided" if frame_n % detection_stride == 0 else None
+
+    async def infer_frame(self, frame, frame_id, detection_cache=None, **kwargs) -> asyncio.Future:
+        self.inferred_frames.append(frame_id)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        future.set_result([f"detected {frame_id}"])
+        return future
+
+
+@pytest.mark.asyncio
+async def test_uncertain_frame_inside_stride_gets_detections():
+    async def frames():
+        for frame_n in range(4):
+            yield frame_n, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    extractor = RecordingExtractor()
+    predictor = StridedPredictor()
+
+    frame_ids = [
+        frame_n async for frame_n, _ in PlayerDataView(None)._track_frames(
+            frames(), extractor, predictor, None, 1, 2, 0.5, 0.5
+        )
+    ]
+
+    assert frame_ids == [0, 1, 2, 3]
+    assert predictor.inferred_frames == [1, 3]
+    assert [instances for _, instances in extractor.processed] == ["strided", "detected 1", "strided", "detected 3"]